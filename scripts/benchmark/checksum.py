@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+# Micro-benchmark of the checksum functions used for content uploads.
+#
+# usage: PYTHONPATH=src python scripts/benchmark/checksum.py [size in MB] [number of files]
+
+import os
+import sys
+import time
+import hashlib
+import tempfile
+
+from katello.client.lib.utils.checksum import calculate_checksum, calculate_checksums
+
+
+def create_file(size):
+    fd, path = tempfile.mkstemp()
+    block = os.urandom(1024 * 1024)
+    for _i in range(size):
+        os.write(fd, block)
+    os.close(fd)
+    return path
+
+
+def reference_checksum(checksum_type, filename):
+    # plain 64 KB reads, the way the checksum used to be computed
+    m = hashlib.new(checksum_type)
+    f = open(filename, 'rb')
+    for block in iter(lambda: f.read(65536), ''):
+        m.update(block)
+    f.close()
+    return m.hexdigest()
+
+
+def measure(name, size, function, *args):
+    # the first run warms up the page cache
+    function(*args)
+    started = time.time()
+    function(*args)
+    elapsed = time.time() - started
+    print "%-32s %8.3fs %10.1f MB/s" % (name, elapsed, size / elapsed)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    paths = [create_file(size) for _i in range(count)]
+    try:
+        measure("64 KB reads, sha256", size, reference_checksum, 'sha256', paths[0])
+        measure("checksum engine, sha256", size, calculate_checksum, 'sha256', paths[0])
+        measure("sha256 + sha1 + md5, one pass", size, calculate_checksums, paths[0], ('sha256', 'sha1', 'md5'))
+        measure("%d files, serial" % count, size * count,
+                lambda: [calculate_checksum('sha256', path) for path in paths])
+    finally:
+        for path in paths:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+# Transfer of large json listings from a local stub server with and without
+# gzip compression, on an unlimited loopback and on a throttled link that
+# stands in for a WAN connection.
+#
+# usage: PYTHONPATH=src python scripts/benchmark/compression.py [number of systems] [Mbit/s of the slow link]
+
+import os
+import sys
+import time
+import __builtin__
+
+__builtin__._ = lambda text: text
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'test'))
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.tests.server.stub_server import StubServer
+from katello.client.server import KatelloServer, ConnectionPool
+from katello.client.lib.utils.compression import gzip_compress, parse_encodings
+
+
+def systems(count):
+    return [{
+        'name': 'host-%06d.example.com' % i,
+        'uuid': '6a0c7d2e-%04x-4b8c-9d5e-%012x' % (i % 65536, i),
+        'environment': {'name': ('Library', 'Dev', 'Test')[i % 3]},
+        'serviceLevel': ('Premium', 'Standard', '')[i % 3],
+        'facts': {'cpu.cpu_socket(s)': '2', 'memory.memtotal': '8054316', 'network.hostname': 'host-%06d' % i},
+    } for i in xrange(count)]
+
+
+class CannedResponse(object):
+    """
+    Serves one body, gzip encoded when the client asks for it. With bandwidth
+    set, answering takes as long as sending the body over such a link.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.gzipped = gzip_compress(body)
+        self.bandwidth = None
+
+    def __call__(self, handler):
+        if 'gzip' in parse_encodings(handler.headers.getheader('accept-encoding')):
+            body, headers = self.gzipped, {'Content-Encoding': 'gzip'}
+        else:
+            body, headers = self.body, {}
+        if self.bandwidth:
+            time.sleep(len(body) / self.bandwidth)
+        return (200, body, headers)
+
+
+def measure(name, server, runs=3):
+    best = None
+    for _i in range(runs):
+        started = time.time()
+        server.GET('/api/systems')
+        elapsed = time.time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print "%-34s %8.3fs" % (name, best)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    mbits = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    response = CannedResponse(json.dumps(systems(count)))
+    stub = StubServer().start()
+    stub.responses['/katello/api/systems'] = response
+    print "%d systems: %d bytes of json, %d bytes gzipped" % (count, len(response.body), len(response.gzipped))
+
+    server = KatelloServer('127.0.0.1', stub.port, 'http', '/katello')
+    server.connection_pool = ConnectionPool()
+    for bandwidth in (None, mbits * 1000000 / 8):
+        response.bandwidth = bandwidth
+        link = "%g Mbit/s" % mbits if bandwidth else "loopback"
+        for compression in (False, True):
+            server.compression = compression
+            measure("%s, %s" % (link, "gzip" if compression else "uncompressed"), server)
+    server.connection_pool.clear()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
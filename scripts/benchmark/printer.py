@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+# Benchmark of printing long lists of synthetic systems the way
+# `katello system list` does with -g and with -v.
+#
+# usage: PYTHONPATH=src python scripts/benchmark/printer.py [number of rows]
+
+import os
+import sys
+import time
+import codecs
+import __builtin__
+
+__builtin__._ = lambda text: text
+
+from katello.client.lib.ui import printer
+from katello.client.lib.ui.printer import Printer, GrepStrategy, VerboseStrategy, batch_add_columns
+
+
+def systems(count):
+    environments = [{'name': name} for name in ('Library', 'Dev', 'Test', u'Produkce')]
+    for i in xrange(count):
+        system = {
+            'name': 'host-%06d.example.com' % i,
+            'uuid': '6a0c7d2e-%04x-4b8c-9d5e-%012x' % (i % 65536, i),
+            'environment': environments[i % len(environments)],
+            'serviceLevel': ('Premium', 'Standard', '')[i % 3],
+        }
+        if i % 5:
+            system['content_view'] = {'name': 'view-%d' % (i % 7)}
+        yield system
+
+
+def create_printer(strategy):
+    p = Printer(strategy)
+    p.set_header("Systems List For Org [ ACME_Corporation ]")
+    batch_add_columns(p, {'name': "Name"}, {'uuid': "UUID"})
+    p.add_column('environment', "Environment", item_formatter=lambda s: "%s" % (s['environment']['name']))
+    p.add_column('serviceLevel', "Service Level")
+    p.add_column('content_view', "Content View",
+        item_formatter=lambda s: "%s" % (s['content_view']['name'] if 'content_view' in s else ""))
+    return p
+
+
+def measure(name, count, strategy, items):
+    started = time.time()
+    create_printer(strategy).print_items(items)
+    elapsed = time.time() - started
+    print "%-28s %8.3fs %10.0f rows/s" % (name, elapsed, count / elapsed)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    printer.get_term_width = lambda: 120
+    output = codecs.getwriter('utf-8')(open(os.devnull, 'w'))
+    items = list(systems(count))
+
+    measure("-g", count, GrepStrategy(output=output), items)
+    measure("-g -d '|'", count, GrepStrategy(delimiter='|', output=output), items)
+    measure("-g, streamed list", count, GrepStrategy(output=output), systems(count))
+    measure("-v", count, VerboseStrategy(output=output), items)
+    output.close()
+
+
+if __name__ == "__main__":
+    main()
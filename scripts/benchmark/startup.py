@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+# Startup time of the cli: everything `katello ping` does before it sends
+# its request (imports, command registration, option parsing), measured in
+# fresh interpreters. Pass a source directory of another checkout to
+# compare it with this one.
+#
+# usage: python scripts/benchmark/startup.py [src directory] [number of runs]
+
+import os
+import sys
+import time
+import subprocess
+
+STARTUP = """
+import sys, time
+started = time.time()
+from katello.client.i18n import configure_i18n
+configure_i18n()
+from katello.client.cli.admin import AdminCLI
+from katello.client.main import setup_admin
+admin = AdminCLI()
+setup_admin(admin)
+admin.create_parser('katello').parse_args(['ping'])
+admin.get_command('ping').create_parser('ping', 'katello').parse_args([])
+print time.time() - started, len(sys.modules)
+"""
+
+
+def run(src):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([src] + [p for p in [os.environ.get('PYTHONPATH')] if p])
+    output = subprocess.Popen([sys.executable, '-c', STARTUP], env=env, stdout=subprocess.PIPE).communicate()[0]
+    elapsed, modules = output.split()
+    return float(elapsed), int(modules)
+
+
+def main():
+    src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    # the first run compiles the modules and warms up the page cache
+    run(src)
+    results = sorted([run(src) for _i in range(runs)])
+    print "%-20s %8.1f ms" % ("median startup", results[len(results) / 2][0] * 1000)
+    print "%-20s %8.1f ms" % ("best startup", results[0][0] * 1000)
+    print "%-20s %8d" % ("modules loaded", results[0][1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+# Certificate authenticated requests to a local TLS stub server that
+# requires client certificates: full handshakes and time of a run with an
+# SSL context built for every connection (as the client used to do) and
+# with the shared context resuming TLS sessions. Every call opens a new
+# connection unless the keep-alive pool is used. Needs M2Crypto and the
+# openssl command to create the certificates.
+#
+# usage: PYTHONPATH=src python scripts/benchmark/tls.py [number of calls]
+
+import os
+import sys
+import ssl
+import time
+import shutil
+import tempfile
+import subprocess
+import __builtin__
+
+__builtin__._ = lambda text: text
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'test'))
+
+from katello.tests.server.stub_server import StubServer
+from katello.client.server import KatelloServer, ConnectionPool, SSLAuthentication
+
+
+def openssl(directory, *args):
+    subprocess.check_call(('openssl',) + args, cwd=directory, stdout=open(os.devnull, 'w'),
+        stderr=subprocess.STDOUT)
+
+
+def create_certificates(directory):
+    openssl(directory, 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-subj', '/CN=benchmark-ca', '-keyout', 'ca.key', '-out', 'ca.pem')
+    for name in ('server', 'client'):
+        openssl(directory, 'req', '-newkey', 'rsa:2048', '-nodes', '-subj', '/CN=127.0.0.1',
+            '-keyout', name + '.key', '-out', name + '.csr')
+        openssl(directory, 'x509', '-req', '-days', '1', '-in', name + '.csr', '-CA', 'ca.pem',
+            '-CAkey', 'ca.key', '-CAcreateserial', '-out', name + '.pem')
+    return dict([(name, os.path.join(directory, name)) for name in os.listdir(directory)])
+
+
+def start_tls_stub(files):
+    stub = StubServer()
+    context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+    context.load_cert_chain(files['server.pem'], files['server.key'])
+    context.load_verify_locations(files['ca.pem'])
+    context.verify_mode = ssl.CERT_REQUIRED
+    stub.socket = context.wrap_socket(stub.socket, server_side=True)
+    return stub.start()
+
+
+class ContextPerConnection(SSLAuthentication):
+    """
+    Connections the way the client opened them before, with a new SSL
+    context loading the certificate every time. The context negotiates the
+    protocol, servers refuse the SSLv3 the client used to pin.
+    """
+
+    def __init__(self, certfile, keyfile):
+        super(ContextPerConnection, self).__init__(certfile, keyfile)
+        self.certfile, self.keyfile = certfile, keyfile
+
+    def connect(self, host, port, protocol):
+        from M2Crypto import httpslib
+        return httpslib.HTTPSConnection(host, port,
+            ssl_context=self._create_context(self.certfile, self.keyfile))
+
+
+def measure(name, stub, auth, calls, max_idle):
+    server = KatelloServer('127.0.0.1', stub.port, 'https', '/katello')
+    server.connection_pool = ConnectionPool(max_idle=max_idle)
+    server.set_auth_method(auth)
+    SSLAuthentication.clear()
+    SSLAuthentication.full_handshakes = SSLAuthentication.resumed_handshakes = 0
+
+    started = time.time()
+    for _i in xrange(calls):
+        server.GET('/api/ping')
+    elapsed = time.time() - started
+    server.connection_pool.clear()
+
+    connections = server.connection_pool.misses + server.connection_pool.reconnects
+    if isinstance(auth, ContextPerConnection):
+        full, resumed = connections, 0
+    else:
+        full, resumed = SSLAuthentication.full_handshakes, SSLAuthentication.resumed_handshakes
+    print "%-40s %8.3fs %8d %8d %8d" % (name, elapsed, connections, full, resumed)
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    directory = tempfile.mkdtemp()
+    try:
+        files = create_certificates(directory)
+        stub = start_tls_stub(files)
+        print "%-40s %9s %8s %8s %8s" % ("%d calls" % calls, "time", "conns", "full", "resumed")
+        legacy = ContextPerConnection(files['client.pem'], files['client.key'])
+        shared = SSLAuthentication(files['client.pem'], files['client.key'])
+        measure("context per connection", stub, legacy, calls, 0)
+        measure("shared context, resumed sessions", stub, shared, calls, 0)
+        measure("shared context, keep-alive pool", stub, shared, calls, 4)
+        stub.stop()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@
 # in this software or its documentation.
 
 from katello.client import server
+from katello.client.api.pager import Pager, paged_query
 
 
 class KatelloAPI(object):
@@ -29,4 +30,22 @@ class KatelloAPI(object):
     # pylint: disable=R0201
     @property
     def server(self):
-        return server.active_server
+        return server.get_active_server()
+
+    def _get_list(self, path, query=None, page_size=None, limit=None, stream=False):
+        """
+        GET a list. With page_size or limit the list is fetched in pages
+        and a lazy iterator over its items is returned.
+
+        @type page_size: int
+        @param page_size: number of items requested at once
+        @type limit: int
+        @param limit: maximal number of items fetched
+        @type stream: bool
+        @param stream: return an iterator decoding a single response as it is received
+        """
+        if page_size is None and limit is None:
+            return self.server.GET(path, query, stream=stream)[1]
+        # pages are fetched in background threads, they inherit the active server of this one
+        return Pager(lambda offset, size: self.server.GET(path, paged_query(query, offset, size))[1],
+            page_size, limit)
@@ -18,7 +18,8 @@ from katello.client.api.base import KatelloAPI
 class ErrataAPI(KatelloAPI):
     """ Connection class to access errata calls """
 
-    def errata_filter(self, repo_id=None, environment_id=None, prod_id=None, type_in=None, severity=None):
+    def errata_filter(self, repo_id=None, environment_id=None, prod_id=None, type_in=None, severity=None,
+                      page_size=None, limit=None):
         path = "/api/errata"
         params = {}
         if not repo_id == None:
@@ -31,7 +32,7 @@ class ErrataAPI(KatelloAPI):
             params['type'] = type_in
         if not severity == None:
             params['severity'] = severity
-        pack = self.server.GET(path, params)[1]
+        pack = self._get_list(path, params, page_size, limit)
         return pack
 
     def errata_by_repo(self, repoId, type_in=None):
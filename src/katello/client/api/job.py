@@ -25,3 +25,9 @@ class SystemGroupJobStatusAPI(KatelloAPI):
     def status(self, jobId):
         path = "/api/organizations/%s/system_groups/%s/history/%s" % (self.__org_id, self.__system_group_id, jobId)
         return self.server.GET(path)[1]
+
+    def statuses(self, jobIds):
+        # the group history returns all its jobs within one request
+        path = "/api/organizations/%s/system_groups/%s/history" % (self.__org_id, self.__system_group_id)
+        jobs = dict((str(job['id']), job) for job in self.server.GET(path)[1])
+        return [jobs[str(jobId)] if str(jobId) in jobs else self.status(jobId) for jobId in jobIds]
@@ -24,9 +24,9 @@ class PackageAPI(KatelloAPI):
         pack = self.server.GET(path)[1]
         return pack
 
-    def packages_by_repo(self, repoId):
+    def packages_by_repo(self, repoId, stream=False, page_size=None, limit=None):
         path = "/api/repositories/%s/packages" % repoId
-        pack_list = self.server.GET(path)[1]
+        pack_list = self._get_list(path, None, page_size, limit, stream)
         return pack_list
 
     def search(self, query, repoId):
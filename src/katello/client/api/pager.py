@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+from katello.client.lib.utils.concurrency import BackgroundCall
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def paged_query(query, offset, limit):
+    """
+    Copy of the query asking for one page of results
+    """
+    paged = dict(query or {})
+    paged['offset'] = offset
+    paged['limit'] = limit
+    return paged
+
+
+class _Call(object):
+    """
+    Synchronous counterpart of BackgroundCall
+    """
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def result(self):
+        return self.function(*self.args)
+
+
+class Pager(object):
+    """
+    Lazy iterator over a list that is fetched from the server page by page.
+    The next page is requested in the background while the items of the
+    current one are consumed, and no more pages are fetched once the
+    iteration stops or the limit is reached.
+
+    Servers that don't support paging of a list answer the first request
+    with all the items; the pager then stops after that page.
+
+    @ivar pages: number of pages requested so far
+    """
+
+    def __init__(self, fetch_page, page_size=None, limit=None, prefetch=True):
+        """
+        @type fetch_page: function
+        @param fetch_page: function taking an offset and a number of items
+            and returning a list of items or a dict with the list under
+            'results' and optionally the number of all items under 'subtotal'
+        @type page_size: int
+        @param page_size: number of items requested at once, DEFAULT_PAGE_SIZE when None
+        @type limit: int
+        @param limit: maximal number of items iterated over, None for all of them
+        @type prefetch: bool
+        @param prefetch: request the next page while the current one is consumed
+        """
+        self.fetch_page = fetch_page
+        self.page_size = page_size or DEFAULT_PAGE_SIZE
+        self.limit = limit
+        self.prefetch = prefetch
+        self.pages = 0
+
+    def _size(self, offset):
+        if self.limit is None:
+            return self.page_size
+        return max(min(self.page_size, self.limit - offset), 0)
+
+    def _request(self, offset, size):
+        self.pages += 1
+        if self.prefetch:
+            return BackgroundCall(self.fetch_page, offset, size)
+        return _Call(self.fetch_page, offset, size)
+
+    @classmethod
+    def _unwrap(cls, page):
+        """
+        :return: tuple of the items of a page and the number of all items (None if unknown)
+        """
+        if isinstance(page, dict):
+            return page.get('results', []), page.get('subtotal')
+        return page, None
+
+    def __iter__(self):
+        offset = 0
+        first = None
+        size = self._size(offset)
+        pending = self._request(offset, size) if size else None
+
+        while pending is not None:
+            items, total = self._unwrap(pending.result())
+            pending = None
+
+            if offset and items and items[0] == first:
+                # the server ignores the offset and repeats the first page
+                return
+            if len(items) > size:
+                # the server doesn't page this list and returned all of it
+                if self.limit is not None:
+                    items = items[:self.limit - offset]
+                last = True
+            else:
+                last = len(items) < size or (total is not None and offset + len(items) >= total)
+
+            if offset == 0 and items:
+                first = items[0]
+            offset += len(items)
+            size = self._size(offset)
+            if not last and size:
+                pending = self._request(offset, size)
+
+            for item in items:
+                yield item
@@ -166,13 +166,13 @@ class SystemAPI(KatelloAPI):
         path = "/api/systems/%s/packages" % system_id
         return self.server.DELETE(path, {"groups": packages})[1]
 
-    def systems_by_org(self, orgId, query = None):
+    def systems_by_org(self, orgId, query = None, stream = False, page_size = None, limit = None):
         path = "/api/organizations/%s/systems" % orgId
-        return self.server.GET(path, query)[1]
+        return self._get_list(path, query, page_size, limit, stream)
 
-    def systems_by_env(self, environment_id, query = None):
+    def systems_by_env(self, environment_id, query = None, stream = False, page_size = None, limit = None):
         path = "/api/environments/%s/systems" % environment_id
-        return self.server.GET(path, query)[1]
+        return self._get_list(path, query, page_size, limit, stream)
 
     def errata(self, system_id):
         path = "/api/systems/%s/errata" % system_id
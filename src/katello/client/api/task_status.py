@@ -26,9 +26,9 @@ class TaskStatusAPI(KatelloAPI):
             task = None
         return task
 
-    def tasks_by_org(self, org):
+    def tasks_by_org(self, org, page_size=None, limit=None):
         path = "/api/organizations/%s/tasks" % str(org)
-        tasks = self.server.GET(path)[1]
+        tasks = self._get_list(path, None, page_size, limit)
         return tasks
 
 class SystemTaskStatusAPI(KatelloAPI):
@@ -57,9 +57,9 @@ class UserAPI(KatelloAPI):
         path = "/api/users/%s" % u_str(user_id)
         return self.server.PUT(path, {"user": userdata})[1]
 
-    def users(self, query=None):
+    def users(self, query=None, page_size=None, limit=None):
         path = "/api/users/"
-        users = self.server.GET(path, query)[1]
+        users = self._get_list(path, query, page_size, limit)
         return users
 
     def user(self, user_id):
@@ -19,8 +19,25 @@ Bunch of api utilities for finding records by their names.
 Katello API uses integer ids for record identification in most
 cases. These util functions help with translating names to ids.
 All of them throw ApiDataError if any of the records is not found.
+
+Results of the most frequent lookups are kept in a resolution cache
+so that repeated commands (in shell mode or batch scripts) don't query
+the same records again. Actions changing the records invalidate the
+cached lookups with invalidate_lookups.
 """
 
+import atexit
+import os
+import ConfigParser
+from copy import deepcopy
+from functools import wraps
+
+from katello.client import server
+from katello.client.server import ServerRequestError
+from katello.client.config import Config, ConfigFileError
+from katello.client.lib.utils.cache import LRUCache
+from katello.client.lib.utils.concurrency import parallel_map
+from katello.client.logutil import getLogger
 
 from katello.client.api.organization import OrganizationAPI
 from katello.client.api.environment import EnvironmentAPI
@@ -50,6 +67,121 @@ class ApiDataError(Exception):
     pass
 
 
+# resolution cache ------------------------------------------------------------
+
+_log = getLogger(__name__)
+
+resolution_cache = LRUCache()
+
+RESOLUTION_CACHE_FILE = os.path.join(Config.USER_DIR, 'resolution_cache')
+
+# lookups that have to be dropped when records of a kind change
+_DEPENDENT_LOOKUPS = {
+    'organization': ('organization', 'environment', 'product', 'repo', 'content_view', 'system_group'),
+    'environment': ('environment', 'repo'),
+    'product': ('product', 'repo'),
+    'repo': ('repo',),
+    'content_view': ('content_view', 'repo'),
+    'system_group': ('system_group',)
+}
+
+_cache_configured = False
+
+
+def _configure_resolution_cache():
+    """
+    Apply settings from the [cache] section of the config:
+    resolution_ttl, resolution_size and resolution_persist.
+    """
+    global _cache_configured
+    if _cache_configured:
+        return
+    _cache_configured = True
+
+    try:
+        Config()
+        if Config.parser.has_option('cache', 'resolution_ttl'):
+            resolution_cache.ttl = int(Config.parser.get('cache', 'resolution_ttl'))
+        if Config.parser.has_option('cache', 'resolution_size'):
+            resolution_cache.max_size = int(Config.parser.get('cache', 'resolution_size'))
+        persist = Config.parser.has_option('cache', 'resolution_persist') and \
+            Config.parser.get('cache', 'resolution_persist').lower() == 'true'
+    except (ConfigFileError, ConfigParser.Error, ValueError), e:
+        _log.warning("invalid cache configuration, using defaults: %s" % e)
+        persist = False
+
+    if persist:
+        resolution_cache.load(RESOLUTION_CACHE_FILE)
+        atexit.register(_save_resolution_cache)
+
+
+def _save_resolution_cache():
+    try:
+        resolution_cache.save(RESOLUTION_CACHE_FILE)
+    except (IOError, OSError), e:
+        _log.warning("could not save resolution cache: %s" % e)
+
+
+def _resolution_scope():
+    """
+    Records are cached per server and user, never for an unknown user.
+    """
+    active = server.get_active_server()
+    if active is None:
+        return None
+    identity = active.auth_method.identity()
+    if identity is None:
+        return None
+    return (active.host, active.port, active.path_prefix) + active.auth_method.connection_key() + (identity,)
+
+
+def cached_lookup(kind):
+    """
+    Decorator caching results of a lookup function in the resolution cache.
+    The decorated function accepts an extra keyword argument refresh
+    that forces a new lookup.
+
+    :type kind: string
+    :param kind: kind of the records the function looks up
+    """
+    def decorator(func):
+        @wraps(func)
+        def lookup(*args, **kwargs):
+            refresh = kwargs.pop('refresh', False)
+            scope = _resolution_scope()
+            if scope is None:
+                return func(*args, **kwargs)
+
+            _configure_resolution_cache()
+            key = (scope, kind, func.__name__, args, tuple(sorted(kwargs.items())))
+            if not refresh:
+                record = resolution_cache.get(key)
+                if record is not None:
+                    return deepcopy(record)
+
+            record = func(*args, **kwargs)
+            resolution_cache.set(key, deepcopy(record))
+            return record
+        return lookup
+    return decorator
+
+
+def invalidate_lookups(kind):
+    """
+    Drop cached lookups of records of the given kind and of the records
+    resolved with their help.
+
+    :type kind: string
+    :param kind: kind of the changed records (organization, environment, ...)
+    """
+    kinds = _DEPENDENT_LOOKUPS.get(kind, (kind,))
+    resolution_cache.remove_if(lambda key: key[1] in kinds)
+
+
+# lookups ---------------------------------------------------------------------
+
+
+@cached_lookup('organization')
 def get_organization(orgName):
     organization_api = OrganizationAPI()
 
@@ -60,6 +192,7 @@ def get_organization(orgName):
     return org
 
 
+@cached_lookup('environment')
 def get_environment(orgName, envName=None):
     environment_api = EnvironmentAPI()
 
@@ -79,6 +212,7 @@ def get_library(orgName):
     return get_environment(orgName, None)
 
 
+@cached_lookup('product')
 def get_product(orgName, prodName=None, prodLabel=None, prodId=None):
     """
     Retrieve product by name, label or id.
@@ -98,6 +232,7 @@ def get_product(orgName, prodName=None, prodLabel=None, prodId=None):
     return products[0]
 
 
+@cached_lookup('content_view')
 def get_content_view(org_name, view_label=None, view_name=None, view_id=None):
     cv_api = ContentViewAPI()
 
@@ -163,6 +298,14 @@ def get_node(node_name, node_id):
 
 def get_repo(orgName, repoName, prodName=None, prodLabel=None, prodId=None, envName=None, includeDisabled=False,
              viewName=None, viewLabel=None, viewId=None):
+    repo_id = get_repo_id(orgName, repoName, prodName, prodLabel, prodId, envName, includeDisabled,
+        viewName, viewLabel, viewId)
+    #repo by id call provides more information
+    return RepoAPI().repo(repo_id)
+
+@cached_lookup('repo')
+def get_repo_id(orgName, repoName, prodName=None, prodLabel=None, prodId=None, envName=None, includeDisabled=False,
+             viewName=None, viewLabel=None, viewId=None):
     repo_api = RepoAPI()
 
     env  = get_environment(orgName, envName)
@@ -176,8 +319,7 @@ def get_repo(orgName, repoName, prodName=None, prodLabel=None, prodId=None, envN
 
     repos = repo_api.repos_by_env_product(env["id"], prod["id"], repoName, includeDisabled, resultViewId)
     if len(repos) > 0:
-        #repo by id call provides more information
-        return repo_api.repo(repos[0]["id"])
+        return repos[0]["id"]
 
     if view:
         error = _("Could not find repository [ %(repoName)s ] within organization [ %(orgName)s ], " \
@@ -242,6 +384,7 @@ def get_permission(role_name, permission_name):
             {'role_name':role_name, 'permission_name':permission_name})
     return perm
 
+@cached_lookup('system_group')
 def get_system_group(org_name, system_group_name):
     system_group_api = SystemGroupAPI()
 
@@ -284,24 +427,66 @@ def get_system(org_name, sys_name, env_name=None, sys_uuid=None):
 
     return system_api.system(systems[0]['uuid'])
 
-def get_systems(org_name, sys_uuids):
-    invalid_sys_uuids = []
-    systems = []
+# number of uuids OR-combined into one system search
+SYSTEM_SEARCH_CHUNK = 50
 
-    for sys_uuid in sys_uuids:
-        try:
-            system = get_system(org_name, None, None, sys_uuid)
-            systems.append(system)
+def get_systems(org_name, sys_uuids, details=False):
+    """
+    Resolve systems by their uuids.
+
+    Systems are searched for in chunks of OR-combined uuid queries instead
+    of one search per uuid. Uuids that the chunked searches didn't return
+    are verified one by one in parallel before they are reported missing.
+
+    :type org_name: string
+    :type sys_uuids: list of strings
+    :type details: bool
+    :param details: fetch full system details instead of the search records
+    :return: list of systems in the order of the uuids
+    :raises ApiDataError: listing all the uuids that were not found
+    """
+    system_api = SystemAPI()
 
-        except ApiDataError:
-            invalid_sys_uuids.append(sys_uuid)
+    uuids = []
+    for sys_uuid in sys_uuids:
+        if sys_uuid not in uuids:
+            uuids.append(sys_uuid)
 
+    found = {}
+    for i in range(0, len(uuids), SYSTEM_SEARCH_CHUNK):
+        chunk = uuids[i:i + SYSTEM_SEARCH_CHUNK]
+        query = ' OR '.join('uuid:%s' % sys_uuid for sys_uuid in chunk)
+        try:
+            systems = system_api.systems_by_org(org_name, {'search': query})
+        except ServerRequestError:
+            # the search was refused, leave the chunk for the per-uuid checks
+            continue
+        chunk_uuids = set(chunk)
+        for system in systems:
+            if system['uuid'] in chunk_uuids:
+                found[system['uuid']] = system
+
+    unresolved = [sys_uuid for sys_uuid in uuids if sys_uuid not in found]
+    for sys_uuid, system in zip(unresolved, parallel_map(
+            lambda sys_uuid: _find_system_by_uuid(system_api, org_name, sys_uuid), unresolved)):
+        if system is not None:
+            found[sys_uuid] = system
+
+    invalid_sys_uuids = [sys_uuid for sys_uuid in uuids if sys_uuid not in found]
     if len(invalid_sys_uuids) > 0:
         raise ApiDataError(_("Could not find Systems [ %(sys_uuids)s ] in Org [ %(org_name)s ]") \
             % {'sys_uuids':', '.join(sys_uuid for sys_uuid in invalid_sys_uuids),
                'org_name':org_name})
 
-    return systems
+    if details:
+        return parallel_map(system_api.system, uuids)
+    return [found[sys_uuid] for sys_uuid in uuids]
+
+def _find_system_by_uuid(system_api, org_name, sys_uuid):
+    systems = system_api.systems_by_org(org_name, {'search': 'uuid:%s' % sys_uuid})
+    if len(systems) != 1:
+        return None
+    return systems[0]
 
 def get_distributor(org_name, dist_name, env_name=None, dist_uuid=None):
     distributor_api = DistributorAPI()
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU Lesser General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (LGPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of LGPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/lgpl-2.0.txt.
+
+import os
+import sys
+import threading
+
+from katello.client.cli.base import KatelloError
+from katello.client.lib.control import parse_tokens, get_katello_mode
+from katello.client.lib.utils.capture import OutputCapture
+from katello.client.lib.utils.concurrency import parallel_imap
+from katello.client.lib.utils.io import get_abs_path
+
+# line of a script that waits for all the previous commands to finish
+BARRIER = 'wait'
+# lines of a script that end it
+END = ('exit', 'quit')
+# actions creating a resource whose name the following lines may refer to
+CREATE_ACTIONS = ('create', 'register')
+NAME_OPTIONS = ('--name', '--label')
+
+
+class BatchResult(object):
+    """
+    Outcome of one command of a batch
+
+    :ivar line: number of the line the command was read from
+    :ivar command: the command line
+    :ivar exit_code: exit code of the command
+    :ivar output: captured output of a command run in parallel, see OutputCapture.stop
+    """
+
+    def __init__(self, line, command, exit_code, output=None):
+        self.line = line
+        self.command = command
+        self.exit_code = exit_code
+        self.output = output
+
+
+def read_script(path):
+    """
+    :param path: path of the file, the standard input is read when None or '-'
+    :rtype: list of strings
+    :raises IOError: when the file can't be read
+    """
+    if path in (None, '-'):
+        return sys.stdin.readlines()
+    f = open(get_abs_path(path))
+    try:
+        return f.readlines()
+    finally:
+        f.close()
+
+
+def read_commands(lines):
+    """
+    Commands of a batch file, empty lines and lines starting with # are skipped.
+
+    :type lines: iterable of strings
+    :rtype: generator of tuples (line number, command)
+    """
+    for number, line in enumerate(lines):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield (number + 1, line)
+
+
+def session_cli(cli, excluded=('shell', 'batch')):
+    """
+    New instance of the cli with all the commands set up, that shares
+    the server, credentials and server options with the given one
+
+    :type cli: KatelloCLI
+    :type excluded: tuple of strings
+    :param excluded: names of commands left out
+    """
+    # imported here, the command registry imports the modules using this one
+    from katello.client.main import setup_admin
+    new_cli = cli.__class__()
+    setup_admin(new_cli, get_katello_mode())
+    for name in excluded:
+        if name in new_cli.get_command_names():
+            new_cli.remove_command(name)
+    new_cli.share_session(cli)
+    return new_cli
+
+
+def created_names(tokens):
+    """
+    :type tokens: list of strings
+    :param tokens: parsed command line
+    :return: set of names of the resource the command creates
+    """
+    if len(tokens) < 2 or tokens[1] not in CREATE_ACTIONS:
+        return set()
+    return set([tokens[i + 1] for i in range(len(tokens) - 1) if tokens[i] in NAME_OPTIONS])
+
+
+def plan_stages(commands):
+    """
+    Split commands of a script into stages. Commands of one stage don't
+    depend on each other and can run in parallel, a stage starts once all
+    commands of the previous one finished. A new stage starts at a 'wait'
+    line and before a command that refers to a name a command of the
+    current stage creates (eg. 'product create --org ACME' after 'org create
+    --name ACME'). The script ends at an 'exit' or 'quit' line.
+
+    :type commands: iterable of tuples (line number, command)
+    :rtype: list of lists of tuples (line number, command)
+    """
+    stages = []
+    stage = []
+    created = set()
+    for line, command in commands:
+        if command in END:
+            break
+        if command == BARRIER:
+            if stage:
+                stages.append(stage)
+            stage, created = [], set()
+            continue
+
+        try:
+            tokens = parse_tokens(command)
+        except KatelloError:
+            tokens = command.split()
+        if stage and created.intersection(tokens[2:]):
+            stages.append(stage)
+            stage, created = [], set()
+        stage.append((line, command))
+        created.update(created_names(tokens))
+    if stage:
+        stages.append(stage)
+    return stages
+
+
+class Batch(object):
+    """
+    Runs commands of the cli in one process, so that they share the server
+    connections, caches and everything imported. Commands run in parallel
+    are executed by cli instances of the worker threads, their output is
+    captured and printed in the order of the commands once they finish.
+    """
+
+    def __init__(self, create_cli, parallel=1):
+        """
+        :type create_cli: function
+        :param create_cli: function returning a cli (KatelloCLI) with all
+            the commands set up, called once for every thread running commands
+        :type parallel: int
+        :param parallel: number of commands run at the same time
+        """
+        self.create_cli = create_cli
+        self.parallel = parallel
+        self.__local = threading.local()
+        self.__capture = None
+
+    def __cli(self):
+        cli = getattr(self.__local, 'cli', None)
+        if cli is None:
+            cli = self.__local.cli = self.create_cli()
+        return cli
+
+    @classmethod
+    def execute(cls, cli, command):
+        """
+        Run one command line
+
+        :type command: str
+        :return: exit code of the command
+        """
+        try:
+            return cli.main(command) or os.EX_OK
+        except SystemExit, e:
+            if e.code is None:
+                return os.EX_OK
+            if isinstance(e.code, int):
+                return e.code
+            print >> sys.stderr, e.code
+            return 1
+
+    def __run_captured(self, line_command):
+        line, command = line_command
+        self.__capture.start()
+        try:
+            exit_code = self.execute(self.__cli(), command)
+        finally:
+            output = self.__capture.stop()
+        return BatchResult(line, command, exit_code, output)
+
+    def run(self, commands):
+        """
+        :type commands: iterable of tuples (line number, command)
+        :rtype: generator of BatchResults in the order of the commands,
+            output of a command is printed before its result is yielded
+        """
+        if self.parallel <= 1:
+            for line, command in commands:
+                yield BatchResult(line, command, self.execute(self.__cli(), command))
+            return
+
+        self.__capture = OutputCapture()
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = self.__capture.wrap(stdout), self.__capture.wrap(stderr)
+        try:
+            for result in parallel_imap(self.__run_captured, commands, self.parallel):
+                OutputCapture.replay(result.output)
+                result.output = None
+                yield result
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+
+    def run_stages(self, stages):
+        """
+        Run stages planned by plan_stages one after another
+
+        :rtype: generator of BatchResults in the order of the commands
+        """
+        for stage in stages:
+            for result in self.run(stage):
+                yield result
@@ -15,6 +15,7 @@
 
 import os
 import sys
+import ConfigParser
 from logging import root, DEBUG
 from traceback import format_exc
 
@@ -26,8 +27,11 @@ from katello.client.config import Config
 from katello.client.logutil import getLogger, logfile
 from katello.client import server
 
-from katello.client.server import BasicAuthentication, SSLAuthentication, NoAuthentication
+from katello.client.server import BasicAuthentication, SSLAuthentication, KerberosAuthentication, \
+    NoAuthentication
 from katello.client.lib.control import get_katello_mode
+from katello.client.lib.utils.http_cache import HTTPCache
+from katello.client.lib.utils.deadline import command_deadline
 
 
 _log = getLogger(__name__)
@@ -92,6 +96,15 @@ def opt_parser_add_content_view(parser, required=None, name='content_view'):
         parser.add_option("--"+name+"_id", dest="view_id",
                         help=_("content view id eg: 6%s" % require))
 
+def opt_parser_add_paging(parser):
+    """
+    Add options limiting long lists and the size of pages they are fetched in
+    """
+    parser.add_option('--limit', dest='limit', type="positive_int",
+                      help=_("maximal number of items listed"))
+    parser.add_option('--page-size', dest='page_size', type="positive_int",
+                      help=_("number of items fetched from the server at once"))
+
 class OptionException(Exception):
     """
     Exception to be used, when value of an option is not valid e.g. not found
@@ -123,6 +136,11 @@ class KatelloCLI(Command):
         self._password = None
         self._certfile = None
         self._keyfile = None
+        self._option_defaults = {}
+        self._shared_session = False
+        # server and credentials of the cli the session is shared with
+        self._session_server = None
+        self._session_credentials = None
 
     def setup_parser(self, parser):
         """
@@ -133,6 +151,10 @@ class KatelloCLI(Command):
                                 dest="version",  help=_('prints version information'))
         parser.add_option("-d", "--debug", action="store_true", default=False,
                                 dest="debug",  help=_('send debug information into logs'))
+        parser.add_option("--no-cache", action="store_true", default=False,
+                                dest="no_cache",  help=_('don\'t use the cached responses of the server'))
+        parser.add_option("--timeout", dest="timeout", type="positive_int",
+                                help=_('number of seconds the command may run before it fails'))
 
         credentials = OptionGroup(parser, _('Katello User Account Credentials'))
         credentials.add_option('-u', '--username', dest='username',
@@ -161,18 +183,114 @@ class KatelloCLI(Command):
         server_opt.add_option('--path', dest='path', default=path,
                           help=SUPPRESS_HELP)
         parser.add_option_group(server_opt)
+        parser.set_defaults(**self._option_defaults)
 
     def setup_server(self):
         """
-        Setup the active server connection.
+        Setup the active server connection. The server of the previous
+        command (shell, batch) is kept when it has the same address.
         """
         host = self.opts.host
-        port = self.opts.port
+        port = int(self.opts.port)
         scheme = self.opts.scheme
         path = self.opts.path
 
-        self._server = server.KatelloServer(host, int(port), scheme, path, self.__server_locale())
-        server.set_active_server(self._server)
+        if self._server is None or \
+            (self._server.host, self._server.port, self._server.protocol, self._server.path_prefix) != \
+                (host, port, scheme, path):
+            self._server = server.KatelloServer(host, port, scheme, path, self.__server_locale())
+            self._server.compression = not (Config.parser.has_option('server', 'compression')
+                and Config.parser.get('server', 'compression').lower() == 'false')
+            self._server.http_cache = self.__http_cache()
+            self._server.retry_policy = self.__retry_policy()
+            self._server.connect_timeout = self.__server_timeout('connect_timeout', self._server.connect_timeout)
+            self._server.read_timeout = self.__server_timeout('read_timeout', self._server.read_timeout)
+        # the server is reused by the following commands and shared by threads
+        self._server.bypass_cache(bool(self.get_option('no_cache')))
+        if not self._shared_session:
+            # commands of a batch or a parallel script share the deadline of the whole run
+            command_deadline.start(self.get_option('timeout') or self.__server_timeout('timeout', None))
+        if self._server.retry_policy is not None:
+            self._server.retry_policy.start()
+        if self._shared_session:
+            # clis sharing a session run in threads of a batch, each one
+            # activates the server for its own thread only
+            server.set_thread_server(self._server)
+        else:
+            server.set_active_server(self._server)
+
+    # options of the cli a session is shared with that the commands inherit
+    SESSION_OPTIONS = ('debug', 'no_cache', 'host', 'port', 'scheme', 'path')
+
+    def share_session(self, cli):
+        """
+        Use the server, credentials and server options of another cli
+        instance, so that commands run by both of them share connections
+        and caches.
+
+        @type cli: KatelloCLI
+        """
+        self._shared_session = True
+        if cli.opts is not None:
+            self._option_defaults = dict([(name, getattr(cli.opts, name)) for name in self.SESSION_OPTIONS])
+        self._server = self._session_server = cli._server
+        self._username = cli._username
+        self._password = cli._password
+        self._certfile = cli._certfile
+        self._keyfile = cli._keyfile
+        self._session_credentials = (cli._username, cli._password, cli._certfile, cli._keyfile)
+
+    @classmethod
+    def __http_cache(cls):
+        """
+        Cache of GET responses configured by http_cache and http_cache_size
+        (in MiB) of the [cache] section, None when it's turned off
+        """
+        try:
+            if Config.parser.has_option('cache', 'http_cache') and \
+                Config.parser.get('cache', 'http_cache').lower() == 'false':
+                return None
+            size = 50
+            if Config.parser.has_option('cache', 'http_cache_size'):
+                size = int(Config.parser.get('cache', 'http_cache_size'))
+        except (ConfigParser.Error, ValueError), e:
+            _log.warning("invalid http cache configuration, using defaults: %s" % e)
+            size = 50
+        return HTTPCache(os.path.join(Config.USER_DIR, 'cache'), size * 1024 * 1024)
+
+    @classmethod
+    def __server_timeout(cls, name, default):
+        """
+        Number of seconds of a timeout in the [server] section, None when it's 0
+        """
+        try:
+            if Config.parser.has_option('server', name):
+                return float(Config.parser.get('server', name)) or None
+        except (ConfigParser.Error, ValueError), e:
+            _log.warning("invalid %s configuration, using %s: %s" % (name, default, e))
+        return default
+
+    @classmethod
+    def __retry_policy(cls):
+        """
+        Retries of failed requests configured by retries, retry_time (seconds
+        a command may spend retrying) and retry_post of the [server] section,
+        None when retries is 0
+        """
+        policy = server.RetryPolicy()
+        try:
+            if Config.parser.has_option('server', 'retries'):
+                policy.max_retries = int(Config.parser.get('server', 'retries'))
+            if Config.parser.has_option('server', 'retry_time'):
+                policy.retry_time = float(Config.parser.get('server', 'retry_time'))
+            policy.retry_post = Config.parser.has_option('server', 'retry_post') and \
+                Config.parser.get('server', 'retry_post').lower() == 'true'
+        except (ConfigParser.Error, ValueError), e:
+            _log.warning("invalid retry configuration, using defaults: %s" % e)
+            return server.RetryPolicy()
+        if policy.max_retries <= 0:
+            return None
+        return policy
 
     @classmethod
     def __server_locale(cls):
@@ -189,20 +307,44 @@ class KatelloCLI(Command):
 
     def setup_credentials(self):
         """
-        Setup up request credentials with the active server.
+        Setup up request credentials with the active server. Credentials
+        given to a command sharing the server of another cli (batch line)
+        authenticate only the requests of its thread, the shared server
+        keeps its own ones.
         """
+        if self._shared_session:
+            credentials = (self.opts.username, self.opts.password, self.opts.certfile, self.opts.keyfile)
+            if credentials == (None, None, None, None):
+                credentials = self._session_credentials
+            if self._server is not self._session_server:
+                # server of another address, used by this cli only
+                self._server.set_auth_method(self.__auth_method(*credentials))
+            elif credentials == self._session_credentials:
+                self._server.set_thread_auth_method(None)
+            else:
+                self._server.set_thread_auth_method(self.__auth_method(*credentials))
+            return
+
         self._username = self._username or self.opts.username
         self._password = self._password or self.opts.password
 
         self._certfile = self._certfile or self.opts.certfile
         self._keyfile = self._keyfile or self.opts.keyfile
 
-        if None not in (self._username, self._password):
-            self._server.set_auth_method(BasicAuthentication(self._username, self._password))
-        elif None not in (self._certfile, self._keyfile):
-            self._server.set_auth_method(SSLAuthentication(self._certfile, self._keyfile))
+        self._server.set_auth_method(self.__auth_method(self._username, self._password, self._certfile,
+            self._keyfile))
+        # drop the credentials a batch line run in this thread left behind
+        self._server.set_thread_auth_method(None)
+
+    def __auth_method(self, username, password, certfile, keyfile):
+        if None not in (username, password):
+            return BasicAuthentication(username, password)
+        elif None not in (certfile, keyfile):
+            return SSLAuthentication(certfile, keyfile)
+        elif KerberosAuthentication.available():
+            return KerberosAuthentication(self._server.host)
         else:
-            self._server.set_auth_method(NoAuthentication())
+            return NoAuthentication()
 
     # pylint: disable=W0221
     def error(self, exception, errorMsg = None):
@@ -235,3 +377,18 @@ class KatelloCLI(Command):
             # for all the errors see ~/.katello/client.log or /var/log/katello/client.log
             self.error(ex)
             return 1
+
+        finally:
+            _log.debug("connection pool usage: %(hits)d hits, %(misses)d misses, %(reconnects)d reconnects"
+                % server.connection_pool.stats())
+            if self._server is not None and self._server.auth_method.stats():
+                _log.debug("authentication: %s" % ", ".join(["%s %s" % (value, name.replace('_', ' '))
+                    for name, value in sorted(self._server.auth_method.stats().items())]))
+            if self._server is not None and self._server.retry_policy is not None:
+                stats = self._server.retry_policy.stats()
+                stats.update(self._server.circuit_breaker.stats())
+                _log.debug("retries: %(retries)d requests resent, %(failures)d failed after retrying, "
+                    "circuit opened %(trips)d times" % stats)
+            if self._server is not None and self._server.http_cache is not None:
+                _log.debug("http cache: %(hits)d responses not modified, %(misses)d fetched"
+                    % self._server.http_cache.stats())
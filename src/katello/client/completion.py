@@ -11,66 +11,399 @@
 # have received a copy of LGPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/lgpl-2.0.txt.
 
-from katello.client.core.base import CommandContainer
+import os
+import glob
+import time
+import hashlib
+import tempfile
+import threading
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 from katello.client.lib.control import parse_tokens
+from katello.client.lib.utils.concurrency import ContextThread
+from katello.client.logutil import getLogger
 
+_log = getLogger(__name__)
 
 
-class Completion():
+class CompletionNode(object):
+    """
+    Node of the completion trie: names of the subcommands and long
+    options of one command. Children are created on first access.
+    """
 
-    def __init__(self, admin_cli):
-        self.admin_cli = admin_cli
+    def __init__(self, command=None, commands=None, options=None, children=None):
+        self.__command = command
+        self.__commands = commands
+        self.__options = options
+        self.__children = children or {}
 
-    @classmethod
-    def __complete(cls, text, cmd, with_params=False):
+    def __load(self):
+        if self.__commands is not None:
+            return
+        # imported here so that completion from a saved index loads no commands
+        from katello.client.core.base import CommandContainer
+        if isinstance(self.__command, CommandContainer):
+            self.__commands = sorted(self.__command.get_command_names())
+        else:
+            self.__commands = []
+        self.__options = sorted(self.__command.create_parser().get_long_options())
 
-        completions = cls.__get_possible_completions(cmd, with_params)
-        return [a for a in completions if a.startswith(text)]
+    @property
+    def commands(self):
+        """
+        :rtype: list of strings
+        """
+        self.__load()
+        return self.__commands
+
+    @property
+    def options(self):
+        """
+        :rtype: list of strings
+        """
+        self.__load()
+        return self.__options
+
+    def child(self, name):
+        """
+        :return: node of the subcommand or None if there's no such subcommand
+        """
+        if name not in self.commands:
+            return None
+        if name not in self.__children:
+            self.__children[name] = CompletionNode(self.__command.get_command(name))
+        return self.__children[name]
+
+    def to_dict(self):
+        """
+        Build the whole subtree and return it as nested dicts
+        """
+        return {
+            'commands': dict([(name, self.child(name).to_dict()) for name in self.commands]),
+            'options': self.options
+        }
 
     @classmethod
-    def __get_possible_completions(cls, cmd, with_params=False):
+    def from_dict(cls, data):
+        children = dict([(name, cls.from_dict(child)) for name, child in data['commands'].items()])
+        return cls(commands=sorted(children.keys()), options=data['options'], children=children)
+
+
+class Completion(object):
+    """
+    Completes commands and options of the cli. The completion trie is
+    built from the command tree on demand and memoized, or loaded from
+    an index saved by a previous run.
+    """
+
+    def __init__(self, admin_cli=None, root=None, values=None):
         """
-        Return all possible subcommands and options that can be used to complete
-        strings after a command cmd.
+        :type admin_cli: KatelloCLI
+        :param admin_cli: root command the trie is built from
+        :type root: CompletionNode
+        :param root: prebuilt trie
+        :type values: ValueCompletion
+        :param values: completion of option values, None to complete
+            commands and options only
         """
-        completions = []
-        if isinstance(cmd, CommandContainer):
-            completions += cmd.get_command_names()
-        if with_params:
-            completions += cmd.create_parser().get_long_options()
-        return completions
+        self.admin_cli = admin_cli
+        self.values = values
+        self.__root = root
 
+    @property
+    def root(self):
+        if self.__root is None:
+            self.__root = CompletionNode(self.admin_cli)
+        return self.__root
 
-    def __get_command(self, names):
+    @classmethod
+    def __complete(cls, text, node, with_params=False):
+        completions = list(node.commands)
+        if with_params:
+            completions += node.options
+        return [a for a in completions if a.startswith(text)]
+
+    def __get_node(self, names):
         """
-        Return instance of last command used on the line. Names represent
+        Return node of the last command used on the line. Names represent
         list of commands on the line.
         """
-        cmd = self.admin_cli
+        node = self.root
         for name in names:
-            if isinstance(cmd, CommandContainer):
-                if name in cmd.get_command_names():
-                    cmd = cmd.get_command(name)
-        return cmd
-
+            child = node.child(name)
+            if child is not None:
+                node = child
+        return node
 
-    def __parse_line(self, line):
+    def complete(self, line):
+        """
+        Return the next possible completion for 'line'.
+        """
+        if line.endswith("="):
+            # value of '--option=' is completed like the one of '--option '
+            line = line[:-1] + " "
         line_parts = parse_tokens(line)
-
         if line.endswith(" ") or not len(line):
-            last_word = ""
-            cmd = self.__get_command(line_parts)
+            last_word, preceding = "", line_parts
         else:
-            last_word = line_parts[-1]
-            cmd = self.__get_command(line_parts[:-1])
-        return (last_word, cmd)
+            last_word, preceding = line_parts[-1], line_parts[:-1]
 
+        if self.values is not None and preceding and self.values.completes(preceding[-1]):
+            return self.values.complete(preceding[-1], last_word, line_parts)
 
-    def complete(self, line):
+        node = self.__get_node(preceding)
+        return self.__complete(last_word, node, with_params=True)
+
+    def save(self, path):
         """
-        Return the next possible completion for 'line'.
+        Build the whole completion trie and store it into a file. The file
+        is replaced atomically so that concurrent runs never read a partial one.
+        """
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(self.root.to_dict(), f)
+            finally:
+                f.close()
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """
+        :return: Completion using the trie saved in the file, None when
+            the file is missing or corrupted
+        """
+        try:
+            f = open(path)
+            try:
+                return cls(root=CompletionNode.from_dict(json.load(f)))
+            finally:
+                f.close()
+        except (IOError, ValueError, KeyError, AttributeError, TypeError):
+            return None
+
+
+def client_fingerprint():
+    """
+    Identifies the installed version of the cli commands. Any change of
+    the command modules gives a different fingerprint, so a saved completion
+    index is never used with commands it wasn't built from.
+
+    :rtype: string
+    """
+    client_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.join(client_dir, 'main.py')] + glob.glob(os.path.join(client_dir, 'core', '*.py'))
+    digest = hashlib.md5()
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update("%s %d %d\n" % (os.path.basename(path), stat.st_size, stat.st_mtime))
+    return digest.hexdigest()
+
+
+def index_path(directory, mode):
+    """
+    :return: path of the completion index for the installed cli and katello mode
+    """
+    return os.path.join(directory, 'completion-%s-%s.json' % (mode, client_fingerprint()))
+
+
+def cached_completion(directory, mode, create_cli):
+    """
+    Completion from the index saved in the directory. When there's no index
+    for the installed cli yet, the command tree is created and the index
+    is saved, replacing indexes of other versions.
+
+    :type directory: string
+    :param directory: directory the index is stored in (eg. ~/.katello)
+    :type mode: string
+    :param mode: katello or headpin, the modes have different commands
+    :type create_cli: function
+    :param create_cli: function returning the root command with all the commands set up
+    """
+    path = index_path(directory, mode)
+    completion = Completion.load(path)
+    if completion is not None:
+        return completion
+
+    completion = Completion(create_cli())
+    try:
+        for old_path in glob.glob(os.path.join(directory, 'completion-%s-*.json' % mode)):
+            os.remove(old_path)
+        completion.save(path)
+    except (IOError, OSError):
+        pass
+    return completion
+
+
+class ValueCache(object):
+    """
+    Values of options fetched from the server. Lookups never wait for the
+    network: they return the values known so far, possibly stale or none at
+    all, and values older than ttl are refreshed in a background thread.
+    At most one refresh of a key runs at a time, failed refreshes keep
+    the stale values.
+
+    :ivar ttl: number of seconds the values are fresh for
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        # key -> (values, time of the fetch)
+        self.__entries = {}
+        self.__refreshing = set()
+        self.__lock = threading.Lock()
+
+    def get(self, key, fetch):
+        """
+        :type fetch: function
+        :param fetch: function without arguments returning fresh values of the key
+        :return: list of the values known for the key
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__entries.get(key)
+            refresh = (entry is None or entry[1] + self.ttl < time.time()) and key not in self.__refreshing
+            if refresh:
+                self.__refreshing.add(key)
+        finally:
+            self.__lock.release()
+
+        if refresh:
+            ContextThread(self.__refresh, (key, fetch)).start()
+        if entry is None:
+            return []
+        return entry[0]
+
+    def __refresh(self, key, fetch):
+        values = None
+        try:
+            try:
+                values = list(fetch())
+            except Exception, e:
+                _log.debug("refresh of completion values %s failed: %s" % (key, e))
+        finally:
+            self.__lock.acquire()
+            try:
+                if values is not None:
+                    self.__entries[key] = (values, time.time())
+                self.__refreshing.discard(key)
+            finally:
+                self.__lock.release()
+
+    def refreshing(self):
+        """
+        :return: number of refreshes in progress
+        """
+        self.__lock.acquire()
+        try:
+            return len(self.__refreshing)
+        finally:
+            self.__lock.release()
+
+
+def _names(items):
+    return sorted(set([item['name'] for item in items]))
+
+
+def fetch_organizations(context):
+    from katello.client.api.organization import OrganizationAPI
+    return _names(OrganizationAPI().organizations())
+
+
+def fetch_environments(context):
+    from katello.client.api.environment import EnvironmentAPI
+    return _names(EnvironmentAPI().environments_by_org(context['org']))
+
+
+def fetch_products(context):
+    from katello.client.api.product import ProductAPI
+    return _names(ProductAPI().products_by_org(context['org']))
+
+
+def fetch_content_views(context):
+    from katello.client.api.content_view import ContentViewAPI
+    return _names(ContentViewAPI().content_views_by_org(context['org']))
+
+
+def fetch_repositories(context):
+    from katello.client.api.repo import RepoAPI
+    from katello.client.api.utils import get_environment
+    environment = get_environment(context['org'], context.get('environment'))
+    return _names(RepoAPI().repos_by_org_env(context['org'], environment['id']))
+
+
+class ValueCompletion(object):
+    """
+    Completes values of options naming entities on the server
+    (organizations, environments, ...). The values come from a ValueCache,
+    values of options scoped by an organization are fetched only when
+    the organization is present on the line.
+    """
+
+    # option -> (function taking the context and fetching the values,
+    #            names of the options the values depend on)
+    SOURCES = {
+        '--org': (fetch_organizations, ()),
+        '--environment': (fetch_environments, ('org',)),
+        '--product': (fetch_products, ('org',)),
+        '--content_view': (fetch_content_views, ('org',)),
+        '--repo': (fetch_repositories, ('org', 'environment')),
+    }
+    # options that can't be completed without a value of the option
+    REQUIRED_CONTEXT = ('org',)
+
+    def __init__(self, cache=None):
         """
-        last_word, cmd = self.__parse_line(line)
-        return self.__complete(last_word, cmd, with_params=True)
+        :type cache: ValueCache
+        """
+        self.cache = cache or ValueCache()
+
+    def completes(self, option):
+        return option in self.SOURCES
 
+    @classmethod
+    def context(cls, line_parts):
+        """
+        :param line_parts: tokens of the line as returned by parse_tokens,
+            which splits '--option=value' into two tokens
+        :return: dict of values of the options on the line, eg. {'org': 'ACME'}
+        """
+        context = {}
+        for i, part in enumerate(line_parts[:-1]):
+            if part.startswith('--') and not line_parts[i + 1].startswith('-'):
+                context[part[2:]] = line_parts[i + 1]
+        return context
 
+    def values(self, option, line_parts):
+        """
+        :return: list of the values known for the option on the line
+        """
+        fetch, depends_on = self.SOURCES[option]
+        context = self.context(line_parts)
+        for name in self.REQUIRED_CONTEXT:
+            if name in depends_on and not context.get(name):
+                return []
+        key = (option,) + tuple([context.get(name) for name in depends_on])
+        return self.cache.get(key, lambda: fetch(context))
+
+    def complete(self, option, text, line_parts):
+        return [value for value in self.values(option, line_parts) if value.startswith(text)]
+
+    def prefetch(self):
+        """
+        Start fetching the organizations so that they're ready for the first completion
+        """
+        self.values('--org', [])
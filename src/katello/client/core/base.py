@@ -16,24 +16,27 @@
 import os
 import sys
 from katello.client.i18n_optparse import OptionParser, OptionParserExitError
-from M2Crypto import SSL
-from socket import error as SocketError
+from socket import error as SocketError, timeout as SocketTimeout
 from urlparse import urlparse
 
 from katello.client.config import Config
 from katello.client.api.utils import ApiDataError
 from katello.client.lib.control import parse_tokens, SystemExitRequest
-from katello.client.lib.ui.printer import Printer, GrepStrategy, VerboseStrategy
+from katello.client.lib.ui.printer import Printer, GrepStrategy, VerboseStrategy, OUTPUT_STRATEGIES
 from katello.client.lib.utils.option_validator import OptionValidator
 from katello.client.lib.utils.encoding import u_str, u_obj
+from katello.client.lib.utils.deadline import DeadlineExceeded
 from katello.client.logutil import getLogger
-from katello.client.server import ServerRequestError
+from katello.client.server import ServerRequestError, loaded_errors
 
 from copy import copy
 from optparse import Option, OptionValueError
 
 _log = getLogger(__name__)
 
+# exit code of commands that ran out of time
+EX_TIMEOUT = os.EX_TEMPFAIL
+
 # base command class ----------------------------------------------------------
 #
 # NOTE: If you are adding or removing Commands and Actions you
@@ -47,6 +50,44 @@ _log = getLogger(__name__)
 class CommandException(Exception):
     pass
 
+class LazyCommand(object):
+    """
+    Placeholder for a command or action registered by the dotted path
+    of its class. The module is imported and the class instantiated first
+    when the command is looked up in its container, so that running one
+    action doesn't import modules of all the others.
+    """
+
+    def __init__(self, path, *args, **kwargs):
+        """
+        :param path: dotted path of the class, eg. 'katello.client.core.ping.Status'
+        :type path: string
+        :param args: arguments the class is instantiated with
+        :param kwargs: keyword arguments the class is instantiated with
+        """
+        self.path = path
+        self.args = args
+        self.kwargs = kwargs
+        self.subcommands = []
+
+    def add_command(self, name, command):
+        """
+        Register a subcommand that is added to the command once it is loaded
+        """
+        self.subcommands.append((name, command))
+
+    def load(self):
+        """
+        :rtype: Action|Command
+        :return: instance of the class with the registered subcommands
+        """
+        module_name, class_name = self.path.rsplit('.', 1)
+        module = __import__(module_name, fromlist=[class_name])
+        command = getattr(module, class_name)(*self.args, **self.kwargs)
+        for name, subcommand in self.subcommands:
+            command.add_command(name, subcommand)
+        return command
+
 class CommandContainer(object):
     """
     Container that can hold commands and actions.
@@ -61,8 +102,8 @@ class CommandContainer(object):
 
         :param name: a name undher which the command/action will be registered
         :type name: string
-        :param command:
-        :type command: Action|Command
+        :param command: the command or a placeholder loaded on first use
+        :type command: Action|Command|LazyCommand
         """
         self.__subcommands[name] = command
 
@@ -85,7 +126,10 @@ class CommandContainer(object):
         :return: command or action registered under the given name
         """
         if name in self.__subcommands:
-            return self.__subcommands[name]
+            command = self.__subcommands[name]
+            if isinstance(command, LazyCommand):
+                command = self.__subcommands[name] = command.load()
+            return command
         raise CommandException(_("Command not found"))
 
 
@@ -137,7 +181,9 @@ class Action(object):
         """
         parser = OptionParser(option_class=KatelloOption)
         self.setup_parser(parser)
-        parser.set_usage(self.usage(command_name, parent_usage))
+        # usage of commands lists descriptions of all subcommands, it is
+        # built only when it is printed
+        parser.set_usage(lambda: self.usage(command_name, parent_usage))
         return parser
 
     @classmethod
@@ -342,6 +388,10 @@ class BaseAction(Action):
         parser.add_option('--noheading', dest='noheading',
                         action="store_true", default=False,
                         help=_("Suppress any heading output. Useful if grepping the output."))
+        parser.add_option('--output', dest='output',
+                        type="choice", choices=sorted(OUTPUT_STRATEGIES.keys()), case_sensitive=False,
+                        help=_("output format (%s), json prints an object per line, csv follows RFC 4180")
+                            % ", ".join(sorted(OUTPUT_STRATEGIES.keys())))
         return parser
 
     def create_printer(self, strategy):
@@ -349,7 +399,16 @@ class BaseAction(Action):
 
     def __print_strategy(self):
         Config()
-        if (self.has_option('grep') or (Config.parser.has_option('interface', 'force_grep_friendly') \
+        output = self.get_option('output')
+        if output is None and not (self.has_option('grep') or self.has_option('verbose')) \
+            and Config.parser.has_option('interface', 'output'):
+            output = Config.parser.get('interface', 'output').lower()
+
+        if output == 'grep':
+            return GrepStrategy(delimiter=self.get_option('delimiter'))
+        elif output in OUTPUT_STRATEGIES:
+            return OUTPUT_STRATEGIES[output]()
+        elif (self.has_option('grep') or (Config.parser.has_option('interface', 'force_grep_friendly') \
             and Config.parser.get('interface', 'force_grep_friendly').lower() == 'true')):
             return GrepStrategy(delimiter=self.get_option('delimiter'))
         elif (self.has_option('verbose') or (Config.parser.has_option('interface', 'force_verbose') \
@@ -358,6 +417,17 @@ class BaseAction(Action):
         else:
             return None
 
+    @classmethod
+    def stream_lists(cls):
+        """
+        Whether long lists should be printed while they are being downloaded
+        instead of after the whole response was decoded. Enabled with
+        stream_lists in the [interface] section of the config.
+        """
+        Config()
+        return Config.parser.has_option('interface', 'stream_lists') \
+            and Config.parser.get('interface', 'stream_lists').lower() == 'true'
+
     @classmethod
     def load_saved_options(cls, parser):
         Config()
@@ -389,7 +459,7 @@ class BaseAction(Action):
             self.setup_action(args, command_name, parent_usage)
             return self.run()
 
-        except SSL.Checker.WrongHost, wh:
+        except loaded_errors('M2Crypto.SSL.Checker', 'WrongHost'), wh:
             print _("ERROR: The server hostname you have configured in /etc/katello/client.conf does not match the")
             print _("hostname returned from the katello server you are connecting to.  ")
             print ""
@@ -421,6 +491,14 @@ class BaseAction(Action):
             self.error(msg)
             return re.args[0]
 
+        except DeadlineExceeded, de:
+            self.error(_("The command did not finish in %g seconds") % de.args[0])
+            return EX_TIMEOUT
+
+        except SocketTimeout:
+            self.error(_("Timed out waiting for the server"))
+            return EX_TIMEOUT
+
         except SocketError, se:
             self.error(se.args[1])
             return se.args[0]
@@ -504,6 +582,16 @@ def check_url(option, opt, value):
         raise OptionValueError(_('option %s: invalid format') % (opt))
     return value
 
+def check_positive_int(option, opt, value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise OptionValueError(_("option %(opt)s: invalid positive integer value: %(value)r")
+            % {'opt':opt, 'value':value})
+    return number
+
 def check_ip(option, opt, value):
 
     def raise_exception():
@@ -588,6 +676,13 @@ class KatelloOption(Option):
         :return type:       string
         :arguments:         none
 
+    **positive_int**
+        Parses integers greater than zero, eg. sizes and limits.
+
+        :allowed values:    string with a positive integer
+        :return type:       int
+        :arguments:         none
+
     """
 
 
@@ -612,6 +707,9 @@ class KatelloOption(Option):
     TYPE_CHECKER["ip"] = check_ip
     TYPES += ("ip", )
 
+    TYPE_CHECKER["positive_int"] = check_positive_int
+    TYPES += ("positive_int", )
+
     def get_name(self):
         return self.get_opt_string().lstrip('-')
 
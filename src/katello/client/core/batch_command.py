@@ -0,0 +1,63 @@
+#
+# Katello Organization actions
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+import os
+
+from katello.client.batch import Batch, read_script, read_commands, plan_stages, session_cli
+from katello.client.core.base import BaseAction
+from katello.client.lib.control import system_exit
+
+
+# batch action ------------------------------------------------------------
+
+class BatchAction(BaseAction):
+
+    description = _('run commands read from a file or the standard input')
+
+    def __init__(self, cli):
+        super(BatchAction, self).__init__()
+        self.admin = cli
+
+    def setup_parser(self, parser):
+        parser.add_option('--file', dest='file',
+            help=_("file with one command per line, e.g. 'org list', lines starting with # are skipped,"
+                " 'wait' waits for the previous commands to finish (default: standard input)"))
+        parser.add_option('--parallel', dest='parallel', type="positive_int", default=1,
+            help=_("number of commands run at the same time, output of each command is printed"
+                " once it finished (default: 1)"))
+
+    def run(self):
+        path = self.get_option('file')
+        try:
+            lines = read_script(path)
+        except IOError:
+            system_exit(os.EX_IOERR, _("File %s does not exist") % path)
+        stages = plan_stages(read_commands(lines))
+        batch = Batch(lambda: session_cli(self.admin), self.get_option('parallel'))
+        results = [{'line': result.line, 'exit_code': result.exit_code, 'command': result.command}
+            for result in batch.run_stages(stages)]
+        failed = [result for result in results if result['exit_code'] != os.EX_OK]
+
+        self.printer.add_column('line', _("Line"))
+        self.printer.add_column('exit_code', _("Exit Code"))
+        self.printer.add_column('command', _("Command"))
+        self.printer.set_header(_("Batch Report: %(failed)d of %(total)d commands failed")
+            % {'failed': len(failed), 'total': len(results)})
+        self.printer.print_items(results)
+
+        if failed:
+            return failed[0]['exit_code']
+        return os.EX_OK
@@ -22,7 +22,8 @@ from katello.client.api.changeset import ChangesetAPI
 from katello.client.cli.base import opt_parser_add_org, opt_parser_add_environment
 from katello.client.core.base import BaseAction, Command
 
-from katello.client.api.utils import get_environment, get_changeset, get_content_view
+from katello.client.api.utils import get_environment, get_changeset, get_content_view, \
+        invalidate_lookups
 from katello.client.lib.async import AsyncTask, evaluate_task_status
 from katello.client.lib.ui.progress import run_spinner_in_bg, wait_for_async_task
 from katello.client.lib.utils.data import test_record
@@ -351,6 +352,8 @@ class Apply(ChangesetAction):
         task = AsyncTask(task)
 
         run_spinner_in_bg(wait_for_async_task, [task], message=_("Applying the changeset, please wait... "))
+        invalidate_lookups('product')
+        invalidate_lookups('content_view')
 
         return evaluate_task_status(task,
             failed = _("Changeset [ %s ] promotion failed") % csName,
@@ -22,7 +22,7 @@ from katello.client.cli.base import opt_parser_add_org, \
         opt_parser_add_environment
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import get_environment, get_content_view, \
-        get_library
+        get_library, invalidate_lookups
 from katello.client.lib.async import AsyncTask, evaluate_task_status
 from katello.client.lib.ui.progress import run_spinner_in_bg, wait_for_async_task
 
@@ -163,6 +163,7 @@ class Promote(ContentViewAction):
         env_id = environment["id"]
 
         task = self.api.promote(view["id"], env_id)
+        invalidate_lookups('content_view')
 
         if not async:
             task = AsyncTask(task)
@@ -210,6 +211,7 @@ class Refresh(ContentViewAction):
         view = get_content_view(org_name, view_label, view_name, view_id)
 
         task = self.api.refresh(view["id"])
+        invalidate_lookups('content_view')
 
         if not async:
             task = AsyncTask(task)
@@ -258,6 +260,7 @@ class Delete(ContentViewAction):
             return os.EX_DATAERR
         else:
             self.api.delete(org_name, view["id"])
+            invalidate_lookups('content_view')
             print _("Content view [ %s ] was successfully deleted.") % (view["name"])
             return os.EX_OK
 
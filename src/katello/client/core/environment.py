@@ -20,7 +20,7 @@ from katello.client.api.environment import EnvironmentAPI
 from katello.client.cli.base import opt_parser_add_org
 from katello.client.core.base import BaseAction, Command
 from katello.client.lib.utils.data import test_record
-from katello.client.api.utils import get_environment
+from katello.client.api.utils import get_environment, invalidate_lookups
 from katello.client.lib.ui.printer import batch_add_columns
 
 
@@ -80,7 +80,7 @@ class Info(EnvironmentAction):
         orgName = self.get_option('org')
         envName = self.get_option('name')
 
-        env = get_environment(orgName, envName)
+        env = get_environment(orgName, envName, refresh=True)
 
         self.printer.add_column('id', _("ID"))
         self.printer.add_column('name', _("Name"))
@@ -125,6 +125,7 @@ class Create(EnvironmentAction):
         priorId = self.get_prior_id(orgName, priorName)
 
         env = self.api.create(orgName, name, label, description, priorId)
+        invalidate_lookups('environment')
         test_record(env,
             _("Successfully created environment [ %s ]") % name,
             _("Could not create environment [ %s ]") % name
@@ -171,6 +172,7 @@ class Update(EnvironmentAction):
             envName = newName
 
         env = self.api.update(orgName, env["id"], envName, description, priorId)
+        invalidate_lookups('environment')
         print _("Successfully updated environment [ %s ]") % env['name']
         return os.EX_OK
 
@@ -196,6 +198,7 @@ class Delete(EnvironmentAction):
         env = get_environment(orgName, envName)
 
         self.api.delete(orgName, env["id"])
+        invalidate_lookups('environment')
         print _("Successfully deleted environment [ %s ]") % envName
         return os.EX_OK
 
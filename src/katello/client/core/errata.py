@@ -20,7 +20,7 @@ from katello.client.api.errata import ErrataAPI
 from katello.client.api.system import SystemAPI
 from katello.client.api.system_group import SystemGroupAPI
 from katello.client.cli.base import opt_parser_add_product, opt_parser_add_org, \
-        opt_parser_add_environment, opt_parser_add_content_view
+        opt_parser_add_environment, opt_parser_add_content_view, opt_parser_add_paging
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import get_repo, get_environment, get_product, \
     get_system_group, get_system
@@ -58,6 +58,7 @@ class List(ErrataAction):
                       help=_("filter errata by type eg: enhancements"))
         parser.add_option('--severity', dest='severity',
                       help=_("filter errata by severity"))
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         validator.require_at_least_one_of(('repo', 'repo_id'))
@@ -99,7 +100,8 @@ class List(ErrataAction):
 
 
         errata = self.api.errata_filter(repo_id=repo_id, environment_id=env_id, type_in=self.get_option('type'),
-            severity=self.get_option('severity'), prod_id=prod_id)
+            severity=self.get_option('severity'), prod_id=prod_id,
+            page_size=self.get_option('page_size'), limit=self.get_option('limit'))
 
         self.printer.set_header(_("Errata List"))
         self.printer.print_items(errata)
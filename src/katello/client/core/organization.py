@@ -19,6 +19,7 @@ import os
 from katello.client.api.organization import OrganizationAPI
 from katello.client.api.product import ProductAPI
 from katello.client.api.organization_default_info import OrganizationDefaultInfoAPI
+from katello.client.api.utils import invalidate_lookups
 from katello.client.core.base import BaseAction, Command
 from katello.client.lib.async import AsyncTask, evaluate_task_status
 from katello.client.lib.ui.progress import run_spinner_in_bg, wait_for_async_task
@@ -79,6 +80,7 @@ class Create(OrganizationAction):
         description = self.get_option('description')
 
         org = self.api.create(name, label, description)
+        invalidate_lookups('organization')
         test_record(org,
             _("Successfully created org [ %s ]") % name,
             _("Could not create org [ %s ]") % name
@@ -136,6 +138,7 @@ class Delete(OrganizationAction):
         name = self.get_option('name')
 
         task = self.api.delete(name)
+        invalidate_lookups('organization')
         task = AsyncTask(task)
 
         run_spinner_in_bg(wait_for_async_task, [task], message=_("Deleting the organization, please wait... "))
@@ -175,6 +178,7 @@ class Update(OrganizationAction):
             updates['service_level'] = sla
 
         response = self.api.update(name, updates)
+        invalidate_lookups('organization')
 
         test_record(response,
             _("Successfully updated organization [ %s ]") % name,
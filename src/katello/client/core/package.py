@@ -18,7 +18,7 @@ import os
 
 from katello.client.api.package import PackageAPI
 from katello.client.cli.base import opt_parser_add_product, opt_parser_add_org, \
-        opt_parser_add_environment, opt_parser_add_content_view
+        opt_parser_add_environment, opt_parser_add_content_view, opt_parser_add_paging
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import get_repo
 from katello.client.lib.ui import printer
@@ -106,6 +106,7 @@ class List(PackageAction):
         opt_parser_add_environment(parser, default="Library")
         opt_parser_add_product(parser)
         opt_parser_add_content_view(parser)
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         if not validator.exists('repo_id'):
@@ -121,7 +122,8 @@ class List(PackageAction):
 
         self.printer.set_header(_("Package List For Repo %s") % repoId)
 
-        packages = self.api.packages_by_repo(repoId)
+        packages = self.api.packages_by_repo(repoId, stream=self.stream_lists(),
+            page_size=self.get_option('page_size'), limit=self.get_option('limit'))
         self.print_packages(packages)
 
         return os.EX_OK
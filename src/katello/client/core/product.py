@@ -22,7 +22,7 @@ from katello.client.core.repo import ALLOWED_REPO_URL_SCHEMES
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.product import ProductAPI
 from katello.client.api.repo import RepoAPI
-from katello.client.api.utils import get_provider, get_product, get_sync_plan
+from katello.client.api.utils import get_provider, get_product, get_sync_plan, invalidate_lookups
 from katello.client.lib.async import AsyncTask, evaluate_task_status
 from katello.client.lib.ui import printer
 from katello.client.lib.ui.formatters import format_sync_state, format_sync_time
@@ -88,6 +88,7 @@ class SetSyncPlan(SingleProductAction):
         plan = get_sync_plan(orgName, planName)
 
         msg = self.api.set_sync_plan(orgName, prod['id'], plan['id'])
+        invalidate_lookups('product')
         print msg
         return os.EX_OK
 
@@ -107,6 +108,7 @@ class RemoveSyncPlan(SingleProductAction):
         prod = get_product(orgName, prodName, prodLabel, prodId)
 
         msg = self.api.remove_sync_plan(orgName, prod['id'])
+        invalidate_lookups('product')
         print msg
         return os.EX_OK
 
@@ -202,7 +204,7 @@ class Status(SingleProductAction):
         prodLabel   = self.get_option('label')
         prodId      = self.get_option('id')
 
-        prod = get_product(orgName, prodName, prodLabel, prodId)
+        prod = get_product(orgName, prodName, prodLabel, prodId, refresh=True)
 
         task = AsyncTask(self.api.last_sync_status(orgName, prod['id']))
 
@@ -283,6 +285,7 @@ class Create(ProductAction):
         prov = get_provider(orgName, provName)
 
         prod = self.api.create(prov["id"], name, label, description, gpgkey)
+        invalidate_lookups('product')
         print _("Successfully created product [ %s ]") % name
 
         if url == None:
@@ -410,6 +413,7 @@ class Update(SingleProductAction):
         prod = get_product(orgName, prodName, prodLabel, prodId)
 
         prod = self.api.update(orgName, prod["id"], description, gpgkey, nogpgkey, gpgkey_recursive)
+        invalidate_lookups('product')
         print _("Successfully updated product [ %s ]") % prod["name"]
         return os.EX_OK
 
@@ -427,6 +431,7 @@ class Delete(SingleProductAction):
         product = get_product(orgName, prodName, prodLabel, prodId)
 
         msg = self.api.delete(orgName, product["id"])
+        invalidate_lookups('product')
         print msg
         return os.EX_OK
 
@@ -29,7 +29,7 @@ from katello.client.lib.utils.data import test_record
 from katello.client.lib.ui.formatters import format_sync_state, format_sync_time
 from katello.client.lib.ui.progress import ProgressBar
 from katello.client.lib.ui import printer
-from katello.client.api.utils import get_provider
+from katello.client.api.utils import get_provider, invalidate_lookups
 
 
 
@@ -180,6 +180,7 @@ class Delete(SingleProviderAction):
         prov = get_provider(orgName, provName)
 
         msg = self.api.delete(prov["id"])
+        invalidate_lookups('product')
         print msg
         return os.EX_OK
 
@@ -21,7 +21,10 @@ from katello.client import constants
 from katello.client.api.repo import RepoAPI
 from katello.client.api.organization import OrganizationAPI
 from katello.client.api.content_upload import ContentUploadAPI
-from katello.client.api.utils import get_environment, get_product, get_repo, get_content_view
+from katello.client.api.package import PackageAPI
+from katello.client.api.puppet_module import PuppetModuleAPI
+from katello.client.api.utils import get_environment, get_product, get_repo, get_content_view, \
+    invalidate_lookups
 from katello.client.cli.base import opt_parser_add_product, opt_parser_add_org, \
         opt_parser_add_environment, opt_parser_add_content_view
 from katello.client.core.base import BaseAction, Command
@@ -31,11 +34,13 @@ from katello.client.lib.async import AsyncTask, evaluate_task_status
 from katello.client.lib.utils.encoding import u_str
 from katello.client.lib.ui import printer
 from katello.client.lib.ui.printer import batch_add_columns
-from katello.client.lib.ui.progress import ProgressBar, run_async_task_with_status, run_spinner_in_bg
+from katello.client.lib.ui.progress import ProgressBar, TransferProgressBar, run_async_task_with_status, \
+    run_spinner_in_bg, format_size
 from katello.client.lib.ui.progress import wait_for_async_task
 from katello.client.lib.ui.formatters import format_sync_errors, format_sync_time, format_sync_state
 from katello.client.lib.rpm_utils import generate_rpm_data, InvalidRPMError
 from katello.client.lib.puppet_utils import generate_puppet_data, ExtractionException
+from katello.client.lib.upload import ChunkedUploader, UploadPipeline, ContentIndex
 
 
 ALLOWED_REPO_URL_SCHEMES = ("http", "https", "ftp", "file")
@@ -163,6 +168,7 @@ class Create(RepoAction):
         product = get_product(orgName, prodName, prodLabel, prodId)
         self.api.create(orgName, product["id"], name, label, url, unprotected,
                         gpgkey, nogpgkey, content_type)
+        invalidate_lookups('repo')
         print _("Successfully created repository [ %s ]") % name
 
         return os.EX_OK
@@ -275,6 +281,7 @@ class Discovery(RepoAction):  # pylint: disable=R0904
             if label:
                 repoLabel = self.repository_name(label, parsedUrl.path) # pylint: disable=E1101
             self.api.create(orgName, productid, repoName, repoLabel, repourl, unprotected, None, None)
+            invalidate_lookups('repo')
             print _("Successfully created repository [ %s ]") % repoName
 
     @classmethod
@@ -379,6 +386,7 @@ class Update(SingleRepoAction):
         url = self.get_option('url')
 
         self.api.update(repo['id'], gpgkey, nogpgkey, url)
+        invalidate_lookups('repo')
         print _("Successfully updated repository [ %s ]") % repo['name']
         return os.EX_OK
 
@@ -432,6 +440,7 @@ class Enable(SingleRepoAction):
         repo = self.get_repo(True)
 
         msg = self.api.enable(repo["id"], self._enable)
+        invalidate_lookups('repo')
         print msg
 
         return os.EX_OK
@@ -512,6 +521,7 @@ class Delete(SingleRepoAction):
         repo = self.get_repo()
 
         msg = self.api.delete(repo["id"])
+        invalidate_lookups('repo')
         print msg
         return os.EX_OK
 
@@ -526,19 +536,9 @@ class ContentUpload(SingleRepoAction):
 
     @classmethod
     def get_content_data(cls, content_type, filepath):
-        unit_key = metadata = None
-        if content_type == "yum":
-            try:
-                unit_key, metadata = generate_rpm_data(filepath)
-            except InvalidRPMError:
-                print _("Invalid rpm '%s'. Please check the file and try again.") % filepath
-        elif content_type == "puppet":
-            try:
-                unit_key, metadata = generate_puppet_data(filepath)
-            except ExtractionException:
-                print _("Invalid puppet module '%s'. Please make sure the file is valid and is named " +
-                        "author-name-version.tar.gz (eg: puppetlabs-ntp-2.0.1.tar.gz).") % filepath
-
+        __, unit_key, metadata, error = extract_content_data((content_type, filepath))
+        if error is not None:
+            print error
         return unit_key, metadata
 
     def setup_parser(self, parser):
@@ -550,6 +550,11 @@ class ContentUpload(SingleRepoAction):
                           help=_("type of content to upload (puppet or yum, required)"))
         parser.add_option('--chunk', dest='chunk',
                           help=_("number of bytes to send to server at a time (default is 1048575)"))
+        parser.add_option('--workers', dest='workers', type='int', default=UploadPipeline.DEFAULT_WORKERS,
+                          help=_("number of files processed at a time when uploading a directory (default is %d)")
+                          % UploadPipeline.DEFAULT_WORKERS)
+        parser.add_option('--skip-existing', dest='skip_existing', action='store_true', default=False,
+                          help=_("don't upload content that is already in the repository"))
 
         opt_parser_add_org(parser, required=1)
         opt_parser_add_environment(parser, default="Library")
@@ -581,35 +586,74 @@ class ContentUpload(SingleRepoAction):
         if not self._valid_upload_type(repo_id, content_type):
             return os.EX_DATAERR
 
-        paths = []
+        is_present = None
+        if self.get_option('skip_existing'):
+            is_present = self.present_units(repo_id, content_type)
+
         if os.path.isdir(filepath):
-            for dirname, __, filenames in os.walk(filepath):
-                paths = [os.path.join(dirname, filename) for filename in filenames]
-        elif os.path.isfile(filepath):
-            paths = [filepath]
-        else:
+            return self.upload_directory(repo_id, content_type, filepath, chunk, self.get_option('workers'),
+                                         is_present)
+        elif not os.path.isfile(filepath):
             print _("Invalid path '%s'.") % filepath
             return os.EX_DATAERR
 
-        uploads = []
-        for path in paths:
-            try:
-                upload = self.send_file(path, repo_id, content_type, chunk)
-                uploads.append(upload)
-            except FileUploadError:
-                if len(paths) > 1:
-                    print _("Skipping file '%s'.") % path
+        try:
+            upload = self.send_file(filepath, repo_id, content_type, chunk, is_present)
+        except FileUploadError:
+            return os.EX_DATAERR
+
+        if upload is None:
+            print _("Content of '%s' is already in the repository.") % filepath
+            return os.EX_OK
 
-        if uploads:
-            run_spinner_in_bg(self.upload_api.import_into_repo, [repo_id, uploads],
-                              message=_("Importing content into repository"))
+        run_spinner_in_bg(self.upload_api.import_into_repo, [repo_id, [upload]],
+                          message=_("Importing content into repository"))
 
-            self.remove_uploads(repo_id, uploads)
+        self.remove_uploads(repo_id, [upload])
 
-            print _("Successfully imported content into repository.")
-            return os.EX_OK
-        else:
+        print _("Successfully imported content into repository.")
+        return os.EX_OK
+
+    def upload_directory(self, repo_id, content_type, directory, chunk, workers, is_present=None):
+        index = ContentIndex()
+        pipeline = UploadPipeline(self.upload_api, repo_id, content_type, extract_content_data,
+                                  workers=workers, chunk_size=chunk, index=index, is_present=is_present)
+        paths = pipeline.discover(directory)
+        progress = TransferProgressBar(sum([os.path.getsize(path) for path in paths]),
+                                       _("Uploading %d files to server ") % len(paths))
+        try:
+            imported = pipeline.run(paths, progress)
+        finally:
+            progress.done()
+            index.save()
+
+        print _("Stage timings:")
+        for stage, wall, busy in pipeline.times.summary():
+            print _("  %(stage)-10s %(wall)8.2fs elapsed %(busy)8.2fs busy") % \
+                {'stage': stage, 'wall': wall, 'busy': busy}
+        if index.hits:
+            print _("Unchanged files not read again: %(count)d (%(size)s)") % \
+                {'count': index.hits, 'size': format_size(index.bytes_saved)}
+        if pipeline.present:
+            print _("Files already in the repository not uploaded: %(count)d (%(size)s)") % \
+                {'count': len(pipeline.present), 'size': format_size(pipeline.bytes_present)}
+
+        if not imported and not pipeline.present:
             return os.EX_DATAERR
+        print _("Successfully imported %d files into repository.") % imported
+        return os.EX_OK
+
+    def present_units(self, repo_id, content_type):
+        """
+        :return: function telling whether a unit key belongs to a unit that
+            is already in the repository
+        """
+        if content_type == "puppet":
+            units = PuppetModuleAPI().puppet_modules_by_repo(repo_id)
+        else:
+            units = PackageAPI().packages_by_repo(repo_id)
+        identities = set([unit_identity(content_type, unit) for unit in units])
+        return lambda unit_key: unit_identity(content_type, unit_key) in identities
 
     def _valid_upload_type(self, repo_id, content_type):
         if content_type not in self.CONTENT_TYPES:
@@ -628,36 +672,68 @@ class ContentUpload(SingleRepoAction):
         for upload in uploads:
             self.upload_api.delete(repo_id, upload['id'])
 
-    def send_file(self, filepath, repo_id, content_type, chunk):
+    def send_file(self, filepath, repo_id, content_type, chunk, is_present=None):
         filename = os.path.basename(filepath)
         unit_key, metadata = ContentUpload.get_content_data(content_type, filepath)
 
         if unit_key is None and metadata is None:
             raise FileUploadError
+        if is_present is not None and is_present(unit_key):
+            return None
 
         try:
             upload_id = self.upload_api.create(repo_id)["upload_id"]
-            run_spinner_in_bg(self.send_content, [repo_id, upload_id, filepath, chunk],
-                              message=_("Uploading '%s' to server... ") % filename)
+            self.send_content(repo_id, upload_id, filepath, chunk)
         finally:
             print _("Successfully uploaded '%s' into repository") % filename
 
         return {"id": upload_id, "unit_key": unit_key, "metadata": metadata}
 
     def send_content(self, repo_id, upload_id, filepath, chunk=None):
-        if not chunk:
-            chunk = 1048575  # see SSLRenegBufferSize in apache
-
-        with open(filepath, "rb") as f:
-            offset = 0
-            while True:
-                piece = f.read(chunk)
-
-                if piece == "":
-                    break  # end of file
-
-                self.upload_api.upload_bits(repo_id, upload_id, offset, piece)
-                offset += chunk
+        uploader = ChunkedUploader(self.upload_api, chunk)
+        progress = TransferProgressBar(os.path.getsize(filepath),
+                                       _("Uploading '%s' to server ") % os.path.basename(filepath))
+        try:
+            uploader.upload(repo_id, upload_id, filepath, progress)
+        finally:
+            progress.done()
+
+
+def unit_identity(content_type, unit):
+    """
+    :type unit: dict
+    :param unit: unit key or unit record from the server
+    :return: tuple identifying the unit within a repository
+    """
+    if content_type == "puppet":
+        return (unit.get('author'), unit.get('name'), unit.get('version'))
+    return (unit.get('name'), str(unit.get('epoch') or 0), unit.get('version'), unit.get('release'),
+            unit.get('arch'))
+
+
+def extract_content_data(args):
+    """
+    Generate the unit key and metadata of a content file. Takes one tuple so
+    that it can be mapped over a process pool.
+
+    :type args: (string, string)
+    :param args: tuple of the content type and the path of the file
+    :return: tuple of the path, unit key, metadata and an error message or None
+    """
+    content_type, filepath = args
+    unit_key = metadata = error = None
+    if content_type == "yum":
+        try:
+            unit_key, metadata = generate_rpm_data(filepath)
+        except InvalidRPMError:
+            error = _("Invalid rpm '%s'. Please check the file and try again.") % filepath
+    elif content_type == "puppet":
+        try:
+            unit_key, metadata = generate_puppet_data(filepath)
+        except ExtractionException:
+            error = _("Invalid puppet module '%s'. Please make sure the file is valid and is named " +
+                      "author-name-version.tar.gz (eg: puppetlabs-ntp-2.0.1.tar.gz).") % filepath
+    return filepath, unit_key, metadata, error
 
 
 # command --------------------------------------------------------------------
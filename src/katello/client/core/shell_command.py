@@ -17,7 +17,9 @@
 import os
 
 from katello.client.shell import KatelloShell
+from katello.client.batch import read_script
 from katello.client.core.base import BaseAction
+from katello.client.lib.control import system_exit
 
 
 # shell action ------------------------------------------------------------
@@ -31,11 +33,23 @@ class ShellAction(BaseAction):
         self.admin = cli
 
     def setup_parser(self, parser):
-        pass
+        parser.add_option('--script', dest='script',
+            help=_("run commands of a script instead of the interactive shell, '-' for the standard input"))
+        parser.add_option('--parallel', dest='parallel', type="positive_int", default=1,
+            help=_("number of independent commands of the script run at the same time;"
+                " 'wait' in the script waits for the previous commands to finish (default: 1)"))
 
     def run(self):
         self.admin.remove_command("shell")
         shell = KatelloShell(self.admin)
-        shell.cmdloop()
 
+        path = self.get_option('script')
+        if path is not None:
+            try:
+                lines = read_script(path)
+            except IOError:
+                system_exit(os.EX_IOERR, _("File %s does not exist") % path)
+            return shell.run_script(lines, self.get_option('parallel'))
+
+        shell.cmdloop()
         return os.EX_OK
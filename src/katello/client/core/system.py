@@ -23,7 +23,7 @@ from katello.client.api.system_group import SystemGroupAPI
 from katello.client.api.custom_info import CustomInfoAPI
 from katello.client.api.utils import get_environment, get_system, get_content_view
 from katello.client.cli.base import opt_parser_add_org, opt_parser_add_environment, \
-    opt_parser_add_content_view
+    opt_parser_add_content_view, opt_parser_add_paging
 from katello.client.core.base import BaseAction, Command
 from katello.client.server import ServerRequestError
 
@@ -59,17 +59,19 @@ class List(SystemAction):
         super(List, self).setup_parser(parser)
         parser.add_option('--pool', dest='pool_id',
                        help=_("pool ID to filter systems by subscriptions"))
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         validator.require('org')
 
     def get_systems(self, org_name, env_name, pool_id):
         query = {'pool_id': pool_id} if pool_id else {}
+        paging = {'page_size': self.get_option('page_size'), 'limit': self.get_option('limit')}
         if env_name is None:
-            return self.api.systems_by_org(org_name, query)
+            return self.api.systems_by_org(org_name, query, stream=self.stream_lists(), **paging)
         else:
             environment = get_environment(org_name, env_name)
-            return self.api.systems_by_env(environment["id"], query)
+            return self.api.systems_by_env(environment["id"], query, stream=self.stream_lists(), **paging)
 
     def run(self):
         org_name = self.get_option('org')
@@ -20,7 +20,7 @@ from katello.client.cli.base import opt_parser_add_org, \
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.system_group import SystemGroupAPI
 from katello.client.api.utils import get_system_group, get_environment, \
-    get_content_view, get_systems
+    get_content_view, get_systems, invalidate_lookups
 from katello.client.lib.utils.data import test_record
 from katello.client.lib.async import SystemGroupAsyncJob, evaluate_remote_action
 from katello.client.lib.ui.progress import run_spinner_in_bg, wait_for_async_task
@@ -92,6 +92,7 @@ class Create(SystemGroupAction):
             max_systems = "-1"
 
         system_group = self.api.create(org_name, name, description, max_systems)
+        invalidate_lookups('system_group')
 
         test_record(system_group,
             _("Successfully created system group [ %s ]") % system_group['name'],
@@ -126,6 +127,7 @@ class Copy(SystemGroupAction):
 
         source_system_group = get_system_group(org_name, name)
         new_system_group = self.api.copy(org_name, source_system_group["id"], new_name, description, max_systems)
+        invalidate_lookups('system_group')
 
         test_record(new_system_group,
             _("Successfully copied system group [ %(source_system_group_name)s ] to [ %(new_system_group_name)s ]") % \
@@ -153,7 +155,7 @@ class Info(SystemGroupAction):
         self.printer.set_header(_("System Group Information For Org [ %s ]") % (org_name))
 
         # get system details
-        system_group = get_system_group(org_name, system_group_name)
+        system_group = get_system_group(org_name, system_group_name, refresh=True)
 
         self.printer.add_column('id', _("ID"))
         self.printer.add_column('name', _("Name"))
@@ -271,6 +273,7 @@ class Update(SystemGroupAction):
 
 
         system_group = self.api.update(org_name, system_group["id"], new_name, new_description, max_systems)
+        invalidate_lookups('system_group')
 
         if system_group != None:
             print _("Successfully updated system group [ %s ]") % system_group['name']
@@ -301,6 +304,7 @@ class Delete(SystemGroupAction):
         system_group = get_system_group(org_name, name)
 
         message = self.api.delete(org_name, system_group["id"], delete_systems)
+        invalidate_lookups('system_group')
         if message != None:
             print message
             return os.EX_OK
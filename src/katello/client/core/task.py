@@ -15,11 +15,12 @@
 #
 
 import os
+import itertools
 
 from katello.client.api.task_status import TaskStatusAPI
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import ApiDataError
-from katello.client.cli.base import opt_parser_add_org
+from katello.client.cli.base import opt_parser_add_org, opt_parser_add_paging
 from katello.client.lib.control import system_exit
 from katello.client.lib.ui.formatters import format_date
 
@@ -45,6 +46,7 @@ class List(TaskAction):
                           help=(_("task state (%s)") % (", ".join(self.STATES))))
         parser.add_option("--type", dest="task_type",
                           help=(_("task type eg: content_view_refresh")))
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         validator.require('org')
@@ -57,13 +59,21 @@ class List(TaskAction):
         org_name = self.get_option('org')
         state = self.get_option('state')
         task_type = self.get_option('task_type')
+        page_size = self.get_option('page_size')
+        limit = self.get_option('limit')
 
-        tasks = self.api.tasks_by_org(org_name)
+        if state or task_type:
+            # the tasks are filtered here, the limit applies to the filtered ones
+            tasks = self.api.tasks_by_org(org_name, page_size=page_size or limit, limit=None)
+        else:
+            tasks = self.api.tasks_by_org(org_name, page_size=page_size, limit=limit)
 
         if state:
-            tasks = filter(lambda t: t['state'] == state, tasks)
+            tasks = itertools.ifilter(lambda t: t['state'] == state, tasks)
         if task_type:
-            tasks = filter(lambda t: t['task_type'] == task_type, tasks)
+            tasks = itertools.ifilter(lambda t: t['task_type'] == task_type, tasks)
+        if limit is not None:
+            tasks = itertools.islice(tasks, limit)
 
         self.printer.add_column('uuid', _("UUID"))
         self.printer.add_column('state', _("State"))
@@ -20,6 +20,7 @@ from katello.client.api.user import UserAPI
 from katello.client.api.user_role import UserRoleAPI
 from katello.client.api.about import AboutAPI
 from katello.client.api.utils import get_user, get_environment
+from katello.client.cli.base import opt_parser_add_paging
 from katello.client.core.base import BaseAction, Command
 from katello.client.lib.utils.io import convert_to_mime_type, attachment_file_name, save_report
 from katello.client.lib.utils.data import test_record
@@ -42,8 +43,11 @@ class List(UserAction):
 
     description = _('list all known users')
 
+    def setup_parser(self, parser):
+        opt_parser_add_paging(parser)
+
     def run(self):
-        users = self.api.users()
+        users = self.api.users(page_size=self.get_option('page_size'), limit=self.get_option('limit'))
 
         batch_add_columns(self.printer, {'id': _("ID")}, {'username': _("Username")}, \
             {'email': _("Email")}, {'disabled': _("Disabled")}, \
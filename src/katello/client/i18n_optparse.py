@@ -68,6 +68,26 @@ class OptionParser(_OptionParser):
         _("show program's version number and exit")
 
     displayed_help = False
+    _usage_factory = None
+
+    def set_usage(self, usage):
+        """
+        Usage can be also given as a function returning the usage string,
+        it is then called first when the usage is printed.
+        """
+        if callable(usage):
+            self._usage_factory = usage
+            usage = None
+        else:
+            self._usage_factory = None
+        _OptionParser.set_usage(self, usage)
+
+    def get_usage(self):
+        if self._usage_factory is not None:
+            _OptionParser.set_usage(self, self._usage_factory())
+            self._usage_factory = None
+        return _OptionParser.get_usage(self)
+
     _enable_epilog_formatter = True
     def epilog_formatter_enabled(self):
         return self._enable_epilog_formatter
@@ -24,10 +24,60 @@ except ImportError:
     import simplejson as json
 
 from katello.client.lib.ui.formatters import format_sync_errors, format_sync_status
+from katello.client.lib.utils.concurrency import parallel_map, DEFAULT_WORKERS
 from katello.client.api.task_status import TaskStatusAPI, SystemTaskStatusAPI
 from katello.client.api.job import SystemGroupJobStatusAPI
 
 
+class TaskPoller(object):
+    """
+    Refreshes statuses of a set of tasks.
+
+    Only tasks that have not reached a terminal state are polled. When the status
+    api offers a bulk call (statuses) all of them are refreshed with a single request,
+    otherwise they are polled concurrently on a bounded pool of threads.
+    """
+
+    def __init__(self, status_api, id_key='uuid', workers=DEFAULT_WORKERS):
+        """
+        :type status_api: KatelloAPI
+        :param status_api: api with method status(id) and optionally statuses(ids)
+        :type id_key: string
+        :param id_key: name of the attribute identifying the task
+        :type workers: int
+        :param workers: maximal number of statuses requested at the same time
+        """
+        self.__api = status_api
+        self.__id_key = id_key
+        self.__workers = workers
+
+    def poll(self, tasks, is_running):
+        """
+        :type tasks: list of dicts
+        :param tasks: task statuses from the last poll
+        :type is_running: function
+        :param is_running: tells whether a task status needs to be refreshed
+        :return: list of refreshed task statuses in the original order
+        """
+        pending = [i for i, task in enumerate(tasks) if is_running(task)]
+        if not pending:
+            return tasks
+
+        statuses = self._fetch([tasks[i][self.__id_key] for i in pending])
+
+        tasks = list(tasks)
+        for i, status in zip(pending, statuses):
+            # keep the last known status when the server didn't return any
+            if status is not None:
+                tasks[i] = status
+        return tasks
+
+    def _fetch(self, task_ids):
+        if len(task_ids) > 1 and hasattr(self.__api, 'statuses'):
+            return self.__api.statuses(task_ids)
+        return parallel_map(self.__api.status, task_ids, self.__workers)
+
+
 # Envelope around task status structure
 #
 #{'created_at': None,
@@ -45,6 +95,11 @@ from katello.client.api.job import SystemGroupJobStatusAPI
 # 'uuid': '52456711-cd67-11e0-af50-f0def13c24e5'}
 class AsyncTask():
 
+    # attribute identifying the task in status api calls
+    id_key = 'uuid'
+    # maximal number of concurrent status requests
+    poll_workers = DEFAULT_WORKERS
+
     def __init__(self, task):
         if not isinstance(task, list):
             self._tasks = [task]
@@ -56,7 +111,8 @@ class AsyncTask():
         return TaskStatusAPI()
 
     def update(self):
-        self._tasks = [self.status_api().status(t['uuid']) for t in self._tasks]
+        poller = TaskPoller(self.status_api(), self.id_key, self.poll_workers)
+        self._tasks = poller.poll(self._tasks, self._subtask_is_running)
 
     def get_progress(self):
         """
@@ -237,6 +293,8 @@ def progress(left, total):
 #   'finish_time': ''}
 class AsyncJob(AsyncTask):
 
+    id_key = 'id'
+
     @classmethod
     def status_api(cls):
         # In the future, this could be used for a generic JobStatusAPI; however, for now the only
@@ -244,9 +302,6 @@ class AsyncJob(AsyncTask):
         # return JobStatusAPI()
         return SystemGroupJobStatusAPI()
 
-    def update(self):
-        self._tasks = [self.status_api().status(j['id']) for j in self._tasks]
-
 
 
 # SystemGroup representation for a job
@@ -15,10 +15,10 @@
 #
 
 import os
-import rpm
-import hashlib
 import sys
 
+from katello.client.lib.utils.checksum import calculate_checksum
+
 # WARNING: THIS CODE IS COPY-PASTED FROM PULP!
 
 #
@@ -33,7 +33,6 @@ import sys
 # pylint: disable-all
 
 RPMTAG_NOSOURCE = 1051
-CHECKSUM_READ_BUFFER_SIZE = 65536
 
 
 class InvalidRPMError(Exception):
@@ -70,6 +69,9 @@ def generate_rpm_data(rpm_filename):
     unit_key = dict()
     metadata = dict()
 
+    # rpm is slow to import and needed only for uploads
+    import rpm
+
     # Read the RPM header attributes for use later
     ts = rpm.TransactionSet()
     ts.setVSFlags(rpm._RPMVSF_NOSIGNATURES)
@@ -130,12 +132,4 @@ def generate_rpm_data(rpm_filename):
 
 
 def _calculate_checksum(checksum_type, filename):
-    m = hashlib.new(checksum_type)
-    f = open(filename, 'r')
-    while 1:
-        file_buffer = f.read(CHECKSUM_READ_BUFFER_SIZE)
-        if not file_buffer:
-            break
-    m.update(file_buffer)
-    f.close()
-    return m.hexdigest()
+    return calculate_checksum(checksum_type, filename)
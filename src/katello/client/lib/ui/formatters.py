@@ -13,8 +13,6 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 
-import dateutil.parser
-
 
 SYNC_STATES = { 'waiting':     _("Waiting"),
                 'running':     _("Running"),
@@ -46,6 +44,8 @@ def format_date(date, to_format="%Y/%m/%d %H:%M:%S"):
     """
     if not date:
         return ""
+    # dateutil is imported first when a date is printed, it is slow to load
+    import dateutil.parser
     t = dateutil.parser.parse(date)
     return t.strftime(to_format)
 
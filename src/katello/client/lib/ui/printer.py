@@ -17,22 +17,38 @@ import fcntl
 import termios
 import struct
 import sys
+import itertools
 import unicodedata
 
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 
 from math import floor
 from katello.client.lib.utils.encoding import u_str
 
+# value of a column that has nothing to display for an item
+MISSING = object()
 
 
 class PrinterStrategy(object):
     """
     Strategy of formatting the data and printing them on the output.
+
+    :cvar machine_readable: whether the strategy prints data for other programs,
+        such strategy prints all the columns and is not replaced by actions
+        that prefer a different layout
     """
 
-    def __init__(self, output=sys.stdout):
+    machine_readable = False
+
+    def __init__(self, output=None):
         super(PrinterStrategy, self).__init__()
-        self._output = output
+        # sys.stdout is looked up when the strategy is created, not when
+        # the module is imported, so that replaced stdout (shell, batch) is used
+        self._output = output if output is not None else sys.stdout
 
     def print_item(self, heading, columns, item):
         """
@@ -100,6 +116,44 @@ class PrinterStrategy(object):
             value = item_format_func(item)
         return value
 
+    @classmethod
+    def _compile_column(cls, column):
+        """
+        Resolve the column definition once into a function that does what
+        _column_has_value and _get_column_value do for every item.
+
+        :type column: dict
+        :param column: column definition
+        :rtype: function
+        :return: function taking an item and returning the value to display
+            or MISSING when the column has no value for the item
+        """
+        attr_name = column['attr_name']
+        default = column.get('value', None)
+        value_format_func = column.get('formatter', column.get('value_formatter', None))
+        item_format_func = column.get('item_formatter', None)
+        always_present = ('value' in column) or (item_format_func is not None)
+
+        def get_value(item):
+            if not always_present and attr_name not in item:
+                return MISSING
+            value = item.get(attr_name, None)
+            if value is None:
+                value = default
+            if value_format_func is not None:
+                return value_format_func(value)
+            elif item_format_func is not None:
+                return item_format_func(item)
+            return value
+        return get_value
+
+    @classmethod
+    def _compile_columns(cls, columns):
+        """
+        :rtype: list of tuples (column definition, function returning the value of the column)
+        """
+        return [(column, cls._compile_column(column)) for column in columns]
+
     def _println(self, text=''):
         self._print(text + "\n")
 
@@ -122,9 +176,11 @@ class VerboseStrategy(PrinterStrategy):
         """
         if heading is not None:
             self._print_header(heading)
+        compiled = self._compile_columns(columns)
+        label_format = u"%-" + u_str(self._max_label_width(columns)) + u"s : "
+        labels = [label_format % u_str(column['name']) for column in columns]
         for item in items:
-            self._print_item(item, columns)
-            self._println()
+            self._print(self._format_item(item, compiled, labels))
 
     def _print_header(self, heading):
         """
@@ -138,31 +194,35 @@ class VerboseStrategy(PrinterStrategy):
         print_line(output=self._output)
 
 
-    def _print_item(self, item, columns):
+    @classmethod
+    def _format_item(cls, item, compiled_columns, labels):
         """
-        Print one record.
+        Format one record, separated by empty lines, into a single string.
 
         :type item: hash
         :param item: data to print
-        :type columns: list of dicts
-        :param columns: columns definition
+        :type compiled_columns: list of tuples
+        :param compiled_columns: columns compiled by _compile_columns
+        :type labels: list of strings
+        :param labels: padded labels of the columns
+        :rtype: string
         """
-        self._println()
-        for column in columns:
-            if not self._column_has_value(column, item):
+        lines = [u'']
+        for (column, get_value), label in zip(compiled_columns, labels):
+            value = get_value(item)
+            if value is MISSING:
                 continue
 
-            value = self._get_column_value(column, item)
-
             if not column.get('multiline', False):
-                col_width = self._max_label_width(columns)
                 if not isinstance(value, (list, tuple)):
                     value = [value]
                 for v in value:
-                    self._println(("%-" + u_str(col_width) + "s : %s") % (u_str(column['name']), u_str(v)))
+                    lines.append(label + u_str(v))
             else:
-                self._println(column['name'] + ":")
-                self._println(indent_text(value, "    "))
+                lines.append(column['name'] + ":")
+                lines.append(indent_text(value, "    "))
+        lines.append(u'\n')
+        return u'\n'.join(lines)
 
 
     @classmethod
@@ -186,17 +246,32 @@ class GrepStrategy(PrinterStrategy):
     """
     Prints data into a grid that can be grepped easily.
     String to divide the columns can be set optionally.
+
+    Column widths are computed from all the items of lists. Items given as
+    an iterator are printed as they come, the widths are computed from
+    a sample window of the first items only.
+
+    Every cell is formatted once, display widths of distinct cell values
+    are cached and each row is written at once.
     """
 
-    def __init__(self, delimiter=None, output=sys.stdout):
+    SAMPLE_SIZE = 100
+    # maximal number of distinct values whose widths are remembered
+    WIDTH_CACHE_SIZE = 10000
+
+    def __init__(self, delimiter=None, output=None, sample_size=None):
         """
         :type delimiter: string
         :param delimiter: delimiter for dividing the grid columns
-        :type noheading: boolean
-        :param noheading: to suppress headings in the output
+        :type sample_size: int
+        :param sample_size: number of items the column widths are computed from,
+            all the items of lists and SAMPLE_SIZE items of iterators when None,
+            0 for fixed widths given by the column labels and 'width' column option
         """
         super(GrepStrategy, self).__init__(output)
         self.__delim = delimiter if delimiter else ""
+        self.sample_size = sample_size
+        self.__widths = {}
 
     def print_items(self, heading, columns, items):
         """
@@ -206,15 +281,34 @@ class GrepStrategy(PrinterStrategy):
         :param heading: Title for the list of items
         :type columns: list of dicts
         :param columns: definition of columns
-        :type items: list of dicts
+        :type items: list of dicts or iterator
         :param items: data to be printed, list of items
         """
-        column_widths = self._calc_column_widths(items, columns)
+        compiled = self._compile_columns(columns)
+        if isinstance(items, (list, tuple)):
+            rows = [self._format_row(compiled, item) for item in items]
+        else:
+            rows = itertools.imap(lambda item: self._format_row(compiled, item), items)
+        rows, sample = self._sample(rows)
+
+        column_widths = self._calc_column_widths(sample, columns)
         if heading is not None:
             self._print_header(heading, columns, column_widths)
-        for item in items:
-            self._print_item(item, columns, column_widths)
-            self._println()
+        for row in rows:
+            self._print(self._render_row(row, column_widths))
+
+    def _sample(self, items):
+        """
+        :return: tuple of the items to print and the items to compute the column widths from
+        """
+        sample_size = self.sample_size
+        if sample_size is None:
+            if isinstance(items, (list, tuple)):
+                return items, items
+            sample_size = self.SAMPLE_SIZE
+        items = iter(items)
+        sample = list(itertools.islice(items, sample_size))
+        return itertools.chain(sample, items), sample
 
     def _print_header(self, heading, columns, column_widths):
         """
@@ -224,90 +318,195 @@ class GrepStrategy(PrinterStrategy):
         :param heading: headers to be displayed
         :type columns: list of dicts
         :param columns: columns definition
-        :type column_widths: dict
-        :param column_widths: dictionary that holds maximal widths of columns {attr_name -> width}
+        :type column_widths: list of ints
+        :param column_widths: maximal widths of the columns
         """
         print_line(output=self._output)
         self._println(center_text(heading))
 
         self._println()
-        for column in columns:
-            width = column_widths.get(column['attr_name'], 0)
-
+        labels = []
+        for column, width in zip(columns, column_widths):
             if self.__delim:
-                self._print(column['name'] + self.__delim)
+                labels.append(column['name'] + self.__delim)
             else:
-                self._print(column['name'].ljust(width))
-        print
+                labels.append(column['name'].ljust(width))
+        self._println(u''.join(labels))
         print_line(output=self._output)
 
-
-    def _print_item(self, item, columns, column_widths):
+    @classmethod
+    def _format_row(cls, compiled_columns, item):
         """
-        Print item of a list on single line
+        Format values of all the columns of an item
 
+        :type compiled_columns: list of tuples
+        :param compiled_columns: columns compiled by _compile_columns
         :type item: hash
         :param item: data to print
-        :type columns: list of dicts
-        :param columns: columns definition
-        :type column_widths:
-        :param column_widths:
-        """
-        for column in columns:
-            #get defined width
-            width = column_widths.get(column['attr_name'], 0)
-
-            #skip missing attributes
-            if not self._column_has_value(column, item):
-                if self.__delim:
-                    self._print(" " * width)
-                else:
-                    self._print(self.__delim)
+        :rtype: list of strings
+        :return: text of the cells, None for columns without a value
+        """
+        row = []
+        for column, get_value in compiled_columns:
+            value = get_value(item)
+            if value is MISSING:
+                row.append(None)
                 continue
-            value = self._get_column_value(column, item)
-
             if column.get('multiline', False):
                 value = text_to_line(value)
-            value = u_str(value)
+            row.append(value if isinstance(value, unicode) else u_str(value))
+        return row
 
-            if self.__delim:
-                self._print('%s' % (value) + self.__delim)
-            else:
-                self._print('%s%s' % (value, ' '*(width-unicode_len((value)))))
+    def _render_row(self, row, column_widths):
+        """
+        Lay out the cells of a row on a single line
 
+        :type row: list of strings
+        :param row: cells formatted by _format_row
+        :type column_widths: list of ints
+        :param column_widths: maximal widths of the columns
+        :rtype: string
+        """
+        if self.__delim:
+            cells = [(cell or u'') + self.__delim for cell in row]
+        else:
+            cells = []
+            for cell, width in zip(row, column_widths):
+                if cell is None:
+                    cells.append(u' ' * width)
+                else:
+                    cells.append(cell + u' ' * (width - self._cell_width(cell)))
+        cells.append(u'\n')
+        return u''.join(cells)
+
+    def _cell_width(self, text):
+        """
+        Display width of a cell. Widths of non-ascii values, which have to be
+        measured character by character, are remembered for distinct values.
+        """
+        try:
+            text.encode('ascii')
+            return len(text)
+        except UnicodeError:
+            pass
+        width = self.__widths.get(text)
+        if width is None:
+            width = unicode_len(text)
+            if len(self.__widths) >= self.WIDTH_CACHE_SIZE:
+                self.__widths.clear()
+            self.__widths[text] = width
+        return width
 
-    def _column_width(self, items, column):
+    def _calc_column_widths(self, rows, columns):
         """
-        Returns maximum width for the column to ensure that all the data
-        and the label fits in.
+        Counts and returns maximal widths of all columns, so that all the data
+        and the labels fit in.
 
+        :type rows: list of lists of strings
+        :param rows: cells formatted by _format_row
         :type columns: list of dicts
         :param columns: columns definition
-        :type column: dict
-        :param column: column definition
-        :rtype: int
+        :rtype: list of ints
+        """
+        widths = [max(unicode_len(column['name']) + 1, column.get('width', 0)) for column in columns]
+        for row in rows:
+            for index, cell in enumerate(row):
+                if cell is None:
+                    continue
+                width = self._cell_width(cell)
+                if widths[index] <= width:
+                    widths[index] = width + 1
+        return widths
+
+
+class JSONLinesStrategy(PrinterStrategy):
+    """
+    Prints every item as a json object on a separate line (newline
+    delimited json). Keys are the attribute names of the columns, in the
+    order of the columns. Items are printed as they come, the heading
+    is omitted.
+    """
+
+    machine_readable = True
+
+    def print_items(self, heading, columns, items):
         """
-        width = unicode_len(column['name'])+1
-        for column_value in [u_str(self._get_column_value(column, item)) for item in items]:
-            new_width = unicode_len(column_value)
-            if width <= new_width:
-                width = new_width+1
-        return width
+        Print list of items
 
-    def _calc_column_widths(self, items, columns):
+        :type heading: string
+        :param heading: ignored
+        :type columns: list of dicts
+        :param columns: definition of columns
+        :type items: list of dicts or iterator
+        :param items: data to be printed, list of items
         """
-        Counts and returns dictionary that holds maximal widths of all columns {attr_name -> width}
+        compiled = [(json.dumps(column['attr_name']) + ': ', get_value)
+            for column, get_value in self._compile_columns(columns)]
+        for item in items:
+            self._print(self._format_item(compiled, item))
 
-        :type items: list of dicts
-        :param items: data to be printed
+    @classmethod
+    def _format_item(cls, compiled_columns, item):
+        fields = []
+        for key, get_value in compiled_columns:
+            value = get_value(item)
+            if value is MISSING:
+                value = None
+            fields.append(key + json.dumps(value, default=u_str))
+        return u'{' + u', '.join(fields) + u'}\n'
+
+
+class CSVStrategy(PrinterStrategy):
+    """
+    Prints items as comma separated values (RFC 4180) with a row of column
+    labels first, unless the heading is disabled. Items are printed as
+    they come.
+    """
+
+    machine_readable = True
+    SPECIAL_CHARS = (',', '"', '\r', '\n')
+
+    def print_items(self, heading, columns, items):
+        """
+        Print list of items
+
+        :type heading: string
+        :param heading: the header row is printed when it's not None
         :type columns: list of dicts
-        :param columns: columns definition
-        :rtype: dict
+        :param columns: definition of columns
+        :type items: list of dicts or iterator
+        :param items: data to be printed, list of items
         """
-        widths = {}
-        for column in columns:
-            widths[column['attr_name']] = self._column_width(items, column)
-        return widths
+        compiled = self._compile_columns(columns)
+        if heading is not None:
+            self._print(self._format_row([column['name'] for column in columns]))
+        for item in items:
+            self._print(self._format_row([get_value(item) for _column, get_value in compiled]))
+
+    @classmethod
+    def _format_field(cls, value):
+        if value is None or value is MISSING:
+            return u''
+        if isinstance(value, (list, tuple)):
+            value = u', '.join([u_str(v) for v in value])
+        value = u_str(value)
+        for char in cls.SPECIAL_CHARS:
+            if char in value:
+                return u'"' + value.replace(u'"', u'""') + u'"'
+        return value
+
+    @classmethod
+    def _format_row(cls, values):
+        return u','.join([cls._format_field(value) for value in values]) + u'\r\n'
+
+
+# strategies selectable with the --output option and output setting of the config
+OUTPUT_STRATEGIES = {
+    'grep': GrepStrategy,
+    'verbose': VerboseStrategy,
+    'json': JSONLinesStrategy,
+    'csv': CSVStrategy
+}
 
 
 class Printer:
@@ -345,11 +544,14 @@ class Printer:
 
     def set_strategy(self, strategy):
         """
-        Sets formatting strategy
+        Sets formatting strategy. A machine readable strategy stays
+        in use, the data format was requested explicitly.
 
         :type strategy: PrinterStrategy
         :param strategy: strategy that is used for formatting the output.
         """
+        if self.__machine_readable():
+            return
         self.__printer_strategy = strategy
 
     def add_column(self, attr_name, name = None, **kwargs):
@@ -402,11 +604,16 @@ class Printer:
         """
         return " ".join([part[0].upper() + part[1:] for part in attr_name.split("_")])
 
+    def __machine_readable(self):
+        return getattr(self.__printer_strategy, 'machine_readable', False) is True
+
     def __filtered_columns(self):
         """
         :return: list of columns that can be printed with current strategy
         :rtype: list of column definition dicts
         """
+        if self.__machine_readable():
+            return self.__columns
         filtered = []
         for column in self.__columns:
             allowed_strategies = column.get('show_with', (object))
@@ -478,7 +685,7 @@ def center_text(text, width=None):
     return "\n".join(centered)
 
 
-def print_line(width=None, output=sys.stdout):
+def print_line(width=None, output=None):
     """
     Prints line of characters '-' to stdout
 
@@ -486,6 +693,8 @@ def print_line(width=None, output=sys.stdout):
     :param width: width of the line in characters. If no width is given,
     full terminal size is used.
     """
+    if output is None:
+        output = sys.stdout
     if not width:
         width = get_term_width()
     print >> output, '-'*width
@@ -508,8 +717,13 @@ def get_term_width():
 
 
 def unicode_len(text):
-    """ return byte lenght of unicode character """
-    return sum(1+(unicodedata.east_asian_width(c) in "WF") for c in u_str(text))
+    """ return display width of the text, wide east asian characters take two columns """
+    text = u_str(text)
+    try:
+        text.encode('ascii')
+        return len(text)
+    except UnicodeEncodeError:
+        return sum(1+(unicodedata.east_asian_width(c) in "WF") for c in text)
 
 def batch_add_columns(printer, *cols, **kwargs):
     for c in cols:
@@ -17,8 +17,15 @@
 
 import sys
 import time
+import random
 import threading
+import ConfigParser
+from katello.client.config import Config, ConfigFileError
 from katello.client.lib.async import AsyncTask
+from katello.client.lib.utils.deadline import command_deadline
+from katello.client.logutil import getLogger
+
+_log = getLogger(__name__)
 
 
 class ProgressBar(object):
@@ -33,6 +40,85 @@ class ProgressBar(object):
         sys.stdout.write("\r%60s\r" % (' ' * 70))
 
 
+class TransferProgressBar(object):
+    """
+    Progress bar of a data transfer showing the transferred share and the
+    throughput. Can be updated from several threads at once.
+
+    :ivar total: number of bytes to transfer
+    :ivar transferred: number of bytes transferred so far
+    """
+
+    def __init__(self, total, message="", refresh=0.1):
+        self.total = total
+        self.transferred = 0
+        self.message = message
+        self.refresh = refresh
+        self.started = time.time()
+        self.__rendered = 0
+        self.__lock = threading.Lock()
+
+    def add(self, size):
+        """
+        :type size: int
+        :param size: number of bytes that were just transferred
+        """
+        self.__lock.acquire()
+        try:
+            self.transferred += size
+            now = time.time()
+            if now - self.__rendered >= self.refresh or self.transferred >= self.total:
+                self.__rendered = now
+                self._render(now)
+        finally:
+            self.__lock.release()
+
+    def throughput(self, now=None):
+        """
+        :return: average number of bytes transferred per second
+        """
+        elapsed = (now or time.time()) - self.started
+        return self.transferred / max(elapsed, 0.001)
+
+    def _render(self, now):
+        share = float(self.transferred) / self.total if self.total else 1.0
+        sys.stdout.write("\r%s[%-30s] %5.1f%% %s/s " % (self.message, '#' * int(share * 30),
+            share * 100, format_size(self.throughput(now))))
+        sys.stdout.flush()
+
+    def write(self, text):
+        """
+        Print a line of text above the progress bar.
+        """
+        self.__lock.acquire()
+        try:
+            self._clear()
+            print text
+            self._render(time.time())
+        finally:
+            self.__lock.release()
+
+    def _clear(self):
+        sys.stdout.write("\r%s\r" % (' ' * (len(self.message) + 60)))
+
+    def done(self):
+        self._clear()
+        sys.stdout.flush()
+
+
+def format_size(size):
+    """
+    :type size: int or float
+    :param size: number of bytes
+    :return: size in human readable units (eg. 12.5 MiB)
+    """
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024:
+            return "%.1f %s" % (size, unit)
+        size /= 1024.0
+    return "%.1f TiB" % size
+
+
 class Spinner(threading.Thread):
     """
     Spinner shows nice cli "spinner" while function is executing.
@@ -116,24 +202,153 @@ def run_spinner_in_bg(function, arguments=(), message=""):
     return result
 
 
-def wait_for_async_task(task, delay=1):
+class PollScheduler(object):
+    """
+    Decides how long to wait between two polls of an async task.
+
+    Polling starts with a short delay that grows exponentially up to a cap
+    while the task makes no progress. When the progress moves the delay
+    shrinks again. Every delay is randomized by a jitter so that parallel
+    clients don't poll the server in lockstep.
+
+    Defaults can be overridden in the [polling] section of client.conf:
+    min_delay, max_delay (seconds), backoff (multiplier) and jitter (fraction).
+
+    :ivar polls: number of delays handed out so far
+    """
+
+    DEFAULTS = {
+        'min_delay': 0.25,
+        'max_delay': 30.0,
+        'backoff': 1.5,
+        'jitter': 0.1
+    }
+
+    def __init__(self, min_delay=None, max_delay=None, backoff=None, jitter=None):
+        self.min_delay = self.DEFAULTS['min_delay'] if min_delay is None else min_delay
+        self.max_delay = self.DEFAULTS['max_delay'] if max_delay is None else max_delay
+        self.backoff = self.DEFAULTS['backoff'] if backoff is None else backoff
+        self.jitter = self.DEFAULTS['jitter'] if jitter is None else jitter
+        self.polls = 0
+        self.__delay = None
+        self.__last_progress = None
+
+    @classmethod
+    def from_config(cls):
+        """
+        Create scheduler with settings from the [polling] section of the config.
+        """
+        settings = {}
+        try:
+            Config()
+            for name in cls.DEFAULTS:
+                if Config.parser.has_option('polling', name):
+                    settings[name] = float(Config.parser.get('polling', name))
+        except (ConfigFileError, ConfigParser.Error, ValueError), e:
+            _log.warning("invalid polling configuration, using defaults: %s" % e)
+            settings = {}
+        return cls(**settings)
+
+    def next_delay(self, progress=None):
+        """
+        :type progress: float
+        :param progress: current progress of the task (0.0 - 1.0), if known
+        :rtype: float
+        :return: number of seconds to wait before the next poll
+        """
+        if self.__delay is None:
+            self.__delay = self.min_delay
+        elif progress is not None and self.__last_progress is not None and progress > self.__last_progress:
+            self.__delay = max(self.min_delay, self.__delay / self.backoff)
+        else:
+            self.__delay = min(self.max_delay, self.__delay * self.backoff)
+        self.__last_progress = progress
+        self.polls += 1
+
+        spread = self.__delay * self.jitter
+        return max(0.0, self.__delay + random.uniform(-spread, spread))
+
+    def wait(self, progress=None):
+        """
+        :raises DeadlineExceeded: when the command runs out of time before the next poll
+        """
+        command_deadline.sleep(self.next_delay(progress))
+
+
+class FixedPollScheduler(PollScheduler):
+    """
+    Scheduler polling with a constant delay.
+    """
+
+    def __init__(self, delay):
+        super(FixedPollScheduler, self).__init__(delay, delay, 1.0, 0.0)
+
+
+def _create_scheduler(delay, scheduler):
+    if scheduler is not None:
+        return scheduler
+    if delay is not None:
+        return FixedPollScheduler(delay)
+    return PollScheduler.from_config()
+
+
+def _task_progress(task):
+    # not all the tasks report progress in numbers
+    try:
+        return task.get_progress()
+    except (KeyError, TypeError):
+        return None
+
+
+def _log_polls(scheduler, started):
+    _log.debug("task finished after %d polls in %.1f seconds" % (scheduler.polls, time.time() - started))
+
+
+def wait_for_async_task(task, delay=None, scheduler=None):
+    """
+    Poll the task until it finishes.
+
+    :type task: AsyncTask or dict
+    :type delay: float
+    :param delay: constant delay between polls, adaptive polling is used when not set
+    :type scheduler: PollScheduler
+    :param scheduler: custom scheduler of the polls
+    :return: task statuses
+    """
     if not isinstance(task, AsyncTask):
         task = AsyncTask(task)
+    scheduler = _create_scheduler(delay, scheduler)
+    started = time.time()
 
     while task.is_running():
-        time.sleep(delay)
+        scheduler.wait(_task_progress(task))
         task.update()
+    _log_polls(scheduler, started)
     return task.get_hashes()
 
 
-def run_async_task_with_status(task, progress_bar, delay=1):
+def run_async_task_with_status(task, progress_bar, delay=None, scheduler=None):
+    """
+    Poll the task until it finishes and show its progress.
+
+    :type task: AsyncTask or dict
+    :type progress_bar: ProgressBar
+    :type delay: float
+    :param delay: constant delay between polls, adaptive polling is used when not set
+    :type scheduler: PollScheduler
+    :param scheduler: custom scheduler of the polls
+    :return: task statuses
+    """
     if not isinstance(task, AsyncTask):
         task = AsyncTask(task)
+    scheduler = _create_scheduler(delay, scheduler)
+    started = time.time()
 
     while task.is_running():
-        time.sleep(delay)
+        scheduler.wait(_task_progress(task))
         task.update()
         progress_bar.update_progress(task.get_progress())
 
     progress_bar.done()
+    _log_polls(scheduler, started)
     return task.get_hashes()
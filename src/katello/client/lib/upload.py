@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+import os
+import sys
+import time
+import itertools
+import threading
+import multiprocessing
+from Queue import Queue
+
+from katello.client.config import Config
+from katello.client.server import FileChunk, ServerRequestError, AuthenticationStrategy, loaded_errors, \
+    get_active_server
+from katello.client.lib.utils.cache import LRUCache
+from katello.client.lib.utils.concurrency import parallel_map, ContextThread
+from katello.client.lib.utils.deadline import command_deadline
+from katello.client.logutil import getLogger
+
+_log = getLogger(__name__)
+
+RETRYABLE_ERRORS = (ServerRequestError,) + AuthenticationStrategy.connection_errors
+
+
+class ChunkedUploader(object):
+    """
+    Sends files to content uploads in chunks. Chunks are streamed from the
+    disk, several of them are in flight at the same time and a chunk that
+    fails is sent again from its offset. When the server has a retry policy
+    the chunks are resent by the server only, the retries of the uploader
+    are a fallback for servers without one.
+
+    :ivar chunk_size: number of bytes sent in one request
+    :ivar workers: number of chunks sent at the same time
+    :ivar retries: number of times a failed chunk is resent, unless the server retries
+    :ivar retry_delay: seconds to wait before the first resend, doubled with each attempt
+    :ivar resent: number of chunks resent so far
+    """
+
+    DEFAULT_CHUNK = 1048575  # see SSLRenegBufferSize in apache
+    DEFAULT_WORKERS = 4
+    DEFAULT_RETRIES = 3
+
+    def __init__(self, upload_api, chunk_size=None, workers=DEFAULT_WORKERS,
+                 retries=DEFAULT_RETRIES, retry_delay=1.0):
+        self.upload_api = upload_api
+        self.chunk_size = int(chunk_size or self.DEFAULT_CHUNK)
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.resent = 0
+
+    def chunks(self, filepath):
+        """
+        :type filepath: string
+        :return: list of FileChunk covering the whole file
+        """
+        size = os.path.getsize(filepath)
+        return [FileChunk(filepath, offset, min(self.chunk_size, size - offset))
+            for offset in range(0, size, self.chunk_size)]
+
+    def upload(self, repo_id, upload_id, filepath, progress=None):
+        """
+        Send the file content to the upload.
+
+        :type repo_id: string
+        :type upload_id: string
+        :type filepath: string
+        :type progress: TransferProgressBar
+        :param progress: progress bar notified about every chunk sent
+        """
+        def send(chunk):
+            self._send_chunk(repo_id, upload_id, chunk)
+            if progress is not None:
+                progress.add(chunk.length)
+        parallel_map(send, self.chunks(filepath), self.workers)
+
+    def _is_retryable(self, error):
+        if isinstance(error, ServerRequestError):
+            return error.args[0] >= 500
+        return True
+
+    def _send_chunk(self, repo_id, upload_id, chunk):
+        katello_server = get_active_server()
+        if katello_server is not None and katello_server.retry_policy is not None:
+            # resending here too would multiply the attempts of the server
+            return self.upload_api.upload_bits(repo_id, upload_id, chunk.offset, chunk)
+        attempt = 0
+        while True:
+            try:
+                return self.upload_api.upload_bits(repo_id, upload_id, chunk.offset, chunk)
+            except RETRYABLE_ERRORS + loaded_errors('M2Crypto.SSL', 'SSLError'), e:
+                if attempt >= self.retries or not self._is_retryable(e):
+                    raise
+                attempt += 1
+                self.resent += 1
+                _log.debug("resending chunk at offset %d of %s (attempt %d): %s" %
+                    (chunk.offset, chunk.path, attempt, e))
+                command_deadline.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+
+def find_files(directory):
+    """
+    :type directory: string
+    :return: sorted paths of all files in the directory and its subdirectories
+    """
+    paths = []
+    for dirname, __, filenames in os.walk(directory):
+        paths.extend([os.path.join(dirname, filename) for filename in filenames])
+    return sorted(paths)
+
+
+class ContentIndex(object):
+    """
+    On disk index of the unit keys and metadata generated for content files.
+    Files are identified by their absolute path, device, inode, size and
+    modification time, so unchanged files are neither parsed nor hashed
+    again. The path is part of the key because the metadata contains the
+    file name, a renamed, hard linked or symlinked file is extracted again.
+    The path isn't resolved, every symlink gets the metadata of its own name.
+
+    :ivar path: file the index is stored in
+    :ivar hits: number of files found in the index
+    :ivar bytes_saved: size of the files that didn't have to be read
+    """
+
+    DEFAULT_PATH = os.path.join(Config.USER_DIR, 'upload_index')
+    # bump when the key or the stored data change, older index files are then ignored
+    FORMAT_VERSION = 3
+
+    def __init__(self, path=DEFAULT_PATH, max_size=100000):
+        self.path = path
+        self.hits = 0
+        self.bytes_saved = 0
+        self.__entries = LRUCache(max_size, ttl=None)
+        self.__entries.load(path, self.FORMAT_VERSION)
+
+    @classmethod
+    def _key(cls, content_type, path):
+        stat = os.stat(path)
+        return (content_type, os.path.abspath(path), stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime)
+
+    def get(self, content_type, path):
+        """
+        :return: tuple of the unit key and metadata or None when the file changed
+        """
+        key = self._key(content_type, path)
+        data = self.__entries.get(key)
+        if data is not None:
+            self.hits += 1
+            self.bytes_saved += key[4]
+        return data
+
+    def set(self, content_type, path, unit_key, metadata):
+        self.__entries.set(self._key(content_type, path), (unit_key, metadata))
+
+    def save(self):
+        try:
+            self.__entries.save(self.path, self.FORMAT_VERSION)
+        except (IOError, OSError), e:
+            _log.warning("failed to save upload index %s: %s" % (self.path, e))
+
+
+def _timed_call(args):
+    """
+    Call function with the arguments and report when the call started and
+    finished. Module level so that it can be mapped over a process pool.
+    """
+    function, arguments = args
+    started = time.time()
+    result = function(arguments)
+    return result, started, time.time()
+
+
+class StageTimes(object):
+    """
+    Collects how long the stages of a pipeline took. Wall time spans from
+    the first start to the last finish of a stage, busy time sums all the
+    work done in the stage across the workers.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.__spans = {}
+        self.__busy = {}
+        self.__lock = threading.Lock()
+
+    def add(self, stage, started, finished):
+        self.__lock.acquire()
+        try:
+            if stage not in self.__spans:
+                self.stages.append(stage)
+                self.__spans[stage] = (started, finished)
+                self.__busy[stage] = 0.0
+            first, last = self.__spans[stage]
+            self.__spans[stage] = (min(first, started), max(last, finished))
+            self.__busy[stage] += finished - started
+        finally:
+            self.__lock.release()
+
+    def measure(self, stage, function, *args):
+        started = time.time()
+        try:
+            return function(*args)
+        finally:
+            self.add(stage, started, time.time())
+
+    def summary(self):
+        """
+        :return: list of tuples (stage, wall time, busy time) in the order the stages started
+        """
+        return [(stage, self.__spans[stage][1] - self.__spans[stage][0], self.__busy[stage])
+            for stage in self.stages]
+
+
+class UploadPipeline(object):
+    """
+    Imports many files into a repository. The stages run concurrently:
+    content metadata are extracted in a process pool, the files are uploaded
+    by a pool of threads, finished uploads are imported in batches and the
+    imported uploads are deleted in parallel.
+
+    Files whose metadata can't be extracted are skipped. An error in the
+    upload or import stage stops the pipeline, uploads that weren't imported
+    yet are deleted and the error is re-raised.
+
+    :ivar workers: number of processes extracting metadata and of threads uploading files
+    :ivar batch_size: number of uploads imported with one request
+    :ivar times: L{StageTimes} of the stages
+    :ivar imported: number of files imported into the repository
+    :ivar skipped: paths of the files that were skipped
+    :ivar present: paths of the files whose units were already in the repository
+    :ivar bytes_present: size of the files that were already in the repository
+    """
+
+    DEFAULT_WORKERS = 4
+    DEFAULT_BATCH_SIZE = 100
+
+    def __init__(self, upload_api, repo_id, content_type, extract, workers=DEFAULT_WORKERS,
+                 batch_size=DEFAULT_BATCH_SIZE, chunk_size=None, index=None, is_present=None):
+        """
+        :type extract: function
+        :param extract: module level function taking a tuple (content_type, path) and
+            returning a tuple (path, unit_key, metadata, error message or None)
+        :type index: ContentIndex
+        :param index: index used instead of the extraction for unchanged files
+        :type is_present: function
+        :param is_present: function taking a unit key and returning True for units
+            that are already in the repository and shouldn't be uploaded
+        """
+        self.upload_api = upload_api
+        self.repo_id = repo_id
+        self.content_type = content_type
+        self.extract = extract
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        # files are uploaded concurrently, chunks of one file go one by one
+        self.uploader = ChunkedUploader(upload_api, chunk_size, workers=1)
+        self.times = StageTimes()
+        self.index = index
+        self.is_present = is_present
+        self.imported = 0
+        self.skipped = []
+        self.present = []
+        self.bytes_present = 0
+        self.progress = None
+        self.__errors = []
+        self.__stop = threading.Event()
+
+    def discover(self, directory):
+        return self.times.measure('discovery', find_files, directory)
+
+    def run(self, paths, progress=None):
+        """
+        :type paths: list of strings
+        :type progress: TransferProgressBar
+        :param progress: progress bar of the uploaded bytes
+        :return: number of imported files
+        """
+        self.progress = progress
+        indexed, paths = self._indexed(paths)
+        jobs = [(self.extract, (self.content_type, path)) for path in paths]
+        # fork the extracting processes before any threads are started
+        pool = self._create_pool(len(jobs))
+        uploads = Queue(self.workers * 2)
+        imports = Queue()
+
+        uploaders = [self._start(self._upload_worker, uploads, imports) for _i in range(self.workers)]
+        importer = self._start(self._import_worker, imports)
+        try:
+            for path, unit_key, metadata, error in itertools.chain(indexed, self._extracted(pool, jobs)):
+                command_deadline.check()
+                if error is not None:
+                    self._skip(path, error)
+                elif self.is_present is not None and self.is_present(unit_key):
+                    self._skip_present(path)
+                elif not self.__stop.is_set():
+                    uploads.put((path, unit_key, metadata))
+        except KeyboardInterrupt:
+            self.__stop.set()
+            raise
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            for _i in uploaders:
+                uploads.put(None)
+            self._join(uploaders)
+            imports.put(None)
+            self._join([importer])
+
+        if self.__errors:
+            raise self.__errors[0][0], self.__errors[0][1], self.__errors[0][2]
+        return self.imported
+
+    @classmethod
+    def _start(cls, target, *args):
+        thread = ContextThread(target, args)
+        thread.start()
+        return thread
+
+    @classmethod
+    def _join(cls, threads):
+        for thread in threads:
+            # join with a timeout so that KeyboardInterrupt is delivered
+            while thread.is_alive():
+                thread.join(0.1)
+
+    def _fail(self):
+        self.__errors.append(sys.exc_info())
+        self.__stop.set()
+
+    def _skip(self, path, error):
+        self.skipped.append(path)
+        message = "%s\n%s" % (error, _("Skipping file '%s'.") % path)
+        if self.progress is not None:
+            self.progress.write(message)
+        else:
+            print message
+
+    def _skip_present(self, path):
+        self.present.append(path)
+        size = os.path.getsize(path)
+        self.bytes_present += size
+        if self.progress is not None:
+            # count the file as done so that the progress reaches the end
+            self.progress.add(size)
+
+    def _indexed(self, paths):
+        """
+        :return: tuple of the results found in the index and the paths to extract
+        """
+        if self.index is None:
+            return [], paths
+        indexed, missing = [], []
+        for path in paths:
+            data = self.index.get(self.content_type, path)
+            if data is None:
+                missing.append(path)
+            else:
+                indexed.append((path, data[0], data[1], None))
+        return indexed, missing
+
+    def _create_pool(self, jobs):
+        if self.workers <= 1 or jobs <= 1:
+            return None
+        try:
+            return multiprocessing.Pool(min(self.workers, jobs))
+        except (OSError, ImportError), e:
+            _log.debug("process pool not available, extracting metadata serially: %s" % e)
+            return None
+
+    def _extracted(self, pool, jobs):
+        if pool is not None:
+            results = pool.imap_unordered(_timed_call, jobs)
+        else:
+            results = itertools.imap(_timed_call, jobs)
+        for result, started, finished in results:
+            self.times.add('metadata', started, finished)
+            if self.__stop.is_set():
+                return
+            path, unit_key, metadata, error = result
+            if self.index is not None and error is None:
+                self.index.set(self.content_type, path, unit_key, metadata)
+            yield result
+
+    def _upload_worker(self, uploads, imports):
+        while True:
+            item = uploads.get()
+            if item is None:
+                return
+            if self.__stop.is_set():
+                continue
+            try:
+                imports.put(self.times.measure('upload', self._upload, *item))
+            except:  # pylint: disable=W0702
+                self._fail()
+
+    def _upload(self, path, unit_key, metadata):
+        upload_id = self.upload_api.create(self.repo_id)["upload_id"]
+        try:
+            self.uploader.upload(self.repo_id, upload_id, path, self.progress)
+        except:  # pylint: disable=W0702
+            self._delete([{"id": upload_id}])
+            raise
+        return {"id": upload_id, "unit_key": unit_key, "metadata": metadata}
+
+    def _import_worker(self, imports):
+        batch = []
+        while True:
+            upload = imports.get()
+            if upload is not None:
+                batch.append(upload)
+            if batch and (upload is None or len(batch) >= self.batch_size or self.__stop.is_set()):
+                self._import(batch)
+                batch = []
+            if upload is None:
+                return
+
+    def _import(self, batch):
+        try:
+            if not self.__stop.is_set():
+                self.times.measure('import', self.upload_api.import_into_repo, self.repo_id, batch)
+                self.imported += len(batch)
+        except:  # pylint: disable=W0702
+            self._fail()
+        try:
+            self.times.measure('delete', self._delete, batch)
+        except:  # pylint: disable=W0702
+            self._fail()
+
+    def _delete(self, uploads):
+        parallel_map(lambda upload: self.upload_api.delete(self.repo_id, upload['id']), uploads, self.workers)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+import os
+import time
+import tempfile
+import threading
+import cPickle as pickle
+
+
+# fields of the entries of LRUCache, kept in a circular doubly linked list
+# ordered from the least to the most recently used one
+_PREV, _NEXT, _KEY, _VALUE, _EXPIRES = range(5)
+
+
+class LRUCache(object):
+    """
+    Thread safe key-value cache with expiration of entries and least
+    recently used eviction. Values are stored as they are, callers
+    that hand out mutable values are responsible for copying them.
+
+    :ivar max_size: maximal number of entries kept
+    :ivar ttl: number of seconds an entry is valid for, None for no expiration
+    :ivar hits: number of successful lookups
+    :ivar misses: number of lookups that found no valid entry
+    """
+
+    def __init__(self, max_size=256, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> [previous entry, next entry, key, value, expiration time]
+        self.__entries = {}
+        self.__root = self.__new_root()
+        self.__lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @staticmethod
+    def __new_root():
+        root = [None, None, None, None, None]
+        root[_PREV] = root[_NEXT] = root
+        return root
+
+    def __unlink(self, entry):
+        entry[_PREV][_NEXT] = entry[_NEXT]
+        entry[_NEXT][_PREV] = entry[_PREV]
+
+    def __append(self, entry):
+        last = self.__root[_PREV]
+        entry[_PREV] = last
+        entry[_NEXT] = self.__root
+        last[_NEXT] = self.__root[_PREV] = entry
+
+    def __remove(self, key):
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__unlink(entry)
+
+    def __evict(self):
+        while len(self.__entries) > self.max_size:
+            self.__remove(self.__root[_NEXT][_KEY])
+
+    def get(self, key, default=None):
+        """
+        :return: the cached value or default when the key is missing or expired
+        """
+        self.__lock.acquire()
+        try:
+            entry = self.__entries.get(key)
+            if entry is None or (entry[_EXPIRES] is not None and entry[_EXPIRES] < time.time()):
+                self.__remove(key)
+                self.misses += 1
+                return default
+            self.__unlink(entry)
+            self.__append(entry)
+            self.hits += 1
+            return entry[_VALUE]
+        finally:
+            self.__lock.release()
+
+    def set(self, key, value):
+        self.__lock.acquire()
+        try:
+            expires = time.time() + self.ttl if self.ttl is not None else None
+            self.__remove(key)
+            entry = [None, None, key, value, expires]
+            self.__entries[key] = entry
+            self.__append(entry)
+            self.__evict()
+        finally:
+            self.__lock.release()
+
+    def remove(self, key):
+        self.__lock.acquire()
+        try:
+            self.__remove(key)
+        finally:
+            self.__lock.release()
+
+    def remove_if(self, predicate):
+        """
+        Remove all entries whose key matches the predicate.
+
+        :type predicate: function
+        :param predicate: function taking a key and returning bool
+        """
+        self.__lock.acquire()
+        try:
+            for key in [k for k in self.__entries if predicate(k)]:
+                self.__remove(key)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        self.__lock.acquire()
+        try:
+            self.__entries = {}
+            self.__root = self.__new_root()
+        finally:
+            self.__lock.release()
+
+    def load(self, path, version=None):
+        """
+        Merge entries saved with save() into the cache. Missing or corrupted
+        files and files saved with a different version are ignored.
+
+        :param version: format version of the keys and values the caller expects
+        """
+        try:
+            f = open(path, 'rb')
+            try:
+                saved_version, saved = pickle.load(f)
+            finally:
+                f.close()
+        except (IOError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return
+        if saved_version != version or not isinstance(saved, dict):
+            return
+
+        now = time.time()
+        self.__lock.acquire()
+        try:
+            for key, (value, expires) in saved.items():
+                if key not in self.__entries and (expires is None or expires >= now):
+                    entry = [None, None, key, value, expires]
+                    self.__entries[key] = entry
+                    self.__append(entry)
+            self.__evict()
+        finally:
+            self.__lock.release()
+
+    def save(self, path, version=None):
+        """
+        Store the valid entries into a file. The file is replaced atomically
+        so that concurrently running processes never read a partial file.
+
+        :param version: format version of the keys and values, stored in the file
+        """
+        now = time.time()
+        self.__lock.acquire()
+        try:
+            saved = dict((key, (entry[_VALUE], entry[_EXPIRES])) for key, entry in self.__entries.items()
+                if entry[_EXPIRES] is None or entry[_EXPIRES] >= now)
+        finally:
+            self.__lock.release()
+
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            f = os.fdopen(fd, 'wb')
+            try:
+                pickle.dump((version, saved), f, pickle.HIGHEST_PROTOCOL)
+            finally:
+                f.close()
+            os.rename(tmp_path, path)
+        except (IOError, OSError, pickle.PicklingError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
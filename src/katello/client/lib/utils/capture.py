@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+
+import threading
+
+
+class OutputCapture(object):
+    """
+    Captures output of individual threads. Streams wrapped by the capture
+    (sys.stdout, sys.stderr) write through to the real stream, except in
+    threads that started capturing: their writes to all the wrapped streams
+    are kept in one list, in the order they were made, until the thread
+    stops capturing and replays them.
+    """
+
+    def __init__(self):
+        self.__local = threading.local()
+
+    def wrap(self, stream):
+        """
+        :return: file-like object to be used instead of the stream
+        """
+        return _CapturedStream(self, stream)
+
+    def start(self):
+        """
+        Start capturing output of the current thread
+        """
+        self.__local.chunks = []
+
+    def stop(self):
+        """
+        Stop capturing output of the current thread.
+
+        :rtype: list of tuples (stream, data)
+        :return: the captured writes
+        """
+        chunks = getattr(self.__local, 'chunks', None)
+        self.__local.chunks = None
+        return chunks or []
+
+    def capturing(self):
+        return getattr(self.__local, 'chunks', None) is not None
+
+    def write(self, stream, data):
+        chunks = getattr(self.__local, 'chunks', None)
+        if chunks is None:
+            stream.write(data)
+        else:
+            chunks.append((stream, data))
+
+    @classmethod
+    def replay(cls, chunks):
+        """
+        Write captured output to the real streams
+        """
+        streams = []
+        for stream, data in chunks:
+            stream.write(data)
+            if stream not in streams:
+                streams.append(stream)
+        for stream in streams:
+            stream.flush()
+
+
+class _CapturedStream(object):
+    """
+    Stream wrapped by an OutputCapture
+    """
+
+    def __init__(self, capture, stream):
+        self.capture = capture
+        self.stream = stream
+
+    def write(self, data):
+        self.capture.write(self.stream, data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if not self.capture.capturing():
+            self.stream.flush()
+
+    def isatty(self):
+        return not self.capture.capturing() and self.stream.isatty()
+
+    def __getattr__(self, name):
+        # encoding, fileno, ... of the real stream
+        return getattr(self.stream, name)
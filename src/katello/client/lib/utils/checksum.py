@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+import os
+import mmap
+import hashlib
+
+# files are read in blocks of this size
+READ_SIZE = 1024 * 1024
+# files of at least this size are mapped to memory instead of being read
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def _blocks(f, size):
+    """
+    Generate the content of an open file in blocks without copying the
+    data of memory mapped files.
+    """
+    if size >= MMAP_THRESHOLD:
+        mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        try:
+            for offset in xrange(0, size, READ_SIZE):
+                yield buffer(mapped, offset, READ_SIZE)
+        finally:
+            mapped.close()
+    else:
+        for block in iter(lambda: f.read(READ_SIZE), ''):
+            yield block
+
+
+def calculate_checksums(filename, checksum_types=('sha256',)):
+    """
+    Compute several digests of a file reading it only once.
+
+    :type filename: string
+    :type checksum_types: list of strings
+    :param checksum_types: names of hashlib algorithms (sha256, sha1, md5, ...)
+    :return: dict mapping the checksum types to hex digests
+    """
+    digests = [(checksum_type, hashlib.new(checksum_type)) for checksum_type in checksum_types]
+    f = open(filename, 'rb')
+    try:
+        for block in _blocks(f, os.fstat(f.fileno()).st_size):
+            for __, digest in digests:
+                digest.update(block)
+    finally:
+        f.close()
+    return dict([(checksum_type, digest.hexdigest()) for checksum_type, digest in digests])
+
+
+def calculate_checksum(checksum_type, filename):
+    """
+    :return: hex digest of the file
+    """
+    return calculate_checksums(filename, (checksum_type,))[checksum_type]
+
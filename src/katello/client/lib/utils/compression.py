@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+
+import zlib
+
+BLOCK_SIZE = 64 * 1024
+# content codings the client decodes, in the order of preference
+SUPPORTED_ENCODINGS = ('gzip', 'deflate')
+
+
+def parse_encodings(header):
+    """
+    :param header: value of an Accept-Encoding or Content-Encoding header
+    :rtype: list of strings
+    :return: lowercase names of the codings, without quality values
+    """
+    if not header:
+        return []
+    encodings = [part.split(';')[0].strip().lower() for part in header.split(',')]
+    return [encoding for encoding in encodings if encoding]
+
+
+def gzip_compress(data, level=6):
+    """
+    :type data: str
+    :rtype: str
+    :return: data in the gzip format (Content-Encoding: gzip)
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class DecodedResponse(object):
+    """
+    HTTP response with a gzip or deflate encoded body, that is decoded block
+    by block as it is read, so a large body is never held in memory twice.
+    Everything except read() is delegated to the wrapped response.
+
+    :ivar encoding: content coding of the body
+    :ivar wire_bytes: number of encoded bytes read so far
+    :ivar decoded_bytes: number of bytes decoded so far
+    """
+
+    def __init__(self, response, encoding, block_size=BLOCK_SIZE):
+        """
+        :type response: HTTPResponse
+        :type encoding: string
+        :param encoding: 'gzip' or 'deflate'
+        """
+        assert encoding in SUPPORTED_ENCODINGS
+        self.response = response
+        self.encoding = encoding
+        self.block_size = block_size
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.__buffer = ''
+        self.__eof = False
+        self.__started = False
+        if encoding == 'gzip':
+            self.__decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            self.__decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+
+    def __decompress(self, block):
+        try:
+            data = self.__decompressor.decompress(block)
+        except zlib.error:
+            if self.__started or self.encoding != 'deflate':
+                raise
+            # some servers send deflate without the zlib header
+            self.__decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            data = self.__decompressor.decompress(block)
+        self.__started = True
+        return data
+
+    def __decode_block(self):
+        block = self.response.read(self.block_size)
+        if block:
+            self.wire_bytes += len(block)
+            data = self.__decompress(block)
+        else:
+            self.__eof = True
+            data = self.__decompressor.flush()
+        self.decoded_bytes += len(data)
+        return data
+
+    def read(self, size=-1):
+        """
+        :param size: maximal number of decoded bytes returned, all when negative or None
+        :rtype: str
+        """
+        chunks = [self.__buffer]
+        available = len(self.__buffer)
+        while (size is None or size < 0 or available < size) and not self.__eof:
+            data = self.__decode_block()
+            chunks.append(data)
+            available += len(data)
+        data = ''.join(chunks)
+        if size is None or size < 0:
+            self.__buffer = ''
+            return data
+        self.__buffer = data[size:]
+        return data[:size]
+
+    def __getattr__(self, name):
+        # status, getheader, will_close, isclosed, ... of the response
+        return getattr(self.response, name)
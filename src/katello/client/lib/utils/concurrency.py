@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+import sys
+import threading
+from Queue import Queue, Empty
+
+DEFAULT_WORKERS = 8
+
+# functions capturing the context of the current thread, see register_thread_context
+_context_captures = []
+
+
+def register_thread_context(capture):
+    """
+    Make worker threads inherit a thread-local context (eg. the active
+    server of a batch line) of the thread that starts them.
+
+    @type capture: function
+    @param capture: function without arguments called in the starting
+    thread, returns a function without arguments that restores the
+    context in the worker thread
+    """
+    _context_captures.append(capture)
+
+
+class ContextThread(threading.Thread):
+    """
+    Daemon thread running with the thread context (see
+    register_thread_context) of the thread that created it.
+    """
+
+    def __init__(self, target, args=()):
+        threading.Thread.__init__(self, target=target, args=args)
+        self.daemon = True
+        self.__restores = [capture() for capture in _context_captures]
+
+    def run(self):
+        for restore in self.__restores:
+            restore()
+        threading.Thread.run(self)
+
+
+def parallel_map(function, items, workers=DEFAULT_WORKERS):
+    """
+    Apply function to every item on a bounded pool of worker threads.
+    The first exception raised by any of the calls is re-raised in the
+    calling thread once all workers stopped.
+
+    @type function: function
+    @param function: function taking one item
+    @type items: iterable
+    @param items: items to process
+    @type workers: int
+    @param workers: maximal number of threads running at the same time
+    @rtype: list
+    @return: results in the order of the items
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+
+    queue = Queue()
+    for index, item in enumerate(items):
+        queue.put((index, item))
+
+    results = [None] * len(items)
+    errors = []
+
+    def worker():
+        while not errors:
+            try:
+                index, item = queue.get_nowait()
+            except Empty:
+                return
+            try:
+                results[index] = function(item)
+            except:  # pylint: disable=W0702
+                errors.append(sys.exc_info())
+
+    threads = [ContextThread(worker) for _i in range(min(workers, len(items)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        # join with a timeout so that KeyboardInterrupt is delivered
+        while thread.is_alive():
+            thread.join(0.1)
+
+    if errors:
+        raise errors[0][0], errors[0][1], errors[0][2]
+    return results
+
+
+def parallel_imap(function, items, workers=DEFAULT_WORKERS):
+    """
+    Lazy counterpart of parallel_map. Results are yielded in the order of
+    the items, each one as soon as it and all the previous ones are ready,
+    while the workers keep processing the following items. An exception
+    raised by a call is re-raised when its result is due. No more items
+    are started once the generator is closed.
+
+    @type function: function
+    @param function: function taking one item
+    @type items: iterable
+    @param items: items to process
+    @type workers: int
+    @param workers: maximal number of threads running at the same time
+    @rtype: generator
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            yield function(item)
+        return
+
+    queue = Queue()
+    for index, item in enumerate(items):
+        queue.put((index, item))
+
+    finished = {}
+    stopped = []
+    condition = threading.Condition()
+
+    def worker():
+        while not stopped:
+            try:
+                index, item = queue.get_nowait()
+            except Empty:
+                return
+            try:
+                outcome = (function(item), None)
+            except:  # pylint: disable=W0702
+                outcome = (None, sys.exc_info())
+            condition.acquire()
+            try:
+                finished[index] = outcome
+                condition.notify()
+            finally:
+                condition.release()
+
+    for _i in range(min(workers, len(items))):
+        ContextThread(worker).start()
+
+    try:
+        for index in range(len(items)):
+            condition.acquire()
+            try:
+                while index not in finished:
+                    # wait with a timeout so that KeyboardInterrupt is delivered
+                    condition.wait(0.1)
+                result, error = finished.pop(index)
+            finally:
+                condition.release()
+            if error:
+                raise error[0], error[1], error[2]
+            yield result
+    finally:
+        stopped.append(True)
+
+
+class BackgroundCall(object):
+    """
+    Function call running in a daemon thread while the caller does
+    something else. The result, or the exception raised by the call,
+    is handed over by result().
+    """
+
+    def __init__(self, function, *args, **kwargs):
+        self.__result = None
+        self.__error = None
+        self.__thread = ContextThread(self.__run, (function, args, kwargs))
+        self.__thread.start()
+
+    def __run(self, function, args, kwargs):
+        try:
+            self.__result = function(*args, **kwargs)
+        except:  # pylint: disable=W0702
+            self.__error = sys.exc_info()
+
+    def result(self):
+        """
+        Wait for the call to finish.
+
+        @return: return value of the function
+        """
+        # join with a timeout so that KeyboardInterrupt is delivered
+        while self.__thread.is_alive():
+            self.__thread.join(0.1)
+        if self.__error:
+            raise self.__error[0], self.__error[1], self.__error[2]
+        return self.__result
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+
+import time
+import threading
+
+
+class DeadlineExceeded(Exception):
+    """
+    The command did not finish before its deadline.
+    The argument is [0] the timeout of the command in seconds.
+    """
+    pass
+
+
+class Deadline(object):
+    """
+    Time by which the running command has to finish. The deadline is shared
+    by all the threads of the process, so it covers requests sent from
+    background threads and worker pools too. Requests limit their socket
+    timeouts to the time remaining and waits between polls or retries
+    don't sleep past it.
+
+    :ivar timeout: seconds the command was given, None without a deadline
+    """
+
+    def __init__(self):
+        self.timeout = None
+        self.__expires = None
+        self.__lock = threading.Lock()
+
+    def start(self, timeout):
+        """
+        :type timeout: float
+        :param timeout: seconds from now the command has to finish in, None for no deadline
+        """
+        self.__lock.acquire()
+        try:
+            self.timeout = timeout
+            self.__expires = time.time() + timeout if timeout is not None else None
+        finally:
+            self.__lock.release()
+
+    def remaining(self):
+        """
+        :rtype: float
+        :return: seconds left (negative when the deadline passed), None without a deadline
+        """
+        expires = self.__expires
+        if expires is None:
+            return None
+        return expires - time.time()
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self):
+        """
+        :raises DeadlineExceeded: when the deadline passed
+        """
+        if self.expired():
+            raise DeadlineExceeded(self.timeout)
+
+    def limit(self, timeout):
+        """
+        Shorten a timeout of a single operation so that it ends by the deadline.
+
+        :type timeout: float
+        :param timeout: seconds, None for no timeout
+        :rtype: float
+        :raises DeadlineExceeded: when the deadline passed already
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def sleep(self, seconds):
+        """
+        Sleep, but not past the deadline.
+
+        :raises DeadlineExceeded: when the deadline passed before the time was up
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            time.sleep(max(remaining, 0))
+            raise DeadlineExceeded(self.timeout)
+        time.sleep(seconds)
+
+
+# deadline of the command run by this process
+command_deadline = Deadline()
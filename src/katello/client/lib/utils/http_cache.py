@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+
+import os
+import time
+import errno
+import hashlib
+import tempfile
+import threading
+import cPickle as pickle
+
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024
+# headers that don't describe the stored body or must not be kept on disk
+UNSTORED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie')
+
+
+class CachedResponse(object):
+    """
+    Response read into memory (or loaded from the cache) that can be
+    processed like an HTTPResponse.
+    """
+
+    def __init__(self, status, headers, body):
+        """
+        :type headers: list of tuples (name, value)
+        :type body: str
+        """
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def read(self, size=-1):
+        return self.body
+
+    def getheader(self, name, default=None):
+        name = name.lower()
+        for header, value in self.headers:
+            if header.lower() == name:
+                return value
+        return default
+
+    def getheaders(self):
+        return self.headers
+
+
+class HTTPCache(object):
+    """
+    On-disk cache of GET responses with their validators (ETag,
+    Last-Modified). Cached responses are never used without asking the
+    server, which answers 304 Not Modified when the cached copy is current.
+
+    Every server and user (scope) has a directory of its own, entries are
+    files replaced atomically, so processes sharing the cache never read
+    a partial entry. The least recently used entries are removed when the
+    size of a scope exceeds max_size.
+
+    :ivar hits: number of responses served from the cache after a 304
+    :ivar misses: number of responses the server sent whole
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+
+    def __count(self, hit):
+        self.__lock.acquire()
+        try:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        finally:
+            self.__lock.release()
+
+    @classmethod
+    def __digest(cls, value):
+        return hashlib.sha1(repr(value)).hexdigest()
+
+    def _path(self, scope, key):
+        return os.path.join(self.directory, self.__digest(scope), self.__digest(key))
+
+    def get(self, scope, key):
+        """
+        :type scope: tuple
+        :param scope: identifies the server and the user
+        :param key: identifies the request (url, language, ...)
+        :rtype: dict
+        :return: the cached entry with keys status, headers, body, etag and
+            last_modified, None when the request is not cached
+        """
+        path = self._path(scope, key)
+        try:
+            f = open(path, 'rb')
+            try:
+                entry = pickle.load(f)
+            finally:
+                f.close()
+        except (IOError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+            return None
+        if not isinstance(entry, dict) or entry.get('key') != key:
+            return None
+        return entry
+
+    def validators(self, entry):
+        """
+        :return: dict of conditional request headers for the cached entry
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, scope, key, entry):
+        """
+        The server confirmed the entry is current (304).
+        :rtype: CachedResponse
+        """
+        self.__count(True)
+        try:
+            # the modification time orders the entries for eviction
+            os.utime(self._path(scope, key), None)
+        except OSError:
+            pass
+        return CachedResponse(entry['status'], entry['headers'], entry['body'])
+
+    @classmethod
+    def cacheable(cls, response):
+        """
+        :return: True if the response has validators and may be stored
+        """
+        if response.status != 200:
+            return False
+        cache_control = (response.getheader('cache-control') or '').lower()
+        if 'no-store' in cache_control:
+            return False
+        return bool(response.getheader('etag') or response.getheader('last-modified'))
+
+    def store(self, scope, key, response):
+        """
+        Store a response read into a CachedResponse if it is cacheable.
+        Failures to write the cache are ignored, it's just a cache.
+        """
+        self.__count(False)
+        if not self.cacheable(response):
+            return
+        entry = {
+            'key': key,
+            'status': response.status,
+            'headers': [(name, value) for name, value in response.getheaders()
+                if name.lower() not in UNSTORED_HEADERS],
+            'body': response.body,
+            'etag': response.getheader('etag'),
+            'last_modified': response.getheader('last-modified'),
+        }
+        path = self._path(scope, key)
+        directory = os.path.dirname(path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0700)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+            try:
+                f = os.fdopen(fd, 'wb')
+                try:
+                    pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+                finally:
+                    f.close()
+                os.rename(tmp_path, path)
+            except:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._evict(directory)
+        except (IOError, OSError, pickle.PicklingError):
+            pass
+
+    def _evict(self, directory):
+        """
+        Remove the least recently used entries of a scope directory
+        until it fits into max_size
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # removed by another process meanwhile
+                continue
+            if name.startswith('.tmp') and stat.st_mtime > time.time() - 3600:
+                # being written by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        while total > self.max_size and entries:
+            _mtime, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError, e:
+                if e.errno != errno.ENOENT:
+                    raise
+            total -= size
+
+    def stats(self):
+        self.__lock.acquire()
+        try:
+            return {'hits': self.hits, 'misses': self.misses}
+        finally:
+            self.__lock.release()
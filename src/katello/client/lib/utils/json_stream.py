@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+#
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+BLOCK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+
+class _Buffer(object):
+    """
+    Data read so far from a stream, consumed from the start.
+    """
+
+    def __init__(self, read, block_size):
+        self.read = read
+        self.block_size = block_size
+        self.data = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Read the next block, drop the consumed data.
+        :return: False when the stream ended
+        """
+        if self.eof:
+            return False
+        block = self.read(self.block_size)
+        if not block:
+            self.eof = True
+            return False
+        self.data = self.data[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self):
+        """
+        :return: next non-whitespace character or None at the end of the stream
+        """
+        while True:
+            while self.pos < len(self.data) and self.data[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.data):
+                return self.data[self.pos]
+            if not self.fill():
+                return None
+
+    def rest(self):
+        while self.fill():
+            pass
+        return self.data[self.pos:]
+
+
+def iter_json_array(read, block_size=BLOCK_SIZE):
+    """
+    Decode a json array from a stream element by element, so that only
+    one element at a time is held in memory. A document that isn't an array
+    is decoded whole and yielded as the only element.
+
+    :type read: function
+    :param read: function taking a number of bytes and returning the next
+        data of the stream, empty string at the end (eg. file.read)
+    :type block_size: int
+    :param block_size: number of bytes read at a time
+    :raises ValueError: when the stream is not valid json
+    """
+    decoder = json.JSONDecoder()
+    buf = _Buffer(read, block_size)
+
+    if buf.skip_whitespace() != '[':
+        yield json.loads(buf.rest())
+        return
+    buf.pos += 1
+
+    expect_element = True
+    while True:
+        char = buf.skip_whitespace()
+        if char is None:
+            raise ValueError("unexpected end of json array")
+        if char == ']':
+            return
+        if not expect_element:
+            if char != ',':
+                raise ValueError("expected ',' at position %d of json array" % buf.pos)
+            buf.pos += 1
+            expect_element = True
+            continue
+
+        try:
+            element, end = decoder.raw_decode(buf.data, idx=buf.pos)
+        except ValueError:
+            # the element is not complete yet or not valid at all
+            if buf.fill():
+                continue
+            raise
+        following = end
+        while following < len(buf.data) and buf.data[following] in WHITESPACE:
+            following += 1
+        if (following == len(buf.data) or buf.data[following] not in ',]') and buf.fill():
+            # numbers cut at the end of the buffer decode too (eg. '1.' of '1.5'),
+            # the element is complete only once its delimiter was read
+            continue
+
+        buf.pos = end
+        expect_element = False
+        yield element
@@ -15,42 +15,16 @@
 #
 
 from katello.client.lib.control import get_katello_mode
-from katello.client.core import (
-  about,
-  activation_key,
-  environment,
-  organization,
-  user,
-  user_role,
-  provider,
-  ping,
-  version,
-  product,
-  repo,
-  packagegroup,
-  permission,
-  distribution,
-  package,
-  puppet_module,
-  errata,
-  system,
-  system_custom_info,
-  task,
-  sync_plan,
-  shell_command,
-  changeset,
-  client,
-  gpg_key,
-  system_group,
-  admin,
-  node,
-  content,
-  content_view,
-  content_view_definition,
-  filter as content_filter,
-  distributor,
-  distributor_custom_info
-)
+from katello.client.core.base import LazyCommand
+
+
+def command(path, *args, **kwargs):
+    """
+    Command registered by the path of its class relative to katello.client.core,
+    its module is imported only when the command is used.
+    """
+    return LazyCommand('katello.client.core.' + path, *args, **kwargs)
+
 
 def setup_admin(katello_cmd, mode=get_katello_mode()):
     # pylint: disable=R0912,R0914,R0915
@@ -59,329 +33,330 @@ def setup_admin(katello_cmd, mode=get_katello_mode()):
     #   R0914: Too many local variables
     #   R0915: Too many statements
 
-    akey_cmd = activation_key.ActivationKey()
-    akey_cmd.add_command('create', activation_key.Create())
-    akey_cmd.add_command('info', activation_key.Info())
-    akey_cmd.add_command('list', activation_key.List())
-    akey_cmd.add_command('update', activation_key.Update())
-    akey_cmd.add_command('delete', activation_key.Delete())
-    akey_cmd.add_command('add_system_group', activation_key.AddSystemGroup())
-    akey_cmd.add_command('remove_system_group', activation_key.RemoveSystemGroup())
+    akey_cmd = command('activation_key.ActivationKey')
+    akey_cmd.add_command('create', command('activation_key.Create'))
+    akey_cmd.add_command('info', command('activation_key.Info'))
+    akey_cmd.add_command('list', command('activation_key.List'))
+    akey_cmd.add_command('update', command('activation_key.Update'))
+    akey_cmd.add_command('delete', command('activation_key.Delete'))
+    akey_cmd.add_command('add_system_group', command('activation_key.AddSystemGroup'))
+    akey_cmd.add_command('remove_system_group', command('activation_key.RemoveSystemGroup'))
     katello_cmd.add_command('activation_key', akey_cmd)
 
-    env_cmd = environment.Environment()
+    env_cmd = command('environment.Environment')
     if mode == 'katello':
-        env_cmd.add_command('create', environment.Create())
-        env_cmd.add_command('delete', environment.Delete())
-        env_cmd.add_command('update', environment.Update())
-    env_cmd.add_command('info', environment.Info())
-    env_cmd.add_command('list', environment.List())
+        env_cmd.add_command('create', command('environment.Create'))
+        env_cmd.add_command('delete', command('environment.Delete'))
+        env_cmd.add_command('update', command('environment.Update'))
+    env_cmd.add_command('info', command('environment.Info'))
+    env_cmd.add_command('list', command('environment.List'))
     katello_cmd.add_command('environment', env_cmd)
 
-    org_cmd = organization.Organization()
-    org_cmd.add_command('create', organization.Create())
-    org_cmd.add_command('info', organization.Info())
-    org_cmd.add_command('list', organization.List())
-    org_cmd.add_command('update', organization.Update())
-    org_cmd.add_command('delete', organization.Delete())
-    org_cmd.add_command('subscriptions', organization.ShowSubscriptions())
+    org_cmd = command('organization.Organization')
+    org_cmd.add_command('create', command('organization.Create'))
+    org_cmd.add_command('info', command('organization.Info'))
+    org_cmd.add_command('list', command('organization.List'))
+    org_cmd.add_command('update', command('organization.Update'))
+    org_cmd.add_command('delete', command('organization.Delete'))
+    org_cmd.add_command('subscriptions', command('organization.ShowSubscriptions'))
     if mode == 'katello':
-        org_cmd.add_command('uebercert', organization.GenerateDebugCert())
-    default_info_cmd = organization.DefaultInfo()
-    default_info_cmd.add_command("add", organization.AddDefaultInfo())
-    default_info_cmd.add_command("remove", organization.RemoveDefaultInfo())
-    default_info_cmd.add_command("sync", organization.SyncDefaultInfo())
+        org_cmd.add_command('uebercert', command('organization.GenerateDebugCert'))
+    default_info_cmd = command('organization.DefaultInfo')
+    default_info_cmd.add_command("add", command('organization.AddDefaultInfo'))
+    default_info_cmd.add_command("remove", command('organization.RemoveDefaultInfo'))
+    default_info_cmd.add_command("sync", command('organization.SyncDefaultInfo'))
     org_cmd.add_command("default_info", default_info_cmd)
-    org_cmd.add_command("attach_all_systems", organization.AttachAllSystems())
+    org_cmd.add_command("attach_all_systems", command('organization.AttachAllSystems'))
     katello_cmd.add_command('org', org_cmd)
 
-    user_cmd = user.User()
-    user_cmd.add_command('create', user.Create())
-    user_cmd.add_command('info', user.Info())
-    user_cmd.add_command('list', user.List())
-    user_cmd.add_command('update', user.Update())
-    user_cmd.add_command('delete', user.Delete())
-    user_cmd.add_command('report', user.Report())
-    user_cmd.add_command('assign_role', user.AssignRole(True))
-    user_cmd.add_command('unassign_role', user.AssignRole(False))
-    user_cmd.add_command('list_roles', user.ListRoles())
-    user_cmd.add_command('sync_ldap_roles', user.SyncLdapRoles())
+    user_cmd = command('user.User')
+    user_cmd.add_command('create', command('user.Create'))
+    user_cmd.add_command('info', command('user.Info'))
+    user_cmd.add_command('list', command('user.List'))
+    user_cmd.add_command('update', command('user.Update'))
+    user_cmd.add_command('delete', command('user.Delete'))
+    user_cmd.add_command('report', command('user.Report'))
+    user_cmd.add_command('assign_role', command('user.AssignRole', True))
+    user_cmd.add_command('unassign_role', command('user.AssignRole', False))
+    user_cmd.add_command('list_roles', command('user.ListRoles'))
+    user_cmd.add_command('sync_ldap_roles', command('user.SyncLdapRoles'))
     katello_cmd.add_command('user', user_cmd)
 
-    user_role_cmd = user_role.UserRole()
-    user_role_cmd.add_command('create', user_role.Create())
-    user_role_cmd.add_command('info', user_role.Info())
-    user_role_cmd.add_command('list', user_role.List())
-    user_role_cmd.add_command('update', user_role.Update())
-    user_role_cmd.add_command('add_ldap_group', user_role.AddLdapGroup())
-    user_role_cmd.add_command('remove_ldap_group', user_role.RemoveLdapGroup())
-    user_role_cmd.add_command('delete', user_role.Delete())
+    user_role_cmd = command('user_role.UserRole')
+    user_role_cmd.add_command('create', command('user_role.Create'))
+    user_role_cmd.add_command('info', command('user_role.Info'))
+    user_role_cmd.add_command('list', command('user_role.List'))
+    user_role_cmd.add_command('update', command('user_role.Update'))
+    user_role_cmd.add_command('add_ldap_group', command('user_role.AddLdapGroup'))
+    user_role_cmd.add_command('remove_ldap_group', command('user_role.RemoveLdapGroup'))
+    user_role_cmd.add_command('delete', command('user_role.Delete'))
     katello_cmd.add_command('user_role', user_role_cmd)
 
-    permission_cmd = permission.Permission()
-    permission_cmd.add_command('create', permission.Create())
-    permission_cmd.add_command('list', permission.List())
-    permission_cmd.add_command('delete', permission.Delete())
-    permission_cmd.add_command('available_verbs', permission.ListAvailableVerbs())
+    permission_cmd = command('permission.Permission')
+    permission_cmd.add_command('create', command('permission.Create'))
+    permission_cmd.add_command('list', command('permission.List'))
+    permission_cmd.add_command('delete', command('permission.Delete'))
+    permission_cmd.add_command('available_verbs', command('permission.ListAvailableVerbs'))
     katello_cmd.add_command('permission', permission_cmd)
 
-    katello_cmd.add_command('about', about.Status())
+    katello_cmd.add_command('about', command('about.Status'))
 
-    katello_cmd.add_command('ping', ping.Status())
-    katello_cmd.add_command('version', version.Info())
+    katello_cmd.add_command('ping', command('ping.Status'))
+    katello_cmd.add_command('version', command('version.Info'))
 
-    prod_cmd = product.Product()
-    prod_cmd.add_command('list', product.List())
+    prod_cmd = command('product.Product')
+    prod_cmd.add_command('list', command('product.List'))
     if mode == 'katello':
-        prod_cmd.add_command('create', product.Create())
-        prod_cmd.add_command('update', product.Update())
-        prod_cmd.add_command('delete', product.Delete())
-        prod_cmd.add_command('synchronize', product.Sync())
-        prod_cmd.add_command('cancel_sync', product.CancelSync())
-        prod_cmd.add_command('status', product.Status())
-        prod_cmd.add_command('set_plan', product.SetSyncPlan())
-        prod_cmd.add_command('remove_plan', product.RemoveSyncPlan())
-        prod_cmd.add_command('repository_sets', product.ListRepositorySets())
-        prod_cmd.add_command('repository_set_enable', product.EnableRepositorySet())
-        prod_cmd.add_command('repository_set_disable', product.DisableRepositorySet())
+        prod_cmd.add_command('create', command('product.Create'))
+        prod_cmd.add_command('update', command('product.Update'))
+        prod_cmd.add_command('delete', command('product.Delete'))
+        prod_cmd.add_command('synchronize', command('product.Sync'))
+        prod_cmd.add_command('cancel_sync', command('product.CancelSync'))
+        prod_cmd.add_command('status', command('product.Status'))
+        prod_cmd.add_command('set_plan', command('product.SetSyncPlan'))
+        prod_cmd.add_command('remove_plan', command('product.RemoveSyncPlan'))
+        prod_cmd.add_command('repository_sets', command('product.ListRepositorySets'))
+        prod_cmd.add_command('repository_set_enable', command('product.EnableRepositorySet'))
+        prod_cmd.add_command('repository_set_disable', command('product.DisableRepositorySet'))
     katello_cmd.add_command('product', prod_cmd)
 
     # these could be set in the same block but are separated
     # for clarity
     if mode == 'katello':
-        repo_cmd = repo.Repo()
-        repo_cmd.add_command('create', repo.Create())
-        repo_cmd.add_command('update', repo.Update())
-        repo_cmd.add_command('discover', repo.Discovery())
-        repo_cmd.add_command('info', repo.Info())
-        repo_cmd.add_command('list', repo.List())
-        repo_cmd.add_command('delete', repo.Delete())
-        repo_cmd.add_command('status', repo.Status())
-        repo_cmd.add_command('synchronize', repo.Sync())
-        repo_cmd.add_command('cancel_sync', repo.CancelSync())
-        repo_cmd.add_command('enable', repo.Enable(True))
-        repo_cmd.add_command('disable', repo.Enable(False))
-        repo_cmd.add_command('content_upload', repo.ContentUpload())
+        repo_cmd = command('repo.Repo')
+        repo_cmd.add_command('create', command('repo.Create'))
+        repo_cmd.add_command('update', command('repo.Update'))
+        repo_cmd.add_command('discover', command('repo.Discovery'))
+        repo_cmd.add_command('info', command('repo.Info'))
+        repo_cmd.add_command('list', command('repo.List'))
+        repo_cmd.add_command('delete', command('repo.Delete'))
+        repo_cmd.add_command('status', command('repo.Status'))
+        repo_cmd.add_command('synchronize', command('repo.Sync'))
+        repo_cmd.add_command('cancel_sync', command('repo.CancelSync'))
+        repo_cmd.add_command('enable', command('repo.Enable', True))
+        repo_cmd.add_command('disable', command('repo.Enable', False))
+        repo_cmd.add_command('content_upload', command('repo.ContentUpload'))
         katello_cmd.add_command('repo', repo_cmd)
 
     if mode == 'katello':
-        package_group_cmd = packagegroup.PackageGroup()
-        package_group_cmd.add_command('list', packagegroup.List())
-        package_group_cmd.add_command('info', packagegroup.Info())
-        package_group_cmd.add_command('category_list', packagegroup.CategoryList())
-        package_group_cmd.add_command('category_info', packagegroup.CategoryInfo())
+        package_group_cmd = command('packagegroup.PackageGroup')
+        package_group_cmd.add_command('list', command('packagegroup.List'))
+        package_group_cmd.add_command('info', command('packagegroup.Info'))
+        package_group_cmd.add_command('category_list', command('packagegroup.CategoryList'))
+        package_group_cmd.add_command('category_info', command('packagegroup.CategoryInfo'))
         katello_cmd.add_command('package_group', package_group_cmd)
 
     if mode == 'katello':
-        puppet_module_cmd = puppet_module.PuppetModule()
-        puppet_module_cmd.add_command('list', puppet_module.List())
-        puppet_module_cmd.add_command('info', puppet_module.Info())
-        puppet_module_cmd.add_command('search', puppet_module.Search())
+        puppet_module_cmd = command('puppet_module.PuppetModule')
+        puppet_module_cmd.add_command('list', command('puppet_module.List'))
+        puppet_module_cmd.add_command('info', command('puppet_module.Info'))
+        puppet_module_cmd.add_command('search', command('puppet_module.Search'))
         katello_cmd.add_command('puppet_module', puppet_module_cmd)
 
     if mode == 'katello':
-        dist_cmd = distribution.Distribution()
-        dist_cmd.add_command('info', distribution.Info())
-        dist_cmd.add_command('list', distribution.List())
+        dist_cmd = command('distribution.Distribution')
+        dist_cmd.add_command('info', command('distribution.Info'))
+        dist_cmd.add_command('list', command('distribution.List'))
         katello_cmd.add_command('distribution', dist_cmd)
 
     if mode == 'katello':
-        pack_cmd = package.Package()
-        pack_cmd.add_command('info', package.Info())
-        pack_cmd.add_command('list', package.List())
-        pack_cmd.add_command('search', package.Search())
+        pack_cmd = command('package.Package')
+        pack_cmd.add_command('info', command('package.Info'))
+        pack_cmd.add_command('list', command('package.List'))
+        pack_cmd.add_command('search', command('package.Search'))
         katello_cmd.add_command('package', pack_cmd)
 
     if mode == 'katello':
-        errata_cmd = errata.Errata()
-        errata_cmd.add_command('list', errata.List())
-        errata_cmd.add_command('info', errata.Info())
-        errata_cmd.add_command('system', errata.SystemErrata())
-        errata_cmd.add_command('system_group', errata.SystemGroupErrata())
+        errata_cmd = command('errata.Errata')
+        errata_cmd.add_command('list', command('errata.List'))
+        errata_cmd.add_command('info', command('errata.Info'))
+        errata_cmd.add_command('system', command('errata.SystemErrata'))
+        errata_cmd.add_command('system_group', command('errata.SystemGroupErrata'))
         katello_cmd.add_command('errata', errata_cmd)
 
-    system_cmd = system.System()
-    system_cmd.add_command('list', system.List())
-    system_cmd.add_command('register', system.Register())
-    system_cmd.add_command('unregister', system.Unregister())
-    system_cmd.add_command('subscriptions', system.Subscriptions())
-    system_cmd.add_command('subscribe', system.Subscribe())
-    system_cmd.add_command('unsubscribe', system.Unsubscribe())
-    system_cmd.add_command('info', system.Info())
-    system_cmd.add_command('facts', system.Facts())
-    system_cmd.add_command('update', system.Update())
-    system_cmd.add_command('report', system.Report())
-    system_cmd.add_command('releases', system.Releases())
-    system_cmd.add_command('remove_deletion', system.RemoveDeletion())
+    system_cmd = command('system.System')
+    system_cmd.add_command('list', command('system.List'))
+    system_cmd.add_command('register', command('system.Register'))
+    system_cmd.add_command('unregister', command('system.Unregister'))
+    system_cmd.add_command('subscriptions', command('system.Subscriptions'))
+    system_cmd.add_command('subscribe', command('system.Subscribe'))
+    system_cmd.add_command('unsubscribe', command('system.Unsubscribe'))
+    system_cmd.add_command('info', command('system.Info'))
+    system_cmd.add_command('facts', command('system.Facts'))
+    system_cmd.add_command('update', command('system.Update'))
+    system_cmd.add_command('report', command('system.Report'))
+    system_cmd.add_command('releases', command('system.Releases'))
+    system_cmd.add_command('remove_deletion', command('system.RemoveDeletion'))
     if mode == 'katello':
-        system_cmd.add_command('tasks', system.TasksList())
-        system_cmd.add_command('task', system.TaskInfo())
-        system_cmd.add_command('packages', system.InstalledPackages())
-    system_cmd.add_command('add_to_groups', system.AddSystemGroups())
-    system_cmd.add_command('remove_from_groups', system.RemoveSystemGroups())
-    system_custom_info_cmd = system.CustomInfo()
-    system_custom_info_cmd.add_command('add', system_custom_info.AddSystemCustomInfo())
-    system_custom_info_cmd.add_command('update', system_custom_info.UpdateSystemCustomInfo())
-    system_custom_info_cmd.add_command('remove', system_custom_info.RemoveSystemCustomInfo())
+        system_cmd.add_command('tasks', command('system.TasksList'))
+        system_cmd.add_command('task', command('system.TaskInfo'))
+        system_cmd.add_command('packages', command('system.InstalledPackages'))
+    system_cmd.add_command('add_to_groups', command('system.AddSystemGroups'))
+    system_cmd.add_command('remove_from_groups', command('system.RemoveSystemGroups'))
+    system_custom_info_cmd = command('system.CustomInfo')
+    system_custom_info_cmd.add_command('add', command('system_custom_info.AddSystemCustomInfo'))
+    system_custom_info_cmd.add_command('update', command('system_custom_info.UpdateSystemCustomInfo'))
+    system_custom_info_cmd.add_command('remove', command('system_custom_info.RemoveSystemCustomInfo'))
     system_cmd.add_command('custom_info', system_custom_info_cmd)
     katello_cmd.add_command('system', system_cmd)
 
-    distributor_cmd = distributor.Distributor()
-    distributor_cmd.add_command('list', distributor.List())
-    distributor_cmd.add_command('list-versions', distributor.ListVersions())
-    distributor_cmd.add_command('create', distributor.Create())
-    distributor_cmd.add_command('delete', distributor.Delete())
-    distributor_cmd.add_command('subscriptions', distributor.Subscriptions())
-    distributor_cmd.add_command('subscribe', distributor.Subscribe())
-    distributor_cmd.add_command('unsubscribe', distributor.Unsubscribe())
-    distributor_cmd.add_command('info', distributor.Info())
-    distributor_cmd.add_command('update', distributor.Update())
-    distributor_custom_info_cmd = distributor.CustomInfo()
-    distributor_custom_info_cmd.add_command('add', distributor_custom_info.AddCustomInfo())
-    distributor_custom_info_cmd.add_command('update', distributor_custom_info.UpdateCustomInfo())
-    distributor_custom_info_cmd.add_command('remove', distributor_custom_info.RemoveCustomInfo())
+    distributor_cmd = command('distributor.Distributor')
+    distributor_cmd.add_command('list', command('distributor.List'))
+    distributor_cmd.add_command('list-versions', command('distributor.ListVersions'))
+    distributor_cmd.add_command('create', command('distributor.Create'))
+    distributor_cmd.add_command('delete', command('distributor.Delete'))
+    distributor_cmd.add_command('subscriptions', command('distributor.Subscriptions'))
+    distributor_cmd.add_command('subscribe', command('distributor.Subscribe'))
+    distributor_cmd.add_command('unsubscribe', command('distributor.Unsubscribe'))
+    distributor_cmd.add_command('info', command('distributor.Info'))
+    distributor_cmd.add_command('update', command('distributor.Update'))
+    distributor_custom_info_cmd = command('distributor.CustomInfo')
+    distributor_custom_info_cmd.add_command('add', command('distributor_custom_info.AddCustomInfo'))
+    distributor_custom_info_cmd.add_command('update', command('distributor_custom_info.UpdateCustomInfo'))
+    distributor_custom_info_cmd.add_command('remove', command('distributor_custom_info.RemoveCustomInfo'))
     distributor_cmd.add_command('custom_info', distributor_custom_info_cmd)
     katello_cmd.add_command('distributor', distributor_cmd)
 
-    system_group_cmd = system_group.SystemGroup()
-    system_group_cmd.add_command('list', system_group.List())
-    system_group_cmd.add_command('info', system_group.Info())
-    system_group_cmd.add_command('systems', system_group.Systems())
-    system_group_cmd.add_command('add_systems', system_group.AddSystems())
-    system_group_cmd.add_command('remove_systems', system_group.RemoveSystems())
-    system_group_cmd.add_command('create', system_group.Create())
-    system_group_cmd.add_command('copy', system_group.Copy())
-    system_group_cmd.add_command('update', system_group.Update())
-    system_group_cmd.add_command('delete', system_group.Delete())
+    system_group_cmd = command('system_group.SystemGroup')
+    system_group_cmd.add_command('list', command('system_group.List'))
+    system_group_cmd.add_command('info', command('system_group.Info'))
+    system_group_cmd.add_command('systems', command('system_group.Systems'))
+    system_group_cmd.add_command('add_systems', command('system_group.AddSystems'))
+    system_group_cmd.add_command('remove_systems', command('system_group.RemoveSystems'))
+    system_group_cmd.add_command('create', command('system_group.Create'))
+    system_group_cmd.add_command('copy', command('system_group.Copy'))
+    system_group_cmd.add_command('update', command('system_group.Update'))
+    system_group_cmd.add_command('delete', command('system_group.Delete'))
     if mode == 'katello':
-        system_group_cmd.add_command('job_history', system_group.History())
-        system_group_cmd.add_command('job_tasks', system_group.HistoryTasks())
-        system_group_cmd.add_command('packages', system_group.Packages())
-        system_group_cmd.add_command('errata', system_group.Errata())
-        system_group_cmd.add_command('update_systems', system_group.UpdateSystems())
+        system_group_cmd.add_command('job_history', command('system_group.History'))
+        system_group_cmd.add_command('job_tasks', command('system_group.HistoryTasks'))
+        system_group_cmd.add_command('packages', command('system_group.Packages'))
+        system_group_cmd.add_command('errata', command('system_group.Errata'))
+        system_group_cmd.add_command('update_systems', command('system_group.UpdateSystems'))
     katello_cmd.add_command('system_group', system_group_cmd)
 
     if mode == 'katello':
-        sync_plan_cmd = sync_plan.SyncPlan()
-        sync_plan_cmd.add_command('create', sync_plan.Create())
-        sync_plan_cmd.add_command('info', sync_plan.Info())
-        sync_plan_cmd.add_command('list', sync_plan.List())
-        sync_plan_cmd.add_command('update', sync_plan.Update())
-        sync_plan_cmd.add_command('delete', sync_plan.Delete())
+        sync_plan_cmd = command('sync_plan.SyncPlan')
+        sync_plan_cmd.add_command('create', command('sync_plan.Create'))
+        sync_plan_cmd.add_command('info', command('sync_plan.Info'))
+        sync_plan_cmd.add_command('list', command('sync_plan.List'))
+        sync_plan_cmd.add_command('update', command('sync_plan.Update'))
+        sync_plan_cmd.add_command('delete', command('sync_plan.Delete'))
         katello_cmd.add_command('sync_plan', sync_plan_cmd)
 
-    katello_cmd.add_command('shell', shell_command.ShellAction(katello_cmd))
+    katello_cmd.add_command('shell', command('shell_command.ShellAction', katello_cmd))
+    katello_cmd.add_command('batch', command('batch_command.BatchAction', katello_cmd))
 
-    prov_cmd = provider.Provider()
-    prov_cmd.add_command('info', provider.Info())
-    prov_cmd.add_command('list', provider.List())
-    prov_cmd.add_command('import_manifest', provider.ImportManifest())
-    prov_cmd.add_command('refresh_manifest', provider.RefreshManifest())
-    prov_cmd.add_command('update', provider.Update())
+    prov_cmd = command('provider.Provider')
+    prov_cmd.add_command('info', command('provider.Info'))
+    prov_cmd.add_command('list', command('provider.List'))
+    prov_cmd.add_command('import_manifest', command('provider.ImportManifest'))
+    prov_cmd.add_command('refresh_manifest', command('provider.RefreshManifest'))
+    prov_cmd.add_command('update', command('provider.Update'))
     if mode == 'headpin':
-        prov_cmd.add_command('delete_manifest', provider.DeleteManifest())
+        prov_cmd.add_command('delete_manifest', command('provider.DeleteManifest'))
     if mode == 'katello':
-        prov_cmd.add_command('create', provider.Update(create=True))
-        prov_cmd.add_command('delete', provider.Delete())
-        prov_cmd.add_command('synchronize', provider.Sync())
-        prov_cmd.add_command('cancel_sync', provider.CancelSync())
-        prov_cmd.add_command('status', provider.Status())
-        prov_cmd.add_command('refresh_products', provider.RefreshProducts())
+        prov_cmd.add_command('create', command('provider.Update', create=True))
+        prov_cmd.add_command('delete', command('provider.Delete'))
+        prov_cmd.add_command('synchronize', command('provider.Sync'))
+        prov_cmd.add_command('cancel_sync', command('provider.CancelSync'))
+        prov_cmd.add_command('status', command('provider.Status'))
+        prov_cmd.add_command('refresh_products', command('provider.RefreshProducts'))
     katello_cmd.add_command('provider', prov_cmd)
 
     if mode == 'katello':
-        node_cmd = node.Node()
-        node_cmd.add_command('list', node.List())
-        node_cmd.add_command('sync', node.Sync())
-        node_cmd.add_command('add_environment', node.AddEnvironment())
-        node_cmd.add_command('remove_environment', node.RemoveEnvironment())
+        node_cmd = command('node.Node')
+        node_cmd.add_command('list', command('node.List'))
+        node_cmd.add_command('sync', command('node.Sync'))
+        node_cmd.add_command('add_environment', command('node.AddEnvironment'))
+        node_cmd.add_command('remove_environment', command('node.RemoveEnvironment'))
         katello_cmd.add_command('node', node_cmd)
 
     if mode == 'katello':
-        cset_cmd = changeset.Changeset()
-        cset_cmd.add_command('create', changeset.Create())
-        cset_cmd.add_command('list', changeset.List())
-        cset_cmd.add_command('info', changeset.Info())
-        cset_cmd.add_command('update', changeset.UpdateContent())
-        cset_cmd.add_command('delete', changeset.Delete())
-        cset_cmd.add_command('apply', changeset.Apply())
-        cset_cmd.add_command('promote', changeset.Promote())
+        cset_cmd = command('changeset.Changeset')
+        cset_cmd.add_command('create', command('changeset.Create'))
+        cset_cmd.add_command('list', command('changeset.List'))
+        cset_cmd.add_command('info', command('changeset.Info'))
+        cset_cmd.add_command('update', command('changeset.UpdateContent'))
+        cset_cmd.add_command('delete', command('changeset.Delete'))
+        cset_cmd.add_command('apply', command('changeset.Apply'))
+        cset_cmd.add_command('promote', command('changeset.Promote'))
         katello_cmd.add_command('changeset', cset_cmd)
 
     if mode == 'katello':
-        content_cmd = content.Content()
-        cv_cmd = content_view.ContentView()
-        cv_cmd.add_command('list', content_view.List())
-        cv_cmd.add_command('info', content_view.Info())
-        cv_cmd.add_command('promote', content_view.Promote())
-        cv_cmd.add_command('refresh', content_view.Refresh())
-        cv_cmd.add_command('delete', content_view.Delete())
-        cvd_cmd = content_view_definition.ContentViewDefinition()
-        cvd_cmd.add_command('list', content_view_definition.List())
-        cvd_cmd.add_command('info', content_view_definition.Info())
-        cvd_cmd.add_command('create', content_view_definition.Create())
-        cvd_cmd.add_command('delete', content_view_definition.Delete())
-        cvd_cmd.add_command('update', content_view_definition.Update())
-        cvd_cmd.add_command('publish', content_view_definition.Publish())
-        cvd_cmd.add_command('clone', content_view_definition.Clone())
+        content_cmd = command('content.Content')
+        cv_cmd = command('content_view.ContentView')
+        cv_cmd.add_command('list', command('content_view.List'))
+        cv_cmd.add_command('info', command('content_view.Info'))
+        cv_cmd.add_command('promote', command('content_view.Promote'))
+        cv_cmd.add_command('refresh', command('content_view.Refresh'))
+        cv_cmd.add_command('delete', command('content_view.Delete'))
+        cvd_cmd = command('content_view_definition.ContentViewDefinition')
+        cvd_cmd.add_command('list', command('content_view_definition.List'))
+        cvd_cmd.add_command('info', command('content_view_definition.Info'))
+        cvd_cmd.add_command('create', command('content_view_definition.Create'))
+        cvd_cmd.add_command('delete', command('content_view_definition.Delete'))
+        cvd_cmd.add_command('update', command('content_view_definition.Update'))
+        cvd_cmd.add_command('publish', command('content_view_definition.Publish'))
+        cvd_cmd.add_command('clone', command('content_view_definition.Clone'))
         cvd_cmd.add_command('add_product',
-                content_view_definition.AddRemoveProduct(True))
+                command('content_view_definition.AddRemoveProduct', True))
         cvd_cmd.add_command('remove_product',
-                content_view_definition.AddRemoveProduct(False))
+                command('content_view_definition.AddRemoveProduct', False))
         cvd_cmd.add_command('add_repo',
-                content_view_definition.AddRemoveRepo(True))
+                command('content_view_definition.AddRemoveRepo', True))
         cvd_cmd.add_command('remove_repo',
-                content_view_definition.AddRemoveRepo(False))
+                command('content_view_definition.AddRemoveRepo', False))
         cvd_cmd.add_command('add_view',
-                content_view_definition.AddRemoveContentView(True))
+                command('content_view_definition.AddRemoveContentView', True))
         cvd_cmd.add_command('remove_view',
-                content_view_definition.AddRemoveContentView(False))
+                command('content_view_definition.AddRemoveContentView', False))
 
-        filter_cmd = content_filter.Filter()
-        filter_cmd.add_command('list', content_filter.List())
-        filter_cmd.add_command('info', content_filter.Info())
-        filter_cmd.add_command('create', content_filter.Create())
-        filter_cmd.add_command('delete', content_filter.Delete())
+        filter_cmd = command('filter.Filter')
+        filter_cmd.add_command('list', command('filter.List'))
+        filter_cmd.add_command('info', command('filter.Info'))
+        filter_cmd.add_command('create', command('filter.Create'))
+        filter_cmd.add_command('delete', command('filter.Delete'))
         filter_cmd.add_command('add_product',
-                content_filter.AddRemoveProduct(True))
+                command('filter.AddRemoveProduct', True))
         filter_cmd.add_command('remove_product',
-                content_filter.AddRemoveProduct(False))
+                command('filter.AddRemoveProduct', False))
         filter_cmd.add_command('add_repo',
-                content_filter.AddRemoveRepo(True))
+                command('filter.AddRemoveRepo', True))
         filter_cmd.add_command('remove_repo',
-                content_filter.AddRemoveRepo(False))
+                command('filter.AddRemoveRepo', False))
         filter_cmd.add_command('add_rule',
-                content_filter.AddRule())
+                command('filter.AddRule'))
         filter_cmd.add_command('remove_rule',
-                content_filter.RemoveRule())
+                command('filter.RemoveRule'))
         cvd_cmd.add_command("filter", filter_cmd)
         content_cmd.add_command('view', cv_cmd)
         content_cmd.add_command('definition', cvd_cmd)
         katello_cmd.add_command('content', content_cmd)
 
     if mode == 'katello':
-        task_cmd = task.Task()
-        task_cmd.add_command('status', task.Status())
-        task_cmd.add_command('list', task.List())
+        task_cmd = command('task.Task')
+        task_cmd.add_command('status', command('task.Status'))
+        task_cmd.add_command('list', command('task.List'))
         katello_cmd.add_command('task', task_cmd)
 
-    client_cmd = client.Client()
-    client_cmd.add_command('remember', client.Remember())
-    client_cmd.add_command('forget', client.Forget())
-    client_cmd.add_command('saved_options', client.SavedOptions())
+    client_cmd = command('client.Client')
+    client_cmd.add_command('remember', command('client.Remember'))
+    client_cmd.add_command('forget', command('client.Forget'))
+    client_cmd.add_command('saved_options', command('client.SavedOptions'))
     katello_cmd.add_command('client', client_cmd)
 
     if mode == 'katello':
-        gpgkey_cmd = gpg_key.GpgKey()
-        gpgkey_cmd.add_command('create', gpg_key.Create())
-        gpgkey_cmd.add_command('info', gpg_key.Info())
-        gpgkey_cmd.add_command('list', gpg_key.List())
-        gpgkey_cmd.add_command('update', gpg_key.Update())
-        gpgkey_cmd.add_command('delete', gpg_key.Delete())
+        gpgkey_cmd = command('gpg_key.GpgKey')
+        gpgkey_cmd.add_command('create', command('gpg_key.Create'))
+        gpgkey_cmd.add_command('info', command('gpg_key.Info'))
+        gpgkey_cmd.add_command('list', command('gpg_key.List'))
+        gpgkey_cmd.add_command('update', command('gpg_key.Update'))
+        gpgkey_cmd.add_command('delete', command('gpg_key.Delete'))
         katello_cmd.add_command('gpg_key', gpgkey_cmd)
 
     if mode == 'katello':
-        admin_cmd = admin.Admin()
-        admin_cmd.add_command('crl_regen', admin.CrlRegen())
+        admin_cmd = command('admin.Admin')
+        admin_cmd.add_command('crl_regen', command('admin.CrlRegen'))
         katello_cmd.add_command('admin', admin_cmd)
 
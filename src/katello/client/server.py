@@ -14,28 +14,39 @@
 # in this software or its documentation.
 
 import base64
-import kerberos
-from kerberos import GSSError
+import errno
 import httplib
 import logging
 import os
+import socket
+import threading
 import urllib
 import mimetypes
+import random
 import sys
+import time
+from email.utils import parsedate_tz, mktime_tz
+from Cookie import SimpleCookie, CookieError
 
 try:
     import json
 except ImportError:
     import simplejson as json
 
-from M2Crypto import SSL, httpslib
-
 from katello.client.logutil import getLogger
 from katello.client.lib.utils.encoding import u_str
+from katello.client.lib.utils.json_stream import iter_json_array
+from katello.client.lib.utils.http_cache import CachedResponse
+from katello.client.lib.utils.concurrency import register_thread_context
+from katello.client.lib.utils.deadline import command_deadline, DeadlineExceeded
+from katello.client.lib.utils.compression import DecodedResponse, SUPPORTED_ENCODINGS, parse_encodings, \
+    gzip_compress
 
 # current active server -------------------------------------------------------
 
+# server of the process, used by threads that have no server of their own
 active_server = None
+_thread_servers = threading.local()
 
 
 def set_active_server(server):
@@ -43,12 +54,68 @@ def set_active_server(server):
     assert isinstance(server, KatelloServer)
     active_server = server
 
+
+def set_thread_server(server):
+    """
+    Set the active server of the current thread only, None to fall back
+    to the server of the process.
+    """
+    assert server is None or isinstance(server, KatelloServer)
+    _thread_servers.server = server
+
+
+def get_active_server():
+    """
+    @rtype: KatelloServer
+    @return: active server of the current thread or of the process
+    """
+    return getattr(_thread_servers, 'server', None) or active_server
+
+
+def _capture_thread_server():
+    """
+    Capture the server of the current thread and its options of the thread
+    (credentials, --no-cache) for the worker threads the thread starts.
+    @return: function restoring them in a worker thread
+    """
+    thread_server = getattr(_thread_servers, 'server', None)
+    server = thread_server or active_server
+    options = server is not None and dict(server._thread_options.__dict__) or {}
+
+    def restore():
+        _thread_servers.server = thread_server
+        if server is not None:
+            server._thread_options.__dict__.update(options)
+    return restore
+
+register_thread_context(_capture_thread_server)
+
+
+def loaded_errors(module_name, *names):
+    """
+    Exception classes of a module that is imported on first use only
+    (M2Crypto, kerberos). A module that was not imported yet can't have
+    raised anything, so an empty tuple, which matches no exception in
+    an except clause, is returned then.
+
+    @type module_name: string
+    @param names: names of the exception classes in the module
+    @rtype: tuple
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        return ()
+    return tuple([getattr(module, name) for name in names])
+
 # authentication strategies ---------------------------------------------------
 
 class AuthenticationStrategy(object):
 
     _log = getLogger('katello')
 
+    # errors signalling that a reused keep-alive connection went stale
+    connection_errors = (socket.error, httplib.HTTPException)
+
     @classmethod
     def _get_connection(cls, host, port, protocol):
         if protocol == "https":
@@ -60,9 +127,48 @@ class AuthenticationStrategy(object):
     def set_headers(cls, headers):
         return headers
 
+    def process_response(self, response):
+        """
+        Called with every response received with headers of this strategy
+        (before its body is read), eg. to pick up session cookies.
+        """
+        pass
+
+    def renegotiate(self, headers):
+        """
+        Called when a request was refused with 401.
+        @type headers: dict
+        @param headers: headers the refused request was sent with
+        @rtype: bool
+        @return: True if the request should be sent once more with fresh headers
+        """
+        return False
+
+    def stats(self):
+        """
+        @rtype: dict
+        @return: counters of the strategy for the debug log, empty if it has none
+        """
+        return {}
+
     def connect(self, host, port, protocol):
         return self._get_connection(host, port, protocol)
 
+    def connection_key(self):
+        """
+        Key under which connections opened by this strategy are pooled.
+        Strategies that bind a connection to an identity extend it.
+        @rtype: tuple
+        """
+        return (self.__class__.__name__,)
+
+    def identity(self):
+        """
+        User the requests are authenticated as, None when it's not known.
+        Responses are cached only for a known user.
+        """
+        return None
+
 class NoAuthentication(AuthenticationStrategy):
 
     def connect(self, host, port, protocol):
@@ -86,11 +192,42 @@ class BasicAuthentication(AuthenticationStrategy):
         self._log.debug('making basic %s connection with: %s, %s' % (protocol, self.__username, self.__password))
         return self._get_connection(host, port, protocol)
 
+    def connection_key(self):
+        return (self.__class__.__name__, self.__username)
+
+    def identity(self):
+        return self.__username
+
 
 class SSLAuthentication(AuthenticationStrategy):
+    """
+    Authentication by a client certificate. The SSL context is built once
+    per process for every certificate and key, so their PEM files are read
+    only once. The TLS session of a server is offered to every following
+    connection to the server, which resumes it with an abbreviated handshake
+    instead of the full one. The protocol is negotiated, SSL 2 and 3 are
+    refused.
+
+    @cvar full_handshakes: number of full TLS handshakes in this process
+    @cvar resumed_handshakes: number of TLS sessions resumed in this process
+    """
+
+    # OpenSSL options, in case M2Crypto doesn't define them
+    OP_NO_SSLv2 = 0x01000000
+    OP_NO_SSLv3 = 0x02000000
+
+    full_handshakes = 0
+    resumed_handshakes = 0
+    # (certfile, keyfile, modification times) -> SSL.Context
+    _contexts = {}
+    # (host, port) + key of the context -> last SSL.Session of the server
+    _sessions = {}
+    _lock = threading.Lock()
 
     def __init__(self, certfile, keyfile):
         super(SSLAuthentication, self).__init__()
+        from M2Crypto import SSL
+        self.connection_errors = AuthenticationStrategy.connection_errors + (SSL.SSLError,)
         self.__certfile = certfile
         self.__keyfile = keyfile
         self.__check_cert_and_key()
@@ -103,37 +240,631 @@ class SSLAuthentication(AuthenticationStrategy):
             raise RuntimeError(_('key file %s does not exist or cannot be read')
                                % self.__keyfile)
 
+    @classmethod
+    def _create_context(cls, certfile, keyfile):
+        from M2Crypto import SSL, m2
+        ssl_context = SSL.Context('sslv23')
+        ssl_context.set_options(getattr(m2, 'SSL_OP_NO_SSLv2', cls.OP_NO_SSLv2) |
+            getattr(m2, 'SSL_OP_NO_SSLv3', cls.OP_NO_SSLv3))
+        ssl_context.load_cert(certfile, keyfile)
+        return ssl_context
+
+    def _context(self):
+        """
+        @return: tuple of the key and the SSL.Context of the certificate and
+        key, built again only when the files change (eg. the certificate was
+        renewed). The contexts and sessions of the old files are dropped then.
+        """
+        key = (self.__certfile, self.__keyfile,
+            os.path.getmtime(self.__certfile), os.path.getmtime(self.__keyfile))
+        self._lock.acquire()
+        try:
+            ssl_context = self._contexts.get(key)
+            if ssl_context is None:
+                self._log.debug('loading SSL certificate %s and key %s' % (self.__certfile, self.__keyfile))
+                for old in [k for k in self._contexts if k[:2] == key[:2]]:
+                    del self._contexts[old]
+                for old in [k for k in self._sessions if k[2:4] == key[:2]]:
+                    del self._sessions[old]
+                ssl_context = self._contexts[key] = self._create_context(self.__certfile, self.__keyfile)
+            return key, ssl_context
+        finally:
+            self._lock.release()
+
+    @classmethod
+    def _copy_session(cls, sock):
+        """
+        M2Crypto hands out the session of a connection without taking a
+        reference, OpenSSL frees it with the connection or replaces it when
+        a TLS 1.3 ticket arrives. The copy stays valid for later connections.
+        @return: Session owned by the caller, None when it can't be copied
+        """
+        from M2Crypto import BIO, m2
+        from M2Crypto.SSL.Session import Session
+        if hasattr(m2, 'ssl_get1_session'):
+            session = m2.ssl_get1_session(sock.ssl)
+        else:
+            # older M2Crypto, copy the session through PEM
+            session = m2.ssl_get_session(sock.ssl)
+            buf = BIO.MemoryBuffer()
+            if not session or not m2.ssl_session_write_pem(session, buf.bio_ptr()):
+                return None
+            session = m2.ssl_session_read_pem(buf.bio_ptr())
+        if not session:
+            return None
+        return Session(session, 1)
+
+    def _keep_session(self, key, sock):
+        """
+        Remember the session of a connection for the next connections to the server
+        """
+        session = self._copy_session(sock)
+        self._lock.acquire()
+        try:
+            # the context may have been replaced by a renewed certificate meanwhile
+            if session is not None and key[2:] in self._contexts:
+                self._sessions[key] = session
+        finally:
+            self._lock.release()
+
+    def _handshake_done(self, key, offered, sock):
+        """
+        Remember the session of a new connection and count the handshake.
+        M2Crypto hands out the offered session again when it was resumed.
+        """
+        resumed = offered is not None and sock.get_session().as_der() == offered.as_der()
+        self._lock.acquire()
+        try:
+            if resumed:
+                SSLAuthentication.resumed_handshakes += 1
+            else:
+                SSLAuthentication.full_handshakes += 1
+        finally:
+            self._lock.release()
+        self._keep_session(key, sock)
+
+    @classmethod
+    def set_timeout(cls, sock, timeout):
+        """
+        M2Crypto connections take the timeouts as socket options
+        @type timeout: float
+        @param timeout: seconds, None for no timeout
+        """
+        from M2Crypto import SSL
+        seconds = timeout or 0
+        ssl_timeout = SSL.timeout(int(seconds), int((seconds - int(seconds)) * 1000000))
+        sock.set_socket_read_timeout(ssl_timeout)
+        sock.set_socket_write_timeout(ssl_timeout)
+
+    @classmethod
+    def _open(cls, connection):
+        """
+        Connect the httpslib connection as its connect() does, but with the
+        timeout of the connection set on the socket before the TCP connect
+        and the handshake. httpslib ignores the timeout, a server that
+        doesn't answer would block the handshake forever.
+        """
+        from M2Crypto import SSL
+        timeout = connection.timeout
+        if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+            timeout = socket.getdefaulttimeout()
+        error = None
+        for family, _type, _proto, _name, _address in \
+                socket.getaddrinfo(connection.host, connection.port, 0, socket.SOCK_STREAM):
+            sock = SSL.Connection(connection.ssl_ctx, family=family)
+            try:
+                cls.set_timeout(sock, timeout)
+                if hasattr(sock, 'set_tlsext_host_name'):
+                    sock.set_tlsext_host_name(connection.host)
+                if connection.session is not None:
+                    sock.set_session(connection.session)
+                # the check of the peer certificate would hide a handshake that didn't complete
+                check = getattr(sock, 'postConnectionCheck', getattr(sock, 'clientPostConnectionCheck', None))
+                sock.postConnectionCheck = None
+                if sock.connect((connection.host, connection.port)) != 1:
+                    if timeout:
+                        raise socket.timeout(_("timed out"))
+                    raise SSL.SSLError(_("TLS handshake with %s failed") % connection.host)
+                if check is not None and not check(sock.get_peer_cert(), connection.host):
+                    from M2Crypto.SSL.Checker import SSLVerificationError
+                    raise SSLVerificationError(_("post connection check failed"))
+                connection.sock, sock = sock, None
+                return
+            except socket.error, e:
+                # the connect of a socket with a send timeout gives up with EINPROGRESS
+                if e.errno in (errno.EINPROGRESS, errno.EAGAIN):
+                    e = socket.timeout(_("timed out"))
+                error = e
+            finally:
+                if sock is not None:
+                    sock.close()
+        if error is None:
+            raise socket.error(_("no address of %s found") % connection.host)
+        raise error
+
     def connect(self, host, port, protocol):
         if protocol != "https":
             raise RuntimeError(_("can't authenticate via certificate when not using https connection"))
-        ssl_context = SSL.Context('sslv3')
-        ssl_context.load_cert(self.__certfile, self.__keyfile)
+        from M2Crypto import httpslib
         self._log.debug('making SSL connection with: %s, %s' % (self.__certfile, self.__keyfile))
-        return httpslib.HTTPSConnection(host, port, ssl_context=ssl_context)
+        context_key, ssl_context = self._context()
+        connection = httpslib.HTTPSConnection(host, port, ssl_context=ssl_context)
+
+        key = (host, port) + context_key
+        self._lock.acquire()
+        try:
+            offered = self._sessions.get(key)
+        finally:
+            self._lock.release()
+        if offered is not None:
+            connection.set_session(offered)
+
+        close = connection.close
+        def handshake():
+            self._open(connection)
+            self._handshake_done(key, offered, connection.sock)
+        def close_and_keep_session():
+            # TLS 1.3 servers send the resumable session after the handshake
+            if connection.sock is not None:
+                self._keep_session(key, connection.sock)
+            close()
+        connection.connect = handshake
+        connection.close = close_and_keep_session
+        return connection
+
+    @classmethod
+    def clear(cls):
+        """
+        Forget the SSL contexts and the TLS sessions of the process
+        """
+        cls._lock.acquire()
+        try:
+            cls._contexts.clear()
+            cls._sessions.clear()
+        finally:
+            cls._lock.release()
+
+    def stats(self):
+        return {'full_TLS_handshakes': self.full_handshakes, 'resumed_TLS_sessions': self.resumed_handshakes}
+
+    def connection_key(self):
+        return (self.__class__.__name__, self.__certfile, self.__keyfile)
+
+    def identity(self):
+        return self.__certfile
 
 
 class KerberosAuthentication(AuthenticationStrategy):
+    """
+    Negotiate (SPNEGO) authentication. A GSSAPI context is established
+    only until the server hands out a session cookie, the following
+    requests send the cookie. When the server refuses the cookie with 401
+    (the session expired), the request is negotiated once more.
+
+    @ivar negotiations: number of GSSAPI contexts established
+    @ivar session_reuses: number of requests authenticated by the session cookie
+    """
 
     def __init__(self, host):
         super(KerberosAuthentication, self).__init__()
         self.__host = host
+        self.__cookie = None
+        self.__principal = None
+        self.__lock = threading.Lock()
+        self.negotiations = 0
+        self.session_reuses = 0
+
+    @classmethod
+    def available(cls):
+        """
+        @return: True if python-kerberos is installed
+        """
+        try:
+            import kerberos # pylint: disable=W0612
+        except ImportError:
+            return False
+        return True
 
     def set_headers(self, headers):
+        self.__lock.acquire()
+        try:
+            cookie = self.__cookie
+            if cookie is not None:
+                self.session_reuses += 1
+        finally:
+            self.__lock.release()
+
+        if cookie is not None:
+            headers['Cookie'] = cookie
+        else:
+            headers['Authorization'] = 'Negotiate %s' % self.__negotiate()
+        return headers
+
+    def __negotiate(self):
+        import kerberos
         ctx = kerberos.authGSSClientInit("HTTP@" + self.__host, \
             gssflags=kerberos.GSS_C_DELEG_FLAG|kerberos.GSS_C_MUTUAL_FLAG|kerberos.GSS_C_SEQUENCE_FLAG)[1]
-        kerberos.authGSSClientStep(ctx, '')
-        tgt = kerberos.authGSSClientResponse(ctx)
+        try:
+            kerberos.authGSSClientStep(ctx, '')
+            tgt = kerberos.authGSSClientResponse(ctx)
+            principal = self.__inquire_principal(kerberos, ctx)
+        finally:
+            kerberos.authGSSClientClean(ctx)
 
-        if tgt:
-            headers['Authorization'] = 'Negotiate %s' % tgt
-            return headers
-        else:
+        self.__lock.acquire()
+        try:
+            self.negotiations += 1
+            self.__principal = principal
+        finally:
+            self.__lock.release()
+        self._log.debug("negotiated kerberos authentication with %s" % self.__host)
+
+        if not tgt:
             raise RuntimeError(_("Couldn't authenticate via kerberos"))
+        return tgt
 
+    @classmethod
+    def __inquire_principal(cls, kerberos, ctx):
+        """
+        @return: principal of the credentials the context was initiated with,
+        None when python-kerberos can't tell (versions before 1.2)
+        """
+        if not hasattr(kerberos, 'authGSSClientInquireCred'):
+            return None
+        try:
+            kerberos.authGSSClientInquireCred(ctx)
+            return kerberos.authGSSClientUserName(ctx) or None
+        except kerberos.GSSError:
+            return None
+
+    def process_response(self, response):
+        if response.status >= 400:
+            return
+        cookie = self.__session_cookie(response.getheader('set-cookie'))
+        if cookie:
+            self.__lock.acquire()
+            try:
+                self.__cookie = cookie
+            finally:
+                self.__lock.release()
+
+    @classmethod
+    def __session_cookie(cls, header):
+        """
+        @return: value of the Cookie header sending back the cookies
+        the server set, None if it set none
+        """
+        if not header:
+            return None
+        cookies = SimpleCookie()
+        try:
+            cookies.load(header)
+        except CookieError:
+            return None
+        pairs = ['%s=%s' % (name, morsel.coded_value) for name, morsel in sorted(cookies.items())]
+        return '; '.join(pairs) or None
+
+    def renegotiate(self, headers):
+        cookie = headers.get('Cookie')
+        if cookie is None:
+            # a freshly negotiated request was refused, another round won't help
+            return False
+        self.__lock.acquire()
+        try:
+            if self.__cookie == cookie:
+                self.__cookie = None
+        finally:
+            self.__lock.release()
+        self._log.debug("kerberos session expired, negotiating again")
+        return True
+
+    def stats(self):
+        self.__lock.acquire()
+        try:
+            return {'negotiations': self.negotiations, 'session_reuses': self.session_reuses}
+        finally:
+            self.__lock.release()
 
     def connect(self, host, port, protocol):
-        self._log.debug('making %s https connection with' % protocol)
-        self._get_connection(host, port, protocol)
+        self._log.debug('making kerberos %s connection' % protocol)
+        return self._get_connection(host, port, protocol)
+
+    def connection_key(self):
+        return (self.__class__.__name__, self.__host)
+
+    def identity(self):
+        # known once the first request was negotiated
+        return self.__principal
+
+
+# connection pool -------------------------------------------------------------
+
+class ConnectionPool(object):
+    """
+    Pool of persistent (HTTP/1.1 keep-alive) connections.
+
+    Idle connections are kept per (host, port, protocol, authentication)
+    key so that consecutive requests, even from different KatelloServer
+    instances, skip the TCP and TLS handshakes. A connection is checked out
+    for the duration of one request, so the pool can be shared by threads.
+
+    @ivar max_idle: maximum number of idle connections kept per key
+    @ivar hits: number of requests served by a reused connection
+    @ivar misses: number of requests that had to open a new connection
+    @ivar reconnects: number of stale connections that were reopened
+    """
+
+    def __init__(self, max_idle=4):
+        self.max_idle = max_idle
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+        self.__idle = {}
+        self.__lock = threading.Lock()
+
+    def acquire(self, key, factory):
+        """
+        Check out an idle connection or open a new one.
+        @type key: tuple
+        @param key: pool key of the connection
+        @type factory: function
+        @param factory: function opening a new connection
+        @rtype: (HTTPConnection, bool)
+        @return: tuple of the connection and a flag telling whether it was reused
+        """
+        self.__lock.acquire()
+        try:
+            idle = self.__idle.get(key)
+            if idle:
+                self.hits += 1
+                return (idle.pop(), True)
+            self.misses += 1
+        finally:
+            self.__lock.release()
+        return (factory(), False)
+
+    def release(self, key, connection):
+        """
+        Return a connection whose response was fully read back to the pool.
+        """
+        self.__lock.acquire()
+        try:
+            idle = self.__idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(connection)
+                return
+        finally:
+            self.__lock.release()
+        connection.close()
+
+    def reconnected(self):
+        self.__lock.acquire()
+        try:
+            self.reconnects += 1
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """
+        Close all idle connections.
+        """
+        self.__lock.acquire()
+        try:
+            idle, self.__idle = self.__idle, {}
+        finally:
+            self.__lock.release()
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def stats(self):
+        """
+        @rtype: dict
+        @return: counters of the pool usage in this process
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'reconnects': self.reconnects}
+
+
+# connections are shared by all servers in the process
+connection_pool = ConnectionPool()
+
+
+# retries ---------------------------------------------------------------------
+
+def parse_retry_after(value, now=None):
+    """
+    @type value: str
+    @param value: Retry-After header, number of seconds or an http date
+    @rtype: float
+    @return: seconds to wait, None when the header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    return max(mktime_tz(date) - (now if now is not None else time.time()), 0.0)
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests are sent again and how long to wait before.
+
+    Requests that failed to connect or got one of the retry_statuses are
+    resent up to max_retries times with exponentially growing, jittered
+    delays, or after the time the server asked for with Retry-After.
+    Only idempotent methods are retried, POST only with retry_post set.
+    No retry waits past the deadline of the command running in the
+    current thread, see L{start}.
+
+    @ivar max_retries: number of times a request is resent
+    @ivar backoff: seconds to wait before the first resend, doubled with each attempt
+    @ivar max_backoff: longest wait between two attempts, unless the server asks for more
+    @ivar retry_time: seconds a command may spend retrying, None for no limit
+    @ivar retry_post: retry POST requests too
+    @ivar retries: number of requests resent so far
+    @ivar failures: number of requests that failed after all the retries
+    """
+
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+    retry_statuses = (429, 502, 503, 504)
+
+    def __init__(self, max_retries=3, backoff=1.0, max_backoff=30.0, retry_time=120.0, retry_post=False):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_time = retry_time
+        self.retry_post = retry_post
+        self.retries = 0
+        self.failures = 0
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the retry deadline of a command run by the current thread
+        """
+        if self.retry_time is None:
+            self.__local.deadline = None
+        else:
+            self.__local.deadline = time.time() + self.retry_time
+
+    def remaining(self):
+        """
+        @rtype: float
+        @return: seconds left for retries of the current command, None without a limit
+        """
+        deadline = getattr(self.__local, 'deadline', None)
+        remaining = command_deadline.remaining()
+        if deadline is None:
+            return remaining
+        if remaining is None:
+            return deadline - time.time()
+        return min(deadline - time.time(), remaining)
+
+    def retriable(self, method, body):
+        """
+        @return: True if the request can be sent again
+        """
+        if method not in self.IDEMPOTENT_METHODS and not (method == 'POST' and self.retry_post):
+            return False
+        return self.rewindable(body)
+
+    @classmethod
+    def rewindable(cls, body):
+        """
+        @return: True if the body can be sent again, streams only when they can be rewound
+        """
+        return body is None or isinstance(body, basestring) or hasattr(body, 'seek')
+
+    def delay(self, attempt, retry_after=None):
+        """
+        @type attempt: int
+        @param attempt: number of retries of the request so far
+        @type retry_after: float
+        @param retry_after: seconds the server asked to wait
+        @rtype: float
+        @return: seconds to wait before the next attempt, None when the
+        request shouldn't be retried anymore
+        """
+        if attempt >= self.max_retries:
+            return None
+        delay = float(min(self.max_backoff, self.backoff * 2 ** attempt))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        remaining = self.remaining()
+        if remaining is not None and delay > remaining:
+            return None
+        return delay
+
+    def count(self, retried):
+        self.__lock.acquire()
+        try:
+            if retried:
+                self.retries += 1
+            else:
+                self.failures += 1
+        finally:
+            self.__lock.release()
+
+    def stats(self):
+        """
+        @rtype: dict
+        @return: counters of the retries in this process
+        """
+        return {'retries': self.retries, 'failures': self.failures}
+
+
+class CircuitBreaker(object):
+    """
+    Stops sending requests to a server that keeps failing. After threshold
+    consecutive failures the circuit of the server opens for cooldown
+    seconds, all the threads of the process wait for it to close instead
+    of piling more requests on the server. The first request after the
+    cooldown tests the server, another failure opens the circuit again.
+
+    @ivar threshold: number of consecutive failures that open the circuit
+    @ivar cooldown: seconds the circuit stays open
+    @ivar trips: number of times a circuit opened
+    """
+
+    def __init__(self, threshold=5, cooldown=10.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.trips = 0
+        # key -> (consecutive failures, time the circuit closes)
+        self.__circuits = {}
+        self.__lock = threading.Lock()
+
+    def wait_time(self, key):
+        """
+        @rtype: float
+        @return: seconds until the circuit of the server closes, 0 when it's closed
+        """
+        self.__lock.acquire()
+        try:
+            _failures, closes = self.__circuits.get(key, (0, 0))
+        finally:
+            self.__lock.release()
+        return max(closes - time.time(), 0)
+
+    def success(self, key):
+        self.__lock.acquire()
+        try:
+            self.__circuits.pop(key, None)
+        finally:
+            self.__lock.release()
+
+    def failure(self, key):
+        self.__lock.acquire()
+        try:
+            failures, closes = self.__circuits.get(key, (0, 0))
+            failures += 1
+            now = time.time()
+            if failures >= self.threshold and closes <= now:
+                closes = now + self.cooldown
+                self.trips += 1
+            self.__circuits[key] = (failures, closes)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        self.__lock.acquire()
+        try:
+            self.__circuits = {}
+        finally:
+            self.__lock.release()
+
+    def stats(self):
+        return {'trips': self.trips}
+
+
+# failing servers are avoided by all the threads of the process
+circuit_breaker = CircuitBreaker()
 
 
 # base server class -----------------------------------------------------------
@@ -149,6 +880,122 @@ class ServerRequestError(Exception):
     pass
 
 
+# request bodies --------------------------------------------------------------
+
+class FileChunk(object):
+    """
+    Slice of a file sent as a plain multipart form field. The data are read
+    from the disk only while the request body is being sent.
+
+    @ivar path: path of the file
+    @ivar offset: position of the first byte of the slice
+    @ivar length: number of bytes in the slice
+    """
+
+    def __init__(self, path, offset, length):
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def open(self):
+        f = open(self.path, 'rb')
+        f.seek(self.offset)
+        return f
+
+
+class MultipartStream(object):
+    """
+    Multipart request body streamed from its parts. Strings are sent as they
+    are, files and L{FileChunk}s are read block by block when httplib asks for
+    the data, so the body is never joined in memory.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.length = sum([self._part_length(part) for part in parts])
+        # files are sent from their current position, remember it for seek()
+        self.__file_positions = [(part, part.tell()) for part in parts if isinstance(part, file)]
+        self.__index = 0
+        self.__current = None
+        self.__remaining = 0
+        self.__owned = False
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return "<multipart body of %d bytes>" % self.length
+
+    @classmethod
+    def _part_length(cls, part):
+        if isinstance(part, file):
+            return os.fstat(part.fileno()).st_size - part.tell()
+        return len(part)
+
+    def _open_part(self, part):
+        self.__owned = isinstance(part, FileChunk)
+        if self.__owned:
+            self.__current = part.open()
+        else:
+            # plain files belong to the caller, they are read but never closed
+            self.__current = part
+        self.__remaining = self._part_length(part)
+
+    def _close_part(self):
+        if self.__owned:
+            self.__current.close()
+        self.__current = None
+        self.__remaining = 0
+        self.__owned = False
+
+    def seek(self, offset):
+        """
+        Rewind the stream so that the body can be sent again.
+        Only seeking to the start is supported.
+        """
+        assert offset == 0
+        self.close()
+        for part, position in self.__file_positions:
+            part.seek(position)
+        self.__index = 0
+
+    def close(self):
+        if self.__current is not None:
+            self._close_part()
+
+    def read(self, size=-1):
+        """
+        @type size: int
+        @param size: maximal number of bytes to return, negative for all
+        @rtype: str
+        @return: next bytes of the body, empty string at the end
+        """
+        if size is None or size < 0:
+            return ''.join(iter(lambda: self.read(64 * 1024), ''))
+
+        while self.__remaining == 0:
+            if self.__current is not None:
+                self._close_part()
+            if self.__index >= len(self.parts):
+                return ''
+            self._open_part(self.parts[self.__index])
+            self.__index += 1
+
+        size = min(size, self.__remaining)
+        if isinstance(self.__current, basestring):
+            start = len(self.__current) - self.__remaining
+            data = self.__current[start:start + size]
+        else:
+            data = self.__current.read(size)
+            if not data:
+                raise IOError("file changed while being uploaded")
+        self.__remaining -= len(data)
+        return data
+
+
 class KatelloServer(object):
     """
     Katello server connection class.
@@ -157,9 +1004,25 @@ class KatelloServer(object):
     @ivar port: port the katello server is listening on (443)
     @ivar protocol: protocol the katello server is using (http, https)
     @ivar path_prefix: mount point of the katello api (/katello/api)
-    @ivar headers: dictionary of http headers to send in requests
+    @ivar headers: dictionary of http headers to send in requests, requests
+    copy it and never modify it, so one server can be used by many threads
+    @ivar auth_method: L{AuthenticationStrategy} of the requests of the current
+    thread, see L{set_auth_method} and L{set_thread_auth_method}
+    @ivar compression: ask for compressed responses and compress large
+    request bodies if the server accepts them
+    @ivar http_cache: L{HTTPCache} revalidating GET responses, None to not cache them,
+    see also L{bypass_cache}
+    @ivar retry_policy: L{RetryPolicy} of failed requests, None to never retry
+    @ivar connect_timeout: seconds to wait for a connection, None to wait forever
+    @ivar read_timeout: seconds to wait for data of a response, None to wait forever
+    @cvar connection_pool: L{ConnectionPool} the connections are taken from
+    @cvar circuit_breaker: L{CircuitBreaker} stopping requests to a failing server
+    @cvar compress_min_size: request bodies of at least this many bytes are compressed
     """
-    auth_method = NoAuthentication()
+    _auth_method = NoAuthentication()
+    connection_pool = connection_pool
+    circuit_breaker = circuit_breaker
+    compress_min_size = 16 * 1024
 
     #---------------------------------------------------------------------------
     def __init__(self, host, port=443, protocol='https', path_prefix='', accept_lang=None):
@@ -179,22 +1042,66 @@ class KatelloServer(object):
         if accept_lang:
             self.headers.update( { 'Accept-Language': accept_lang } )
 
+        self.compression = True
+        # codings of request bodies the server announced it accepts (RFC 7694)
+        self._request_encodings = ()
+        self.http_cache = None
+        # options of the command run by a thread, the server is shared by threads of a batch
+        self._thread_options = threading.local()
+        self.retry_policy = RetryPolicy()
+        self.connect_timeout = 30.0
+        self.read_timeout = 300.0
         self._log = getLogger('katello')
 
     # credentials setters -----------------------------------------------------
+    def _get_auth_method(self):
+        return getattr(self._thread_options, 'auth_method', None) or self._auth_method
+
+    auth_method = property(_get_auth_method)
+
     def set_auth_method(self, auth_method):
-        self.auth_method = auth_method
+        self._auth_method = auth_method
+
+    def set_thread_auth_method(self, auth_method):
+        """
+        Authenticate the requests of the current thread only (eg. of a batch
+        line with its own credentials), None to fall back to the strategy
+        set with L{set_auth_method}.
+        @type auth_method: AuthenticationStrategy
+        """
+        self._thread_options.auth_method = auth_method
+
+    def bypass_cache(self, bypass):
+        """
+        Don't use the http cache for the requests of the current thread
+        (eg. of a command run with --no-cache), other threads keep using it.
+        @type bypass: bool
+        """
+        self._thread_options.bypass_cache = bypass
 
     # protected server connection methods -------------------------------------
 
-    def _connect(self):
-        # make an appropriate connection to the server and cache it
-        return self.auth_method.connect(self.host, self.port, self.protocol)
+    def _connect(self, auth_method=None):
+        # make an appropriate connection to the server
+        auth_method = auth_method or self.auth_method
+        return auth_method.connect(self.host, self.port, self.protocol)
 
-    def _set_auth_headers(self):
+    def _connection_key(self, auth_method=None):
+        auth_method = auth_method or self.auth_method
+        return (self.host, self.port, self.protocol) + auth_method.connection_key()
+
+    def _release_connection(self, key, connection, response):
+        # only a connection with fully read response can be reused
+        if response.will_close or not response.isclosed():
+            connection.close()
+        else:
+            self.connection_pool.release(key, connection)
+
+    @classmethod
+    def _set_auth_headers(cls, auth_method, headers):
         try:
-            self.auth_method.set_headers(self.headers)
-        except GSSError, e:
+            auth_method.set_headers(headers)
+        except loaded_errors('kerberos', 'GSSError'), e:
             #TODO
             raise Exception(_("Missing credentials and unable to authenticate using Kerberos"), e), \
                 None, sys.exc_info()[2]
@@ -204,11 +1111,75 @@ class KatelloServer(object):
             raise Exception(_("Invalid credentials or unable to authenticate"), e), None, sys.exc_info()[2]
             #raise KatelloError("Invalid credentials or unable to authenticate", e)
 
+    def _request_headers(self, auth_method, content_type, body, custom_headers, content_encoding=None):
+        """
+        Headers of one request. Every request gets its own dict, the shared
+        self.headers are never modified, so concurrent requests can't see
+        each other's authentication or content headers.
+        @rtype: dict
+        """
+        headers = dict(self.headers)
+        self._set_auth_headers(auth_method, headers)
+        if self.compression:
+            headers['Accept-Encoding'] = ', '.join(SUPPORTED_ENCODINGS)
+        headers['content-type'] = content_type
+        headers['content-length'] = str(len(body) if body else 0)
+        if content_encoding:
+            headers['Content-Encoding'] = content_encoding
+        headers.update(custom_headers)
+        return headers
+
+    def _compress_body(self, body):
+        """
+        Compress a large json body when the server accepts gzip encoded requests.
+        @rtype: (string, string)
+        @return: tuple of the body to send and its content coding (None when not compressed)
+        """
+        if not (self.compression and 'gzip' in self._request_encodings):
+            return (body, None)
+        if not isinstance(body, str) or len(body) < self.compress_min_size:
+            return (body, None)
+        compressed = gzip_compress(body)
+        self._log.debug("compressed request body from %d to %d bytes" % (len(body), len(compressed)))
+        return (compressed, 'gzip')
+
+    def _accept_request_encodings(self, response):
+        """
+        Remember the request codings a server announces with Accept-Encoding in its responses
+        """
+        header = response.getheader('accept-encoding')
+        if header is not None:
+            self._request_encodings = tuple(parse_encodings(header))
+
+    def _decode_response(self, response):
+        """
+        @return: response whose body is decoded as it is read
+        """
+        encodings = parse_encodings(response.getheader('content-encoding'))
+        if not encodings or encodings == ['identity']:
+            return response
+        if len(encodings) > 1 or encodings[0] not in SUPPORTED_ENCODINGS:
+            raise ServerRequestError(response.status, _("Unsupported content encoding %s")
+                % response.getheader('content-encoding'), None)
+        return DecodedResponse(response, encodings[0])
+
+    def _discard_response(self, key, connection, response):
+        """
+        Read the rest of a response that won't be used, so that its connection can be reused
+        """
+        response.read()
+        self._release_connection(key, connection, response)
+
+    def _log_transfer(self, response):
+        if isinstance(response, DecodedResponse):
+            self._log.debug("received %d bytes, %d bytes after %s decoding"
+                % (response.wire_bytes, response.decoded_bytes, response.encoding))
+
     # protected request utilities ---------------------------------------------
 
     def _build_url(self, path, queries=None):
-        if queries is None:
-            queries = {}
+        # the caller's queries are not modified, they may be reused by other requests
+        queries = dict(queries or {})
         # build the request url from the path and queries dict or tuple
         if not path.startswith(self.path_prefix):
             path = '/'.join((self.path_prefix, path))
@@ -225,30 +1196,262 @@ class KatelloServer(object):
         return path
 
 
-    def _request(self, method, path, queries=None, body=None, multipart=False, custom_headers=None):
+    def _request(self, method, path, queries=None, body=None, multipart=False, custom_headers=None,
+                 stream=False):
         if queries is None:
             queries = {}
         if custom_headers is None:
             custom_headers = {}
         # make a request to the server and return the response
-        connection = self._connect()
         url = self._build_url(path, queries)
 
         content_type, body = self._prepare_body(body, multipart)
 
-        self.headers['content-type']   = content_type
-        self.headers['content-length'] = str(len(body) if body else 0)
-        self._set_auth_headers()
+        # the whole request uses the strategy set when it started, even if
+        # another thread sets a different one meanwhile
+        auth_method = self.auth_method
+        key = self._connection_key(auth_method)
+
+        http_cache = self.http_cache
+        cached = cache_scope = cache_key = None
+        bypass_cache = getattr(self._thread_options, 'bypass_cache', False)
+        identity = auth_method.identity()
+        if http_cache is not None and method == 'GET' and not stream and not bypass_cache \
+                and identity is not None:
+            # responses are cached per server and user, never for an unknown user
+            cache_scope = key + (identity, self.path_prefix)
+            cache_key = (url, self.headers.get('Accept-Language'))
+            cached = http_cache.get(cache_scope, cache_key)
+            if cached is not None:
+                validators = http_cache.validators(cached)
+                validators.update(custom_headers)
+                custom_headers = validators
+        else:
+            http_cache = None
+
+        sent_body, content_encoding = self._compress_body(body)
+        headers = self._request_headers(auth_method, content_type, sent_body, custom_headers, content_encoding)
 
         if body:
             self._log.debug("sending %s request to %s\n%s" % (method, url, body))
         else:
             self._log.debug("sending empty %s request to %s" % (method, url))
 
-        connection.request(method, url, body=body, headers=dict(self.headers.items() + custom_headers.items()))
-        return self._process_response(connection.getresponse())
+        connection, response = self._send_retrying(auth_method, key, method, url, sent_body, headers)
+        auth_method.process_response(response)
+
+        if content_encoding and response.status == 415:
+            # the server doesn't take compressed bodies after all
+            self._log.debug("compressed request refused, sending it uncompressed")
+            self._request_encodings = ()
+            self._discard_response(key, connection, response)
+            sent_body = body
+            headers = self._request_headers(auth_method, content_type, sent_body, custom_headers)
+            connection, response = self._send_retrying(auth_method, key, method, url, sent_body, headers)
+            auth_method.process_response(response)
+
+        if response.status == 401 and auth_method.renegotiate(headers):
+            self._discard_response(key, connection, response)
+            if hasattr(sent_body, 'seek'):
+                sent_body.seek(0)
+            headers = self._request_headers(auth_method, content_type, sent_body, custom_headers,
+                headers.get('Content-Encoding'))
+            connection, response = self._send_retrying(auth_method, key, method, url, sent_body, headers)
+            auth_method.process_response(response)
+
+        self._accept_request_encodings(response)
+        try:
+            response = self._decode_response(response)
+        except ServerRequestError:
+            connection.close()
+            raise
+
+        content_type = response.getheader('content-type') or ''
+        if stream and response.status < 300 and content_type.startswith('application/json'):
+            return self._stream_response(key, connection, response)
+        received = response
+        try:
+            if http_cache is not None:
+                response = self._cache_response(http_cache, cache_scope, cache_key, cached, response)
+            return self._process_response(response)
+        finally:
+            self._log_transfer(received)
+            self._release_connection(key, connection, received)
+
+    def _cache_response(self, http_cache, scope, cache_key, cached, response):
+        """
+        Read a response to a GET request, replace 304 Not Modified with the
+        cached response or store a new one.
+        @rtype: CachedResponse
+        """
+        body = response.read()
+        if response.status == 304 and cached is not None:
+            self._log.debug("%s not modified, using the cached response" % cache_key[0])
+            return http_cache.revalidated(scope, cache_key, cached)
+        response = CachedResponse(response.status, response.getheaders(), body)
+        http_cache.store(scope, cache_key, response)
+        return response
+
+    def _stream_response(self, key, connection, response):
+        """
+        Decode a json array response element by element while it is being read.
+        The connection goes back to the pool once the whole body was read.
+        @type response: HTTPResponse
+        @param response: http response
+        @rtype: (int, generator, list)
+        @return: tuple of the response status, generator of the array elements
+        and the response headers
+        """
+        self._log.debug("streaming response %s" % response.status)
+
+        def elements():
+            finished = False
+            try:
+                for element in iter_json_array(response.read):
+                    yield element
+                finished = True
+            finally:
+                self._log_transfer(response)
+                if finished:
+                    self._release_connection(key, connection, response)
+                else:
+                    # the rest of the body was not read, the connection can't be reused
+                    connection.close()
+        return (response.status, elements(), response.getheaders())
 
+    # statuses of a server that is down or overloaded
+    FAILURE_STATUSES = (502, 503, 504)
 
+    def _send_retrying(self, auth_method, key, method, url, body, headers):
+        """
+        Send a request, resend it when it fails and the retry policy allows it.
+        Failures are reported to the circuit breaker, requests the policy
+        may retry wait while the circuit of the server is open.
+        @rtype: (HTTPConnection, HTTPResponse)
+        @return: the response of the last attempt
+        @raise ServerRequestError: when the circuit is open and the request
+        can't wait for it to close
+        """
+        policy = self.retry_policy
+        retriable = policy is not None and policy.retriable(method, body)
+        circuit = (self.host, self.port)
+        attempt = 0
+        while True:
+            self._wait_for_circuit(circuit, policy, retriable)
+            try:
+                connection, response = self._send_pooled(auth_method, key, method, url, body, headers)
+            except auth_method.connection_errors, e:
+                if command_deadline.expired():
+                    raise DeadlineExceeded(command_deadline.timeout), None, sys.exc_info()[2]
+                self.circuit_breaker.failure(circuit)
+                delay = policy.delay(attempt) if retriable else None
+                if delay is None:
+                    if retriable:
+                        policy.count(False)
+                    raise
+                reason = e
+            else:
+                if response.status in self.FAILURE_STATUSES:
+                    self.circuit_breaker.failure(circuit)
+                else:
+                    self.circuit_breaker.success(circuit)
+                if not retriable or response.status not in policy.retry_statuses:
+                    return (connection, response)
+                delay = policy.delay(attempt, parse_retry_after(response.getheader('retry-after')))
+                if delay is None:
+                    policy.count(False)
+                    return (connection, response)
+                self._discard_response(key, connection, response)
+                reason = "%s %s" % (response.status, response.reason)
+
+            attempt += 1
+            policy.count(True)
+            self._log.debug("%s request to %s failed (%s), retry %d in %.2f s"
+                % (method, url, reason, attempt, delay))
+            time.sleep(delay)
+            if hasattr(body, 'seek'):
+                body.seek(0)
+
+    def _wait_for_circuit(self, circuit, policy, retriable):
+        """
+        Wait until the open circuit of the server closes. Requests without
+        retries fail right away, retriable ones wait neither past the retry
+        time of the policy nor past the command deadline.
+        @raise ServerRequestError: when the request can't wait for the circuit
+        """
+        wait = self.circuit_breaker.wait_time(circuit)
+        if not wait:
+            return
+        remaining = policy.remaining() if retriable else 0
+        if remaining is not None and wait > remaining:
+            raise ServerRequestError(503, _("Server %s keeps failing, giving up") % self.host, None)
+        self._log.debug("server %s keeps failing, waiting %.2f s before the next request" % (self.host, wait))
+        time.sleep(wait)
+
+    def _send_pooled(self, auth_method, key, method, url, body, headers):
+        """
+        Send a request over a pooled connection, reconnect once if the
+        pooled connection went stale before the server got the request.
+        @rtype: (HTTPConnection, HTTPResponse)
+        """
+        connection, reused = self.connection_pool.acquire(key, lambda: self._connect(auth_method))
+        sending = True
+        try:
+            self._send(connection, method, url, body, headers)
+            sending = False
+            response = connection.getresponse()
+        except auth_method.connection_errors, e:
+            connection.close()
+            if not (reused and self._stale(e, sending) and self._resendable(method, body)):
+                raise
+            # the server closed the idle connection, open a fresh one
+            self._log.debug("connection to %s went stale, reconnecting" % self.host)
+            self.connection_pool.reconnected()
+            if hasattr(body, 'seek'):
+                body.seek(0)
+            connection = self._connect(auth_method)
+            self._send(connection, method, url, body, headers)
+            response = connection.getresponse()
+        return (connection, response)
+
+    @classmethod
+    def _stale(cls, error, sending):
+        """
+        @return: True if the error proves the pooled connection was closed
+        before the server answered, a slow server (timeout) doesn't count
+        """
+        if isinstance(error, socket.timeout):
+            return False
+        if isinstance(error, httplib.BadStatusLine):
+            return True
+        return sending and isinstance(error, socket.error) and error.errno in (errno.ECONNRESET, errno.EPIPE)
+
+    def _resendable(self, method, body):
+        """
+        @return: True if the request may be sent once more, non-idempotent
+        requests only when the retry policy allows it
+        """
+        if self.retry_policy is not None:
+            return self.retry_policy.retriable(method, body)
+        return method in RetryPolicy.IDEMPOTENT_METHODS and RetryPolicy.rewindable(body)
+
+    def _send(self, connection, method, url, body, headers):
+        """
+        Send a request with the connect and read timeouts cut to the command deadline.
+        @raise DeadlineExceeded: when the deadline passed before the request was sent
+        """
+        if connection.sock is None:
+            connection.timeout = command_deadline.limit(self.connect_timeout)
+            connection.connect()
+        self._set_read_timeout(connection.sock, command_deadline.limit(self.read_timeout))
+        connection.request(method, url, body=body, headers=headers)
+
+    @classmethod
+    def _set_read_timeout(cls, sock, timeout):
+        if hasattr(sock, 'set_socket_read_timeout'):
+            SSLAuthentication.set_timeout(sock, timeout)
+        else:
+            sock.settimeout(timeout)
 
     def _prepare_body(self, body, multipart):
         """
@@ -352,33 +1555,40 @@ class KatelloServer(object):
         Encode data for httplib request
         @type data: any
         @param data: data to encode for the request
-        @rtype: (string, string)
-        @return: tuple of the content type and encoded data
+        @rtype: (string, string or MultipartStream)
+        @return: tuple of the content type and encoded data, files are
+        streamed with L{MultipartStream}
         """
         fields = self._flatten_to_multipart(None, data)
 
         boundary = '----------BOUNDARY_$'
+        parts = []
         lines = []
 
         for (key, value) in fields:
+            lines.append('--' + boundary)
             if isinstance(value, (file)):
                 filename = value.name
-                content  = value.read()
-
-                lines.append('--' + boundary)
                 lines.append('Content-Disposition: form-data; name="%s"; filename="%s"' % (str(key), str(filename)))
                 lines.append('Content-Type: %s' % self._get_content_type(filename))
-                lines.append('')
-                lines.append(content)
             else:
-                lines.append('--' + boundary)
                 lines.append('Content-Disposition: form-data; name="%s"' % str(key))
-                lines.append('')
+            lines.append('')
+            if isinstance(value, (file, FileChunk)):
+                # stream the content instead of reading it into the body
+                parts.append('\r\n'.join(lines) + '\r\n')
+                parts.append(value)
+                lines = ['']
+            else:
                 lines.append(value)
         lines.append('--' + boundary + '--')
         lines.append('')
 
-        body = '\r\n'.join(lines)
+        if parts:
+            parts.append('\r\n'.join(lines))
+            body = MultipartStream(parts)
+        else:
+            body = '\r\n'.join(lines)
         content_type = 'multipart/form-data; boundary=%s' % boundary
         return content_type, body
 
@@ -408,7 +1618,7 @@ class KatelloServer(object):
         """
         return self._request('DELETE', path, body=body)
 
-    def GET(self, path, queries=None, custom_headers=None):
+    def GET(self, path, queries=None, custom_headers=None, stream=False):
         """
         Send a GET request to the katello server.
         @type path: str
@@ -418,11 +1628,14 @@ class KatelloServer(object):
                         query parameters in the request
         @type custom_headers: dict or iterable of tuple pairs
         @param custom_headers: custom headers
-        @rtype: (int, dict or None or str)
+        @type stream: boolean
+        @param stream: set True to get a json array response as a generator
+                       of its elements decoded while the response is read
+        @rtype: (int, dict or None or str or generator)
         @return: tuple of the http response status and the response body
         @raise ServerRequestError: if the request fails
         """
-        return self._request('GET', path, queries, custom_headers=custom_headers)
+        return self._request('GET', path, queries, custom_headers=custom_headers, stream=stream)
 
     def HEAD(self, path):
         """
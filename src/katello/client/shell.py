@@ -20,7 +20,8 @@ import sys
 from cmd import Cmd
 import ConfigParser
 
-from katello.client.completion import Completion
+from katello.client.batch import Batch, BARRIER, read_commands, plan_stages, session_cli
+from katello.client.completion import Completion, ValueCompletion, ValueCache
 from katello.client.config import Config, ConfigFileError
 from katello.client.core.base import Command
 from katello.client.lib.utils.encoding import encode_stream, stdout_origin
@@ -29,7 +30,7 @@ class KatelloShell(Cmd):
 
     # maximum length of history file
     HISTORY_LENGTH = 1024
-    BUILTIN_COMMANDS = ("help", "quit", "exit")
+    BUILTIN_COMMANDS = ("help", "quit", "exit", BARRIER)
 
     cmdqueue = []
     completekey = 'tab'
@@ -61,12 +62,12 @@ class KatelloShell(Cmd):
         self.completion_matches = None
         Cmd.__init__(self)
         self.admin_cli = admin_cli
-        self.completion = Completion(self.admin_cli)
         try:
             Config()
             self.prompt = Config.parser.get('shell', 'prompt') + ' '
         except (ConfigFileError, ConfigParser.Error):
             self.prompt = 'katello> '
+        self.completion = Completion(self.admin_cli, values=self.__value_completion())
 
         try:
             # don't split on hyphens during tab completion (important for completing parameters)
@@ -81,6 +82,29 @@ class KatelloShell(Cmd):
         self.__init_commands()
 
 
+    @classmethod
+    def __value_completion(cls):
+        """
+        Completion of names of organizations, environments, ... fetched
+        from the server, unless disabled by 'completion_ttl = 0'
+        """
+        ttl = 300
+        try:
+            Config()
+            if Config.parser.has_option('shell', 'completion_ttl'):
+                ttl = int(Config.parser.get('shell', 'completion_ttl'))
+        except (ConfigFileError, ConfigParser.Error, ValueError):
+            logging.warning('Invalid completion_ttl in the [shell] section of the config')
+        if ttl <= 0:
+            return None
+        return ValueCompletion(ValueCache(ttl))
+
+
+    def preloop(self):
+        if self.completion.values is not None:
+            self.completion.values.prefetch()
+
+
     def __init_history(self):
         try:
             readline.read_history_file(self.history_file)
@@ -104,6 +128,38 @@ class KatelloShell(Cmd):
         setattr(self, "do_eof", self.do_exit)
 
 
+    # pylint: disable=W0613
+    def do_wait(self, args):
+        # commands typed into the shell run one by one, there's nothing to wait for
+        pass
+
+
+    def run_script(self, lines, parallel=1):
+        """
+        Run commands of a script. Independent commands run in parallel
+        on cli instances sharing the session of the shell, their output is
+        printed in the order of the script, see L{plan_stages}.
+
+        @type lines: list of strings
+        @type parallel: int
+        @param parallel: number of commands run at the same time
+        @return: exit code of the first failed command, EX_OK if all succeeded
+        """
+        if parallel > 1:
+            create_cli = lambda: session_cli(self.admin_cli)
+        else:
+            create_cli = lambda: self.admin_cli
+        exit_code = os.EX_OK
+        sys.stdout = self.stdout_with_codec
+        try:
+            for result in Batch(create_cli, parallel).run_stages(plan_stages(read_commands(lines))):
+                if exit_code == os.EX_OK:
+                    exit_code = result.exit_code
+        finally:
+            sys.stdout = stdout_origin
+        return exit_code
+
+
     # pylint: disable=W0613
     def do_exit(self, args):
         self.__remove_last_history_item()
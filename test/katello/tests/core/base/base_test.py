@@ -2,7 +2,7 @@ from unittest import TestCase
 from mock import Mock
 
 
-from katello.client.core.base import CommandContainer
+from katello.client.core.base import CommandContainer, Command, LazyCommand
 
 
 
@@ -30,3 +30,56 @@ class AddSubcommandTest(TestCase):
 
     def test_it_raises_exception_when_subcmd_not_noud(self):
         self.assertRaises(Exception, self.cmd.get_command, "unknown_sub_cmd")
+
+
+class CountedCommand(Command):
+    instances = 0
+
+    def __init__(self, description='counted'):
+        super(CountedCommand, self).__init__()
+        CountedCommand.instances += 1
+        self.__description = description
+
+    @property
+    def description(self):
+        return self.__description
+
+
+class LazyCommandTest(TestCase):
+
+    PATH = __name__ + '.CountedCommand'
+
+    def setUp(self):
+        CountedCommand.instances = 0
+        self.cmd = CommandContainer()
+        self.lazy_cmd = LazyCommand(self.PATH, 'parent')
+        self.lazy_cmd.add_command('sub_cmd', LazyCommand(self.PATH, description='child'))
+        self.cmd.add_command('lazy_cmd', self.lazy_cmd)
+
+    def test_it_does_not_load_registered_commands(self):
+        self.assertEqual(self.cmd.get_command_names(), ['lazy_cmd'])
+        self.assertEqual(CountedCommand.instances, 0)
+
+    def test_it_loads_command_on_lookup(self):
+        command = self.cmd.get_command('lazy_cmd')
+        self.assertTrue(isinstance(command, CountedCommand))
+        self.assertEqual(command.description, 'parent')
+        self.assertEqual(CountedCommand.instances, 1)
+
+    def test_it_loads_command_once(self):
+        self.assertTrue(self.cmd.get_command('lazy_cmd') is self.cmd.get_command('lazy_cmd'))
+        self.assertEqual(CountedCommand.instances, 1)
+
+    def test_it_loads_subcommands_on_their_lookup(self):
+        command = self.cmd.get_command('lazy_cmd')
+        self.assertEqual(command.get_command_names(), ['sub_cmd'])
+        self.assertEqual(CountedCommand.instances, 1)
+        self.assertEqual(command.get_command('sub_cmd').description, 'child')
+        self.assertEqual(CountedCommand.instances, 2)
+
+    def test_parser_builds_usage_when_printed(self):
+        command = self.cmd.get_command('lazy_cmd')
+        parser = command.create_parser('lazy_cmd', 'katello')
+        self.assertEqual(CountedCommand.instances, 1)
+        self.assertTrue('child' in parser.format_help())
+        self.assertEqual(CountedCommand.instances, 2)
@@ -1,10 +1,12 @@
 import os
+import tempfile
 
 from katello.tests.core.content_upload.content_upload_data import CONTENT_UPLOADS
 from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTestCase
 
 import katello.client.core.repo
 from katello.client.core.repo import ContentUpload
+from katello.client.lib.upload import ContentIndex
 
 
 class RequiredCLIOptionsTests(CLIOptionTestCase):
@@ -86,7 +88,7 @@ class ContentUploadTest(CLIActionTestCase):
 
     def test_dir_content_upload(self):
         content_upload = CONTENT_UPLOADS[1]
-        puppet_dir = os.path.join(os.getcwd(), 'test/files/puppet')
+        puppet_dir = os.path.join(os.path.dirname(__file__), '../../../../files/puppet')
 
         options = {
             'upload_id': content_upload['upload_id'],
@@ -94,18 +96,45 @@ class ContentUploadTest(CLIActionTestCase):
             'content_type': 'puppet',
             'repo': 'pforge',
             'product': 'puppet',
-            'org': 'acme'
+            'org': 'acme',
+            'workers': 1
         }
 
         repo_id = 5
         self._setup_mocks(options, repo_id, content_upload)
+        self.mock(self.action.upload_api, 'upload_bits')
+        index_path = os.path.join(tempfile.mkdtemp(), 'upload_index')
+        self.backup_property(self.module, 'ContentIndex')
+        self.module.ContentIndex = lambda: ContentIndex(index_path)
 
-        self.run_action()
+        self.run_action(os.EX_OK)
         self.action.upload_api.create.assert_called_once_with(repo_id)
         self.module.generate_puppet_data.assert_called_once()
-        self.action.send_content.assert_called_once_with(repo_id, content_upload["upload_id"], options["filepath"], None)
-        self.action.upload_api.import_into_repo.assert_called_once()
+        self.assertTrue(self.action.upload_api.upload_bits.called)
+        self.action.upload_api.import_into_repo.assert_called_once_with(repo_id,
+            [{'id': content_upload['upload_id'], 'unit_key': {}, 'metadata': {}}])
         self.action.upload_api.delete.assert_called_once_with(repo_id, content_upload['upload_id'])
+        self.assertTrue(os.path.exists(index_path))
+
+    def test_skips_existing_content(self):
+        content_upload = CONTENT_UPLOADS[0]
+
+        options = {
+            'filepath': '/tmp/bear-4.1-1.noarch.rpm',
+            'content_type': 'yum',
+            'repo_id': 1,
+            'skip_existing': True
+        }
+
+        self._setup_mocks(options, 1, content_upload)
+        self.mock(self.module, 'generate_rpm_data', [{'name': 'bear', 'epoch': '0', 'version': '4.1',
+            'release': '1', 'arch': 'noarch'}, {}])
+        self.mock(self.module.PackageAPI, 'packages_by_repo', [{'name': 'bear', 'epoch': 0, 'version': '4.1',
+            'release': '1', 'arch': 'noarch'}])
+
+        self.run_action(os.EX_OK)
+        self.assertFalse(self.action.upload_api.create.called)
+        self.assertFalse(self.action.upload_api.import_into_repo.called)
 
     def test_returns_ok(self):
         content_upload = CONTENT_UPLOADS[0]
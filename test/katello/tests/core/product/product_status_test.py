@@ -43,7 +43,7 @@ class ProductStatusTest(CLIActionTestCase):
 
     def test_it_finds_the_product_by_name(self):
         self.run_action()
-        self.module.get_product.assert_called_once_with(self.ORG['name'], self.PROD['name'], None, None)
+        self.module.get_product.assert_called_once_with(self.ORG['name'], self.PROD['name'], None, None, refresh=True)
 
     def test_it_returns_with_error_when_no_product_found(self):
         self.mock(self.module, 'get_product').side_effect = ApiDataError()
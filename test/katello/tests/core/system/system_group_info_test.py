@@ -46,7 +46,7 @@ class SystemGroupInfoTest(CLIActionTestCase):
 
     def test_it_calls_the_system_group_by_name_api(self):
         self.action.run()
-        self.module.get_system_group.assert_called_once_with(self.OPTIONS['org'], self.SYSTEM_GROUP['name'])
+        self.module.get_system_group.assert_called_once_with(self.OPTIONS['org'], self.SYSTEM_GROUP['name'], refresh=True)
 
     def test_it_returns_success_when_system_group_found(self):
         self.assertEqual(self.action.run(), os.EX_OK)
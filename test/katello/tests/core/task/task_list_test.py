@@ -40,4 +40,14 @@ class TaskListTest(CLIActionTestCase):
 
     def test_it_uses_lists_api(self):
         self.run_action()
-        self.action.api.tasks_by_org.assert_called_once_with(self.ORG)
+        self.action.api.tasks_by_org.assert_called_once_with(self.ORG, page_size=None, limit=None)
+
+    def test_limit_applies_to_filtered_tasks(self):
+        tasks = [{'uuid': str(i), 'state': state, 'task_type': 'sync'}
+            for i, state in enumerate(['finished', 'waiting'] * 5)]
+        self.action.api.tasks_by_org.return_value = iter(tasks)
+        self.mock_options(dict(self.OPTIONS, limit=3))
+        self.run_action()
+        self.action.api.tasks_by_org.assert_called_once_with(self.ORG, page_size=3, limit=None)
+        printed = list(self.action.printer.print_items.call_args[0][0])
+        self.assertEqual([t['uuid'] for t in printed], ['1', '3', '5'])
@@ -0,0 +1,132 @@
+import zlib
+import unittest
+from StringIO import StringIO
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client.server import KatelloServer, ConnectionPool, NoAuthentication
+from katello.client.lib.utils.compression import DecodedResponse, gzip_compress, parse_encodings
+
+
+SYSTEMS = [{'name': 'host-%04d.example.com' % i, 'environment': 'Library'} for i in range(2000)]
+
+
+def deflate(data, raw=False):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS if raw else zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class FakeResponse(StringIO):
+
+    def read(self, size=-1):
+        self.reads = getattr(self, 'reads', 0) + 1
+        return StringIO.read(self, size)
+
+
+class DecodedResponseTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    DATA = json.dumps(SYSTEMS)
+
+    def test_decodes_gzip(self):
+        response = DecodedResponse(FakeResponse(gzip_compress(self.DATA)), 'gzip')
+        self.assertEqual(response.read(), self.DATA)
+        self.assertEqual(response.decoded_bytes, len(self.DATA))
+        self.assertEqual(response.wire_bytes, len(gzip_compress(self.DATA)))
+
+    def test_decodes_zlib_and_raw_deflate(self):
+        for raw in (False, True):
+            self.assertEqual(DecodedResponse(FakeResponse(deflate(self.DATA, raw)), 'deflate').read(), self.DATA)
+
+    def test_decodes_incrementally(self):
+        wire = FakeResponse(gzip_compress(self.DATA))
+        response = DecodedResponse(wire, 'gzip', block_size=256)
+        self.assertEqual(response.read(100), self.DATA[:100])
+        self.assertTrue(response.wire_bytes <= 512)
+        chunks = [response.read(1000) for _i in range(len(self.DATA) / 1000 + 2)]
+        self.assertEqual(self.DATA[:100] + ''.join(chunks), self.DATA)
+
+    def test_parse_encodings(self):
+        self.assertEqual(parse_encodings('gzip;q=1.0, Deflate ,identity;q=0'), ['gzip', 'deflate', 'identity'])
+        self.assertEqual(parse_encodings(None), [])
+
+
+class CompressedTransferTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.stub = StubServer().start()
+        self.server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        self.server.connection_pool = ConnectionPool()
+        self.server.set_auth_method(NoAuthentication())
+        self.body = json.dumps(SYSTEMS)
+
+    def tearDown(self):
+        self.server.connection_pool.clear()
+        self.stub.stop()
+
+    def respond_encoded(self, encoding, encode):
+        def respond(handler):
+            if encoding in parse_encodings(handler.headers.getheader('accept-encoding')):
+                return (200, encode(self.body), {'Content-Encoding': encoding})
+            return (200, self.body, {})
+        self.stub.responses['/katello/api/systems'] = respond
+
+    def test_asks_for_compressed_responses(self):
+        self.server.GET('/api/ping')
+        self.assertEqual(self.stub.requests[0][2]['accept-encoding'], 'gzip, deflate')
+
+    def test_does_not_ask_when_compression_is_off(self):
+        self.server.compression = False
+        self.server.GET('/api/ping')
+        # httplib asks for identity when there's no Accept-Encoding
+        self.assertEqual(self.stub.requests[0][2]['accept-encoding'], 'identity')
+
+    def test_decodes_gzip_and_deflate_responses(self):
+        for encoding, encode in (('gzip', gzip_compress), ('deflate', deflate)):
+            self.respond_encoded(encoding, encode)
+            self.assertEqual(self.server.GET('/api/systems')[1], SYSTEMS)
+
+    def test_decodes_streamed_response(self):
+        self.respond_encoded('gzip', gzip_compress)
+        self.assertEqual(list(self.server.GET('/api/systems', stream=True)[1]), SYSTEMS)
+        self.server.GET('/api/systems')
+        self.assertEqual(len(self.stub.connections), 1)
+
+    def test_reuses_connection_after_compressed_response(self):
+        self.respond_encoded('gzip', gzip_compress)
+        for _i in range(3):
+            self.server.GET('/api/systems')
+        self.assertEqual(len(self.stub.connections), 1)
+
+    def test_compresses_large_bodies_when_server_accepts_them(self):
+        self.stub.respond('/katello/api/ping', headers={'Accept-Encoding': 'gzip'})
+        self.server.PUT('/api/systems', {'small': True})
+        self.server.GET('/api/ping')
+        self.server.PUT('/api/systems', {'small': True})
+        self.server.PUT('/api/systems', SYSTEMS)
+
+        encodings = [headers.get('content-encoding') for method, _p, headers, _b in self.stub.requests
+            if method == 'PUT']
+        self.assertEqual(encodings, [None, None, 'gzip'])
+        self.assertEqual(json.loads(zlib.decompress(self.stub.requests[-1][3], 16 + zlib.MAX_WBITS)), SYSTEMS)
+
+    def test_resends_uncompressed_when_compressed_body_is_refused(self):
+        def refuse_compressed(handler):
+            if handler.headers.getheader('content-encoding'):
+                return (415, 'Unsupported Media Type', {})
+            return (200, {'accepted': True}, {})
+        self.server._request_encodings = ('gzip',)
+        self.stub.responses['/katello/api/systems'] = refuse_compressed
+
+        self.assertEqual(self.server.PUT('/api/systems', SYSTEMS)[1], {'accepted': True})
+        self.assertEqual(self.server.PUT('/api/systems', SYSTEMS)[1], {'accepted': True})
+        self.assertEqual(len(self.stub.requests), 3)
@@ -0,0 +1,111 @@
+import unittest
+from mock import Mock
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client.server import KatelloServer, ConnectionPool, NoAuthentication, BasicAuthentication
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.pool = ConnectionPool(max_idle=1)
+
+    def test_opens_new_connection_when_pool_is_empty(self):
+        connection = Mock()
+        self.assertEqual(self.pool.acquire('key', lambda: connection), (connection, False))
+        self.assertEqual(self.pool.stats()['misses'], 1)
+
+    def test_reuses_released_connection(self):
+        connection = Mock()
+        self.pool.release('key', connection)
+        self.assertEqual(self.pool.acquire('key', Mock), (connection, True))
+        self.assertEqual(self.pool.stats()['hits'], 1)
+
+    def test_connections_are_pooled_per_key(self):
+        self.pool.release('key', Mock())
+        self.assertFalse(self.pool.acquire('other_key', Mock)[1])
+
+    def test_closes_connections_over_the_idle_limit(self):
+        first, second = Mock(), Mock()
+        self.pool.release('key', first)
+        self.pool.release('key', second)
+        second.close.assert_called_once_with()
+        self.assertFalse(first.close.called)
+
+    def test_clear_closes_idle_connections(self):
+        connection = Mock()
+        self.pool.release('key', connection)
+        self.pool.clear()
+        connection.close.assert_called_once_with()
+        self.assertFalse(self.pool.acquire('key', Mock)[1])
+
+
+class PooledServerTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.stub = StubServer().start()
+        self.stub.respond('/katello/api/ping', body={'status': 'ok'})
+
+    def tearDown(self):
+        self.stub.stop()
+
+    def create_server(self, pool):
+        server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        server.connection_pool = pool
+        server.set_auth_method(NoAuthentication())
+        return server
+
+    def test_requests_reuse_one_connection(self):
+        pool = ConnectionPool()
+        server = self.create_server(pool)
+        for _i in range(3):
+            self.assertEqual(server.GET('/api/ping')[1], {'status': 'ok'})
+        self.assertEqual(len(self.stub.connections), 1)
+        self.assertEqual(pool.stats(), {'hits': 2, 'misses': 1, 'reconnects': 0})
+
+    def test_servers_with_same_credentials_share_connections(self):
+        pool = ConnectionPool()
+        self.create_server(pool).GET('/api/ping')
+        self.create_server(pool).GET('/api/ping')
+        self.assertEqual(pool.stats()['hits'], 1)
+
+    def test_different_users_do_not_share_connections(self):
+        pool = ConnectionPool()
+        for user in ('admin', 'other'):
+            server = self.create_server(pool)
+            server.set_auth_method(BasicAuthentication(user, 'secret'))
+            server.GET('/api/ping')
+        self.assertEqual(pool.stats()['misses'], 2)
+
+    def test_reconnects_when_pooled_connection_went_stale(self):
+        pool = ConnectionPool()
+        server = self.create_server(pool)
+        self.stub.drop_connections = True
+        server.GET('/api/ping')
+        self.assertEqual(server.GET('/api/ping')[1], {'status': 'ok'})
+        self.assertEqual(pool.stats()['reconnects'], 1)
+
+    def test_streamed_response_releases_connection_when_read(self):
+        pool = ConnectionPool()
+        server = self.create_server(pool)
+        self.stub.respond('/katello/api/systems', body=[{'name': 'a'}, {'name': 'b'}])
+        systems = server.GET('/api/systems', stream=True)[1]
+        self.assertEqual(list(systems), [{'name': 'a'}, {'name': 'b'}])
+        server.GET('/api/ping')
+        self.assertEqual(pool.stats()['hits'], 1)
+
+    def test_abandoned_stream_closes_connection(self):
+        pool = ConnectionPool()
+        server = self.create_server(pool)
+        self.stub.respond('/katello/api/systems', body=[{'name': 'a'}, {'name': 'b'}])
+        systems = server.GET('/api/systems', stream=True)[1]
+        systems.next()
+        systems.close()
+        server.GET('/api/ping')
+        self.assertEqual(pool.stats()['hits'], 0)
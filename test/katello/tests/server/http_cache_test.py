@@ -0,0 +1,247 @@
+import os
+import shutil
+import tempfile
+import unittest
+import ConfigParser
+from mock import patch
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client import server
+from katello.client.config import Config
+from katello.client.cli.base import KatelloCLI
+from katello.client.core.base import BaseAction
+from katello.client.server import KatelloServer, ConnectionPool, NoAuthentication, BasicAuthentication
+from katello.client.lib.utils.compression import gzip_compress
+from katello.client.lib.utils.http_cache import HTTPCache, CachedResponse
+
+
+ORGS = [{'name': 'ACME_Corporation', 'label': 'ACME_Corporation'}]
+
+
+class ConditionalServer(object):
+    """
+    Answers with 304 Not Modified when the client's validators match
+    """
+
+    def __init__(self, body, etag='"v1"', last_modified=None, headers=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers or {}
+
+    def __call__(self, handler):
+        if self.etag and handler.headers.getheader('if-none-match') == self.etag:
+            return (304, '', {'ETag': self.etag})
+        if self.last_modified and handler.headers.getheader('if-modified-since') == self.last_modified:
+            return (304, '', {})
+        headers = dict(self.headers)
+        if self.etag:
+            headers['ETag'] = self.etag
+        if self.last_modified:
+            headers['Last-Modified'] = self.last_modified
+        return (200, self.body, headers)
+
+
+class HTTPCacheTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stub = StubServer().start()
+        self.server = self.create_server()
+
+    def tearDown(self):
+        self.server.connection_pool.clear()
+        self.stub.stop()
+        shutil.rmtree(self.directory)
+
+    def create_server(self, auth_method=None):
+        server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        server.connection_pool = ConnectionPool()
+        server.set_auth_method(auth_method or BasicAuthentication('admin', 'admin'))
+        server.http_cache = HTTPCache(self.directory)
+        return server
+
+    def conditional_headers(self, index):
+        headers = self.stub.requests[index][2]
+        return (headers.get('if-none-match'), headers.get('if-modified-since'))
+
+    def test_serves_not_modified_response_from_cache(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        self.assertEqual(self.server.GET('/api/organizations')[1], ORGS)
+        status, body, _headers = self.server.GET('/api/organizations')
+
+        self.assertEqual((status, body), (200, ORGS))
+        self.assertEqual(self.conditional_headers(0), (None, None))
+        self.assertEqual(self.conditional_headers(1), ('"v1"', None))
+        self.assertEqual(self.server.http_cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_sends_last_modified(self):
+        date = 'Sat, 17 Oct 2026 10:00:00 GMT'
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS, None, date)
+        self.server.GET('/api/organizations')
+        self.assertEqual(self.server.GET('/api/organizations')[1], ORGS)
+        self.assertEqual(self.conditional_headers(1), (None, date))
+
+    def test_cache_is_shared_by_processes(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        self.server.GET('/api/organizations')
+        other = self.create_server()
+        try:
+            self.assertEqual(other.GET('/api/organizations')[1], ORGS)
+        finally:
+            other.connection_pool.clear()
+        self.assertEqual(self.conditional_headers(1), ('"v1"', None))
+
+    def test_keeps_changed_response(self):
+        resource = ConditionalServer(ORGS)
+        self.stub.responses['/katello/api/organizations'] = resource
+        self.server.GET('/api/organizations')
+        resource.body, resource.etag = [], '"v2"'
+        self.assertEqual(self.server.GET('/api/organizations')[1], [])
+        self.assertEqual(self.server.GET('/api/organizations')[1], [])
+        self.assertEqual(self.conditional_headers(2), ('"v2"', None))
+
+    def test_users_have_separate_caches(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        admin = self.create_server(BasicAuthentication('admin', 'admin'))
+        user = self.create_server(BasicAuthentication('user', 'secret'))
+        try:
+            admin.GET('/api/organizations')
+            user.GET('/api/organizations')
+        finally:
+            admin.connection_pool.clear()
+            user.connection_pool.clear()
+        self.assertEqual(self.conditional_headers(1), (None, None))
+
+    def test_anonymous_responses_are_not_cached(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        anonymous = self.create_server(NoAuthentication())
+        try:
+            anonymous.GET('/api/organizations')
+            anonymous.GET('/api/organizations')
+        finally:
+            anonymous.connection_pool.clear()
+        self.assertEqual(self.conditional_headers(1), (None, None))
+
+    def test_queries_are_cached_separately(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        self.server.GET('/api/organizations', {'name': 'ACME_Corporation'})
+        self.server.GET('/api/organizations', {'name': 'Other'})
+        self.assertEqual(self.conditional_headers(1), (None, None))
+
+    def test_does_not_store_responses_without_validators(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS, None)
+        self.stub.responses['/katello/api/environments'] = ConditionalServer(ORGS,
+            headers={'Cache-Control': 'no-store'})
+        for _i in range(2):
+            self.server.GET('/api/organizations')
+            self.server.GET('/api/environments')
+        self.assertEqual([self.conditional_headers(i) for i in range(4)], [(None, None)] * 4)
+
+    def test_stores_decoded_body(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(gzip_compress('[1, 2]'),
+            headers={'Content-Encoding': 'gzip'})
+        self.server.GET('/api/organizations')
+        self.assertEqual(self.server.GET('/api/organizations')[1], [1, 2])
+
+    def test_streamed_and_other_requests_are_not_cached(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        list(self.server.GET('/api/organizations', stream=True)[1])
+        self.server.PUT('/api/organizations', {})
+        self.server.GET('/api/organizations')
+        self.assertEqual(self.conditional_headers(2), (None, None))
+
+    def test_ignores_corrupted_entries(self):
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        self.server.GET('/api/organizations')
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                open(os.path.join(root, name), 'wb').write('corrupted')
+        self.assertEqual(self.server.GET('/api/organizations')[1], ORGS)
+        self.assertEqual(self.conditional_headers(1), (None, None))
+
+
+class ListOrganizations(BaseAction):
+
+    def run(self):
+        server.get_active_server().GET('/api/organizations')
+
+
+class NoCacheOptionTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stub = StubServer().start()
+        self.stub.responses['/katello/api/organizations'] = ConditionalServer(ORGS)
+        self.previous_server = server.active_server
+        config = ConfigParser.RawConfigParser()
+        config.add_section('server')
+        for name, value in (('host', '127.0.0.1'), ('port', self.stub.port), ('scheme', 'http'),
+                            ('path', '/katello')):
+            config.set('server', name, str(value))
+        self.patchers = [patch.object(Config, 'parser', config), patch.object(Config, 'USER_DIR', self.directory)]
+        for patcher in self.patchers:
+            patcher.start()
+        self.cli = KatelloCLI()
+        self.cli.add_command('list', ListOrganizations())
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        server.active_server = self.previous_server
+        if self.cli._server is not None:
+            self.cli._server.connection_pool.clear()
+        self.stub.stop()
+        shutil.rmtree(self.directory)
+
+    def run_cli(self, *options):
+        self.assertEqual(self.cli.main(['-u', 'admin', '-p', 'admin'] + list(options) + ['list']), os.EX_OK)
+
+    def test_no_cache_applies_to_one_command(self):
+        self.run_cli()
+        self.run_cli('--no-cache')
+        self.run_cli()
+        validators = [headers.get('if-none-match') for _m, _p, headers, _b in self.stub.requests]
+        self.assertEqual(validators, [None, None, '"v1"'])
+
+
+class HTTPCacheEvictionTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    SCOPE = ('katello.example.com', 443, 'https', 'admin', '/katello/api')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def store(self, cache, url, size):
+        cache.store(self.SCOPE, url, CachedResponse(200, [('ETag', url)], 'x' * size))
+
+    def set_mtime(self, cache, url, mtime):
+        os.utime(cache._path(self.SCOPE, url), (mtime, mtime))
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = HTTPCache(self.directory, max_size=3000)
+        for i, url in enumerate(('/a', '/b')):
+            self.store(cache, url, 1000)
+            self.set_mtime(cache, url, 1000 + i)
+        cache.revalidated(self.SCOPE, '/a', cache.get(self.SCOPE, '/a'))
+        self.store(cache, '/c', 1000)
+
+        self.assertNotEqual(cache.get(self.SCOPE, '/a'), None)
+        self.assertEqual(cache.get(self.SCOPE, '/b'), None)
+        self.assertEqual(cache.get(self.SCOPE, '/c')['body'], 'x' * 1000)
+
+    def test_does_not_keep_cookies(self):
+        cache = HTTPCache(self.directory)
+        cache.store(self.SCOPE, '/a', CachedResponse(200, [('ETag', '"1"'), ('Set-Cookie', 'session=1')], ''))
+        self.assertEqual(cache.get(self.SCOPE, '/a')['headers'], [('ETag', '"1"')])
@@ -0,0 +1,183 @@
+import os
+import sys
+import types
+import unittest
+import ConfigParser
+from mock import patch
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client import server
+from katello.client.config import Config
+from katello.client.cli.base import KatelloCLI
+from katello.client.core.base import BaseAction
+from katello.client.server import KatelloServer, ConnectionPool, KerberosAuthentication, NoAuthentication, \
+    BasicAuthentication, ServerRequestError
+
+
+def fake_kerberos():
+    """
+    Module with the functions of python-kerberos the client uses,
+    counting the established contexts.
+    """
+    module = types.ModuleType('kerberos')
+    module.GSSError = type('GSSError', (Exception,), {})
+    module.GSS_C_DELEG_FLAG, module.GSS_C_MUTUAL_FLAG, module.GSS_C_SEQUENCE_FLAG = 1, 2, 8
+    module.contexts = []
+    module.cleaned = []
+
+    def init(service, gssflags=0):
+        module.contexts.append(service)
+        return (1, len(module.contexts))
+    module.authGSSClientInit = init
+    module.authGSSClientStep = lambda ctx, challenge: 1
+    module.authGSSClientResponse = lambda ctx: 'token-%d' % ctx
+    module.authGSSClientClean = module.cleaned.append
+    module.authGSSClientInquireCred = lambda ctx: 1
+    module.authGSSClientUserName = lambda ctx: 'admin@EXAMPLE.COM'
+    return module
+
+
+class NegotiateServer(object):
+    """
+    Accepts a Negotiate token and answers with a session cookie,
+    accepts the cookie of the current session, refuses anything else.
+    """
+
+    def __init__(self):
+        self.session = 'first'
+        self.accept_tokens = True
+
+    def __call__(self, handler):
+        authorization = handler.headers.getheader('authorization') or ''
+        if authorization.startswith('Negotiate ') and self.accept_tokens:
+            return (200, {'auth': 'negotiate'}, {'Set-Cookie': '_session_id=%s; path=/; HttpOnly' % self.session})
+        if handler.headers.getheader('cookie') == '_session_id=%s' % self.session:
+            return (200, {'auth': 'cookie'}, {})
+        return (401, {'displayMessage': 'unauthorized'}, {'WWW-Authenticate': 'Negotiate'})
+
+
+class KerberosSessionTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.original_kerberos = sys.modules.get('kerberos')
+        self.kerberos = sys.modules['kerberos'] = fake_kerberos()
+
+        self.negotiate = NegotiateServer()
+        self.stub = StubServer().start()
+        self.stub.responses['/katello/api/ping'] = self.negotiate
+        self.auth = KerberosAuthentication('katello.example.com')
+        self.server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        self.server.connection_pool = ConnectionPool()
+        self.server.set_auth_method(self.auth)
+
+    def tearDown(self):
+        self.server.connection_pool.clear()
+        self.stub.stop()
+        if self.original_kerberos is None:
+            del sys.modules['kerberos']
+        else:
+            sys.modules['kerberos'] = self.original_kerberos
+
+    def ping(self):
+        return self.server.GET('/api/ping')[1]['auth']
+
+    def test_negotiates_once_and_reuses_the_session(self):
+        self.assertEqual([self.ping() for _i in range(10)], ['negotiate'] + ['cookie'] * 9)
+        self.assertEqual(self.auth.stats(), {'negotiations': 1, 'session_reuses': 9})
+        self.assertEqual(self.kerberos.contexts, ['HTTP@katello.example.com'])
+        self.assertEqual(self.kerberos.cleaned, [1])
+
+    def test_identity_is_principal_of_credentials(self):
+        self.assertEqual(self.auth.identity(), None)
+        self.ping()
+        self.assertEqual(self.auth.identity(), 'admin@EXAMPLE.COM')
+
+    def test_identity_is_unknown_to_older_kerberos_module(self):
+        del self.kerberos.authGSSClientInquireCred
+        self.ping()
+        self.assertEqual(self.auth.identity(), None)
+
+    def test_negotiates_again_when_session_expired(self):
+        self.ping()
+        self.negotiate.session = 'second'
+        self.assertEqual(self.ping(), 'negotiate')
+        self.assertEqual(self.ping(), 'cookie')
+        self.assertEqual(self.auth.negotiations, 2)
+        self.assertEqual(len(self.stub.requests), 4)
+
+    def test_resends_body_after_renegotiation(self):
+        self.ping()
+        self.negotiate.session = 'second'
+        self.server.PUT('/api/ping', {'name': 'ACME'})
+        bodies = [body for method, _path, _headers, body in self.stub.requests if method == 'PUT']
+        self.assertEqual(bodies, ['{"name": "ACME"}'] * 2)
+
+    def test_does_not_retry_refused_negotiation(self):
+        self.negotiate.accept_tokens = False
+        try:
+            self.ping()
+            self.fail("the request should be refused")
+        except ServerRequestError, e:
+            self.assertEqual(e.args[0], 401)
+        self.assertEqual(self.auth.negotiations, 1)
+        self.assertEqual(len(self.stub.requests), 1)
+
+
+class Ping(BaseAction):
+
+    def run(self):
+        server.get_active_server().GET('/api/ping')
+
+
+class KerberosFallbackTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.original_kerberos = sys.modules.get('kerberos')
+        self.kerberos = sys.modules['kerberos'] = fake_kerberos()
+
+        self.stub = StubServer().start()
+        self.stub.responses['/katello/api/ping'] = NegotiateServer()
+        self.previous_server = server.active_server
+        config = ConfigParser.RawConfigParser()
+        config.add_section('server')
+        for name, value in (('host', '127.0.0.1'), ('port', self.stub.port), ('scheme', 'http'),
+                            ('path', '/katello')):
+            config.set('server', name, str(value))
+        self.patcher = patch.object(Config, 'parser', config)
+        self.patcher.start()
+        self.cli = KatelloCLI()
+        self.cli.add_command('ping', Ping())
+
+    def tearDown(self):
+        self.patcher.stop()
+        server.active_server = self.previous_server
+        if self.cli._server is not None:
+            self.cli._server.connection_pool.clear()
+        self.stub.stop()
+        if self.original_kerberos is None:
+            del sys.modules['kerberos']
+        else:
+            sys.modules['kerberos'] = self.original_kerberos
+
+    def test_negotiates_without_credentials(self):
+        self.assertEqual(self.cli.main(['ping']), os.EX_OK)
+        self.assertTrue(isinstance(self.cli._server.auth_method, KerberosAuthentication))
+        self.assertEqual(self.kerberos.contexts, ['HTTP@127.0.0.1'])
+
+    def test_credentials_take_precedence(self):
+        # the stub refuses anything but kerberos
+        self.assertNotEqual(self.cli.main(['-u', 'admin', '-p', 'admin', 'ping']), os.EX_OK)
+        self.assertTrue(isinstance(self.cli._server.auth_method, BasicAuthentication))
+        self.assertEqual(self.kerberos.contexts, [])
+
+    def test_no_authentication_without_kerberos_module(self):
+        # a None entry in sys.modules makes the import fail
+        sys.modules['kerberos'] = None
+        self.assertNotEqual(self.cli.main(['ping']), os.EX_OK)
+        self.assertTrue(isinstance(self.cli._server.auth_method, NoAuthentication))
@@ -0,0 +1,190 @@
+import time
+import threading
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client.server import KatelloServer, ConnectionPool, NoAuthentication, ServerRequestError, \
+    RetryPolicy, CircuitBreaker, parse_retry_after
+from katello.client.lib.utils.deadline import command_deadline
+
+
+class FaultInjector(object):
+    """
+    Fails the first requests with the given faults, a fault is a status
+    or None for a dropped connection, then answers with 200
+    """
+
+    def __init__(self, *faults, **headers):
+        self.faults = list(faults)
+        self.headers = headers
+        self.lock = threading.Lock()
+
+    def __call__(self, handler):
+        self.lock.acquire()
+        try:
+            if not self.faults:
+                return (200, {'ok': True}, {})
+            fault = self.faults.pop(0)
+        finally:
+            self.lock.release()
+        if fault is None:
+            return None
+        return (fault, 'Service Unavailable', self.headers)
+
+
+class RetryTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.stub = StubServer().start()
+        self.server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        self.server.connection_pool = ConnectionPool()
+        self.server.circuit_breaker = CircuitBreaker()
+        self.server.retry_policy = RetryPolicy(backoff=0.01)
+        self.server.retry_policy.start()
+        self.server.set_auth_method(NoAuthentication())
+
+    def tearDown(self):
+        self.server.connection_pool.clear()
+        self.stub.stop()
+
+    def inject(self, *faults, **headers):
+        self.stub.responses['/katello/api/systems'] = FaultInjector(*faults, **headers)
+
+    def test_retries_unavailable_server(self):
+        self.inject(503, 502, 504)
+        self.assertEqual(self.server.GET('/api/systems')[1], {'ok': True})
+        self.assertEqual(len(self.stub.requests), 4)
+        self.assertEqual(self.server.retry_policy.stats(), {'retries': 3, 'failures': 0})
+
+    def test_retries_dropped_connections(self):
+        self.inject(None, None)
+        self.assertEqual(self.server.DELETE('/api/systems')[1], {'ok': True})
+        self.assertEqual(self.server.retry_policy.retries, 2)
+
+    def test_gives_up_after_max_retries(self):
+        self.inject(503, 503, 503, 503)
+        try:
+            self.server.PUT('/api/systems', {'name': 'host'})
+            self.fail("ServerRequestError expected")
+        except ServerRequestError, e:
+            self.assertEqual(e.args[0], 503)
+        self.assertEqual(len(self.stub.requests), 4)
+        self.assertEqual(self.server.retry_policy.stats(), {'retries': 3, 'failures': 1})
+
+    def test_resends_the_same_body(self):
+        self.inject(503)
+        self.server.PUT('/api/systems', {'name': 'host'})
+        self.assertEqual(self.stub.requests[0][3], self.stub.requests[1][3])
+
+    def test_post_is_retried_only_when_allowed(self):
+        self.inject(503)
+        self.assertRaises(ServerRequestError, self.server.POST, '/api/systems', {'name': 'host'})
+        self.assertEqual(len(self.stub.requests), 1)
+
+        self.server.retry_policy.retry_post = True
+        self.inject(503)
+        self.assertEqual(self.server.POST('/api/systems', {'name': 'host'})[1], {'ok': True})
+
+    def test_client_and_server_errors_are_not_retried(self):
+        self.inject(500)
+        self.assertRaises(ServerRequestError, self.server.GET, '/api/systems')
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_honours_retry_after(self):
+        self.inject(429, **{'Retry-After': '1'})
+        started = time.time()
+        self.server.GET('/api/systems')
+        self.assertTrue(time.time() - started >= 1)
+
+    def test_does_not_wait_past_the_deadline(self):
+        self.server.retry_policy.retry_time = 0.5
+        self.server.retry_policy.start()
+        self.inject(503, **{'Retry-After': '60'})
+        started = time.time()
+        self.assertRaises(ServerRequestError, self.server.GET, '/api/systems')
+        self.assertTrue(time.time() - started < 0.5)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_retries_are_off_without_policy(self):
+        self.server.retry_policy = None
+        self.inject(503)
+        self.assertRaises(ServerRequestError, self.server.GET, '/api/systems')
+
+    def test_open_circuit_fails_fast(self):
+        self.server.circuit_breaker = CircuitBreaker(threshold=2, cooldown=60)
+        self.server.retry_policy.retry_time = 1
+        self.server.retry_policy.start()
+        self.inject(*[503] * 10)
+        self.assertRaises(ServerRequestError, self.server.GET, '/api/systems')
+        self.assertEqual(len(self.stub.requests), 2)
+        self.assertEqual(self.server.circuit_breaker.trips, 1)
+
+        started = time.time()
+        self.assertRaises(ServerRequestError, self.server.GET, '/api/ping')
+        self.assertTrue(time.time() - started < 0.5)
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_requests_wait_for_circuit_to_close(self):
+        self.server.circuit_breaker = CircuitBreaker(threshold=2, cooldown=0.2)
+        self.inject(503, 503)
+        self.assertEqual(self.server.GET('/api/systems')[1], {'ok': True})
+        self.assertEqual(self.server.circuit_breaker.trips, 1)
+        self.assertEqual(self.server.circuit_breaker.wait_time(('127.0.0.1', self.stub.port)), 0)
+
+    def open_circuit(self):
+        self.server.circuit_breaker = CircuitBreaker(threshold=1, cooldown=10)
+        self.inject(503)
+        self.server.retry_policy.max_retries = 0
+        self.assertRaises(ServerRequestError, self.server.GET, '/api/systems')
+        self.server.retry_policy.max_retries = 3
+
+    def assertFailsFast(self, function, *args):
+        started = time.time()
+        self.assertRaises(ServerRequestError, function, *args)
+        self.assertTrue(time.time() - started < 0.5)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_requests_without_retries_do_not_wait_for_circuit(self):
+        self.open_circuit()
+        self.assertFailsFast(self.server.POST, '/api/systems', {'name': 'host'})
+        self.server.retry_policy = None
+        self.assertFailsFast(self.server.GET, '/api/systems')
+
+    def test_wait_for_circuit_ends_at_the_deadline(self):
+        self.open_circuit()
+        self.server.retry_policy.retry_time = 60
+        self.server.retry_policy.start()
+        command_deadline.start(1)
+        try:
+            self.assertFailsFast(self.server.GET, '/api/systems')
+        finally:
+            command_deadline.start(None)
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def test_backoff_grows_with_jitter(self):
+        policy = RetryPolicy(max_retries=5, backoff=1, max_backoff=4, retry_time=None)
+        for attempt, (low, high) in enumerate([(0.5, 1), (1, 2), (2, 4), (2, 4), (2, 4)]):
+            delay = policy.delay(attempt)
+            self.assertTrue(low <= delay <= high, "%s not in <%s, %s>" % (delay, low, high))
+        self.assertEqual(policy.delay(5), None)
+
+    def test_retriable_requests(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.retriable('GET', None))
+        self.assertTrue(policy.retriable('PUT', '{}'))
+        self.assertFalse(policy.retriable('POST', '{}'))
+        self.assertFalse(policy.retriable('PUT', iter(['{}'])))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('120'), 120)
+        self.assertEqual(parse_retry_after('Sat, 17 Oct 2026 10:00:30 GMT', now=1792231200), 30)
+        self.assertEqual(parse_retry_after('soon'), None)
+        self.assertEqual(parse_retry_after(None), None)
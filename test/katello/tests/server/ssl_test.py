@@ -0,0 +1,265 @@
+import os
+import sys
+import socket
+import types
+import tempfile
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError
+
+from katello.client.server import SSLAuthentication
+
+
+class FakeSession(object):
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+
+    def __eq__(self, other):
+        return isinstance(other, FakeSession) and other.session_id == self.session_id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self.session_id
+
+    def as_der(self):
+        return 'session-%d' % self.session_id
+
+
+def fake_m2crypto(accepted_sessions):
+    """
+    Modules of M2Crypto the certificate authentication uses. Handshakes
+    resume the offered session when it is in accepted_sessions.
+    """
+    m2crypto = types.ModuleType('M2Crypto')
+    ssl = m2crypto.SSL = types.ModuleType('M2Crypto.SSL')
+    httpslib = m2crypto.httpslib = types.ModuleType('M2Crypto.httpslib')
+    bio = m2crypto.BIO = types.ModuleType('M2Crypto.BIO')
+    m2 = m2crypto.m2 = types.ModuleType('M2Crypto.m2')
+    m2.SSL_OP_NO_SSLv2, m2.SSL_OP_NO_SSLv3 = 1, 2
+    ssl.SSLError = type('SSLError', (Exception,), {})
+    m2crypto.contexts = []
+    m2crypto.sessions = []
+
+    class MemoryBuffer(object):
+        def bio_ptr(self):
+            return self
+    bio.MemoryBuffer = MemoryBuffer
+    m2.ssl_get_session = lambda connection: connection.session
+    m2.ssl_get1_session = lambda connection: FakeSession(connection.session.session_id)
+
+    def write_session(session, buf):
+        buf.session_id = session.session_id
+        return 1
+    m2.ssl_session_write_pem = write_session
+    m2.ssl_session_read_pem = lambda buf: FakeSession(buf.session_id)
+    m2crypto.Session = ssl.Session = types.ModuleType('M2Crypto.SSL.Session')
+    ssl.Session.Session = lambda session, _pyfree: session
+
+    class Context(object):
+        def __init__(self, protocol):
+            self.protocol = protocol
+            self.options = 0
+            self.certs = []
+            m2crypto.contexts.append(self)
+
+        def set_options(self, options):
+            self.options |= options
+
+        def load_cert(self, certfile, keyfile):
+            self.certs.append((certfile, keyfile))
+    ssl.Context = Context
+
+    ssl.timeout = lambda sec, microsec: (sec, microsec)
+
+    class Connection(object):
+        def __init__(self, ssl_context, family=socket.AF_INET):
+            self.ssl = self
+            self.offered = self.session = None
+            self.calls = []
+
+        def set_socket_read_timeout(self, timeout):
+            self.calls.append(('read timeout', timeout))
+
+        def set_socket_write_timeout(self, timeout):
+            self.calls.append(('write timeout', timeout))
+
+        def set_session(self, session):
+            self.offered = session
+
+        def connect(self, address):
+            self.calls.append(('connect', address))
+            if self.offered is not None and self.offered in accepted_sessions:
+                self.session = self.offered
+            else:
+                self.session = FakeSession(len(m2crypto.sessions))
+                m2crypto.sessions.append(self.session)
+                accepted_sessions.append(self.session)
+            return 1
+
+        def get_session(self):
+            return self.session
+
+        def close(self):
+            pass
+    ssl.Connection = Connection
+
+    class HTTPSConnection(object):
+        def __init__(self, host, port=None, strict=None, **ssl):
+            self.host, self.port = host, port
+            self.ssl_ctx = ssl['ssl_context']
+            self.timeout = socket._GLOBAL_DEFAULT_TIMEOUT
+            self.session = None
+            self.sock = None
+
+        def set_session(self, session):
+            self.session = session
+
+        def connect(self):
+            raise AssertionError("httpslib connects without the timeout")
+
+        def close(self):
+            pass
+    httpslib.HTTPSConnection = HTTPSConnection
+    return m2crypto
+
+
+class SSLAuthenticationTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    MODULES = ('M2Crypto', 'M2Crypto.SSL', 'M2Crypto.SSL.Session', 'M2Crypto.httpslib', 'M2Crypto.BIO',
+        'M2Crypto.m2')
+
+    def setUp(self):
+        self.original_modules = dict([(name, sys.modules.get(name)) for name in self.MODULES])
+        self.accepted_sessions = []
+        self.m2crypto = fake_m2crypto(self.accepted_sessions)
+        sys.modules['M2Crypto'] = self.m2crypto
+        for name in self.MODULES[1:]:
+            sys.modules[name] = getattr(self.m2crypto, name.split('.')[-1])
+
+        self.files = []
+        self.cert, self.key = self.create_file(), self.create_file()
+        SSLAuthentication.clear()
+        SSLAuthentication.full_handshakes = SSLAuthentication.resumed_handshakes = 0
+        self.getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = lambda host, port, family, socktype: \
+            [(socket.AF_INET, socktype, 6, '', ('192.0.2.1', port))]
+
+    def tearDown(self):
+        socket.getaddrinfo = self.getaddrinfo
+        SSLAuthentication.clear()
+        for name, module in self.original_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        for path in self.files:
+            os.remove(path)
+
+    def create_file(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.files.append(path)
+        return path
+
+    def connect(self, auth, host='katello.example.com', timeout=None):
+        connection = auth.connect(host, 443, 'https')
+        if timeout is not None:
+            connection.timeout = timeout
+        connection.connect()
+        return connection
+
+    def test_timeout_is_set_before_connecting(self):
+        connection = self.connect(SSLAuthentication(self.cert, self.key), timeout=2.5)
+        self.assertEqual(connection.sock.calls, [('read timeout', (2, 500000)), ('write timeout', (2, 500000)),
+            ('connect', ('katello.example.com', 443))])
+
+    def test_context_is_built_once(self):
+        auth = SSLAuthentication(self.cert, self.key)
+        for _i in range(5):
+            self.connect(auth)
+        self.connect(SSLAuthentication(self.cert, self.key))
+
+        self.assertEqual(len(self.m2crypto.contexts), 1)
+        self.assertEqual(self.m2crypto.contexts[0].certs, [(self.cert, self.key)])
+
+    def test_protocol_is_negotiated_without_ssl2_and_ssl3(self):
+        self.connect(SSLAuthentication(self.cert, self.key))
+        context = self.m2crypto.contexts[0]
+        self.assertEqual((context.protocol, context.options), ('sslv23', 3))
+
+    def test_sessions_are_resumed(self):
+        auth = SSLAuthentication(self.cert, self.key)
+        connections = [self.connect(auth) for _i in range(10)]
+
+        self.assertEqual(connections[0].session, None)
+        self.assertEqual(set([c.sock.session for c in connections]), set(self.m2crypto.sessions))
+        self.assertEqual(auth.stats(), {'full_TLS_handshakes': 1, 'resumed_TLS_sessions': 9})
+
+    def test_copy_of_session_is_kept(self):
+        connection = self.connect(SSLAuthentication(self.cert, self.key))
+        kept = SSLAuthentication._sessions.values()
+        self.assertEqual(kept, [connection.sock.session])
+        self.assertFalse(kept[0] is connection.sock.session)
+
+    def test_session_is_copied_through_pem_by_older_m2crypto(self):
+        del self.m2crypto.m2.ssl_get1_session
+        auth = SSLAuthentication(self.cert, self.key)
+        connection = self.connect(auth)
+        self.assertFalse(SSLAuthentication._sessions.values()[0] is connection.sock.session)
+        self.connect(auth)
+        self.assertEqual(auth.stats(), {'full_TLS_handshakes': 1, 'resumed_TLS_sessions': 1})
+
+    def test_session_sent_after_handshake_is_kept_on_close(self):
+        auth = SSLAuthentication(self.cert, self.key)
+        connection = self.connect(auth)
+        # TLS 1.3 ticket replacing the session of the handshake
+        ticket = connection.sock.session = FakeSession(100)
+        self.accepted_sessions.append(ticket)
+        connection.close()
+        self.assertEqual(self.connect(auth).session, ticket)
+
+    def test_sessions_are_kept_per_server_and_certificate(self):
+        self.connect(SSLAuthentication(self.cert, self.key))
+        self.connect(SSLAuthentication(self.cert, self.key), 'other.example.com')
+        other_cert = SSLAuthentication(self.create_file(), self.key)
+        self.connect(other_cert)
+
+        self.assertEqual(len(self.m2crypto.sessions), 3)
+        self.assertEqual(len(self.m2crypto.contexts), 2)
+
+    def test_refused_session_is_replaced(self):
+        auth = SSLAuthentication(self.cert, self.key)
+        self.connect(auth)
+        del self.accepted_sessions[:]
+        self.connect(auth)
+        self.connect(auth)
+
+        self.assertEqual(auth.stats(), {'full_TLS_handshakes': 2, 'resumed_TLS_sessions': 1})
+
+    def test_renewed_certificate_is_loaded_again(self):
+        auth = SSLAuthentication(self.cert, self.key)
+        self.connect(auth)
+        os.utime(self.cert, (0, 0))
+        self.connect(auth)
+        self.assertEqual(len(self.m2crypto.contexts), 2)
+
+    def test_renewed_certificate_replaces_context_and_sessions(self):
+        auth = SSLAuthentication(self.cert, self.key)
+        self.connect(auth)
+        self.connect(auth, 'other.example.com')
+        other = SSLAuthentication(self.create_file(), self.key)
+        self.connect(other)
+        for mtime in (1000, 2000):
+            os.utime(self.cert, (mtime, mtime))
+            connection = self.connect(auth)
+            self.assertEqual(connection.session, None)
+            self.assertEqual(connection.ssl_ctx, self.m2crypto.contexts[-1])
+
+        self.assertEqual(len(SSLAuthentication._contexts), 2)
+        self.assertEqual(len(SSLAuthentication._sessions), 2)
+        self.assertEqual(auth.stats(), {'full_TLS_handshakes': 5, 'resumed_TLS_sessions': 0})
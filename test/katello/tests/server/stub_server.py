@@ -0,0 +1,105 @@
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers every request with the response the test registered for its path.
+    Responses are tuples of (status, body, headers), None drops the connection.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # send the response in one piece, unbuffered small writes run into
+    # delayed acks of keep-alive connections (40ms per request)
+    wbufsize = -1
+
+    def do_GET(self):
+        self._respond()
+
+    do_HEAD = do_POST = do_PUT = do_DELETE = do_GET
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.getheader('content-length') or 0)
+        self.body = self.rfile.read(length) if length else ''
+        server.record(self, self.body)
+
+        response = server.response_for(self)
+        if response is None:
+            # fault injection, close the connection without any response
+            self.close_connection = 1
+            return
+        status, response_body, headers = response
+        if not isinstance(response_body, basestring):
+            response_body = json.dumps(response_body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response_body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(response_body)
+        if server.drop_connections:
+            # close the connection without telling the client
+            self.close_connection = 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """
+    Local http server running in a background thread.
+    Collects the received requests in the requests list.
+    With drop_connections set it closes keep-alive connections
+    behind the client's back after every response.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler=StubRequestHandler):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), handler)
+        self.port = self.server_address[1]
+        self.requests = []
+        self.connections = set()
+        self.responses = {}
+        self.default_response = (200, {}, {})
+        self.drop_connections = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def respond(self, path, status=200, body=None, headers=None):
+        self.responses[path] = (status, body if body is not None else {}, headers or {})
+
+    def response_for(self, handler):
+        path = handler.path.split('?')[0].replace('//', '/')
+        response = self.responses.get(path, self.default_response)
+        if callable(response):
+            return response(handler)
+        return response
+
+    def record(self, handler, body):
+        self._lock.acquire()
+        try:
+            self.requests.append((handler.command, handler.path, dict(handler.headers.items()), body))
+            self.connections.add(handler.client_address)
+        finally:
+            self._lock.release()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,))
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
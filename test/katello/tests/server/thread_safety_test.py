@@ -0,0 +1,299 @@
+import cgi
+import time
+import base64
+import unittest
+import threading
+import ConfigParser
+from mock import patch
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client import server
+from katello.client.batch import Batch, read_commands
+from katello.client.config import Config
+from katello.client.api.base import KatelloAPI
+from katello.client.cli.base import KatelloCLI
+from katello.client.core.base import BaseAction
+from katello.client.server import KatelloServer, ConnectionPool, BasicAuthentication
+from katello.client.lib.utils.concurrency import BackgroundCall, parallel_map
+
+
+def echo(handler):
+    """
+    Answers with the headers and the body of the request
+    """
+    return (200, {
+        'method': handler.command,
+        'path': handler.path,
+        'authorization': handler.headers.getheader('authorization'),
+        'content-type': handler.headers.getheader('content-type'),
+        'content-length': int(handler.headers.getheader('content-length') or 0),
+        'request': handler.headers.getheader('x-request'),
+        'body': json.loads(handler.body) if handler.body else None,
+    }, {})
+
+
+def items(handler):
+    """
+    Answers with the page of a list of 5 items the query asks for, every
+    item holds the port and the authorization the request was sent to and with
+    """
+    query = cgi.parse_qs(handler.path.split('?', 1)[1])
+    offset, limit = int(query['offset'][0]), int(query['limit'][0])
+    source = (handler.server.server_port, handler.headers.getheader('authorization'))
+    return (200, [{'id': i, 'source': source} for i in range(offset, min(offset + limit, 5))], {})
+
+
+def run_threads(count, target):
+    errors = []
+
+    def run(number):
+        try:
+            target(number)
+        except Exception, e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    return errors
+
+
+class ConcurrentRequestsTest(unittest.TestCase):
+    """
+    Many threads sending requests through one server must never see each
+    other's headers, queries or bodies.
+    """
+
+    failureException = ColoredAssertionError
+
+    THREADS = 16
+    REQUESTS = 125
+
+    def setUp(self):
+        self.stub = StubServer().start()
+        self.stub.responses['/katello/api/echo'] = echo
+        self.server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        self.server.connection_pool = ConnectionPool(max_idle=self.THREADS)
+        self.server.set_auth_method(BasicAuthentication('admin', 'secret'))
+        self.authorization = 'Basic ' + base64.encodestring('admin:secret')[:-1]
+
+    def tearDown(self):
+        # close the kept-alive connections so that the stub's handler threads end
+        self.server.connection_pool.clear()
+        self.stub.stop()
+
+    def check_get(self, request_id, query):
+        response = self.server.GET('/api/echo', query, custom_headers={'X-Request': request_id})[1]
+        self.assertEqual(response['request'], request_id)
+        self.assertEqual(response['method'], 'GET')
+        self.assertEqual(response['path'].replace('//', '/'), '/katello/api/echo?id=%s' % request_id)
+        self.assertEqual(response['content-length'], 0)
+        self.assertEqual(response['authorization'], self.authorization)
+
+    def check_put(self, request_id):
+        body = {'id': request_id, 'payload': 'x' * (hash(request_id) % 200)}
+        response = self.server.PUT('/api/echo', body, custom_headers={'X-Request': request_id})[1]
+        self.assertEqual(response['request'], request_id)
+        self.assertEqual(response['method'], 'PUT')
+        self.assertEqual(response['body'], body)
+        self.assertEqual(response['content-length'], len(json.dumps(body)))
+        self.assertEqual(response['content-type'], 'application/json')
+        self.assertEqual(response['authorization'], self.authorization)
+
+    def test_concurrent_get_and_put(self):
+        # one query dict shared by all the requests of a thread
+        def worker(number):
+            query = {}
+            for i in range(self.REQUESTS):
+                request_id = '%d-%d' % (number, i)
+                if i % 2:
+                    self.check_put(request_id)
+                else:
+                    query['id'] = request_id
+                    self.check_get(request_id, query)
+
+        errors = run_threads(self.THREADS, worker)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.stub.requests), self.THREADS * self.REQUESTS)
+        self.assertEqual(self.server.headers.keys().count('content-length'), 0)
+        self.assertFalse('Authorization' in self.server.headers)
+
+    def test_auth_method_replaced_during_requests(self):
+        stopped = []
+
+        def replace_auth():
+            while not stopped:
+                self.server.set_auth_method(BasicAuthentication('admin', 'secret'))
+
+        replacer = threading.Thread(target=replace_auth)
+        replacer.start()
+        try:
+            errors = run_threads(4, lambda number: [self.check_put('%d-%d' % (number, i)) for i in range(50)])
+        finally:
+            stopped.append(True)
+            replacer.join()
+        self.assertEqual(errors, [])
+
+
+class ThreadServerTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.original_server = server.active_server
+
+    def tearDown(self):
+        server.active_server = self.original_server
+        server.set_thread_server(None)
+
+    def test_threads_use_their_own_active_server(self):
+        servers = [KatelloServer('host-%d' % i) for i in range(8)]
+        seen = {}
+
+        def worker(number):
+            server.set_thread_server(servers[number])
+            time.sleep(0.01)
+            seen[number] = server.get_active_server()
+
+        self.assertEqual(run_threads(len(servers), worker), [])
+        self.assertEqual([seen[i] for i in range(len(servers))], servers)
+
+    def test_threads_without_server_use_the_process_one(self):
+        default = KatelloServer('default')
+        server.set_active_server(default)
+        seen = []
+        run_threads(1, lambda number: seen.append(server.get_active_server()))
+        self.assertEqual(seen, [default])
+        server.set_thread_server(KatelloServer('other'))
+        self.assertEqual(server.get_active_server().host, 'other')
+        server.set_thread_server(None)
+        self.assertEqual(server.get_active_server(), default)
+
+    def test_worker_threads_inherit_server_and_credentials(self):
+        server.set_active_server(KatelloServer('default'))
+        line_server = KatelloServer('line')
+        auth = BasicAuthentication('user', 'secret')
+        seen = []
+
+        def look(_item=None):
+            active = server.get_active_server()
+            seen.append((active.host, active.auth_method))
+
+        def line(number):
+            server.set_thread_server(line_server)
+            line_server.set_thread_auth_method(auth)
+            BackgroundCall(look).result()
+            parallel_map(look, range(4), 2)
+
+        self.assertEqual(run_threads(1, line), [])
+        self.assertEqual(seen, [('line', auth)] * 5)
+        self.assertEqual(server.get_active_server().host, 'default')
+        self.assertNotEqual(line_server.auth_method, auth)
+
+
+class Echo(BaseAction):
+
+    def __init__(self):
+        super(Echo, self).__init__()
+        self.authorizations = []
+
+    def run(self):
+        self.authorizations.append(server.get_active_server().GET('/api/echo')[1]['authorization'])
+
+
+class ListItems(BaseAction):
+
+    def __init__(self):
+        super(ListItems, self).__init__()
+        self.items = []
+
+    def run(self):
+        self.items.extend(KatelloAPI()._get_list('/api/items', page_size=2))
+
+
+class SessionCredentialsTest(unittest.TestCase):
+    """
+    Batch lines with their own credentials must not change the credentials
+    of the server they share with the other lines.
+    """
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.stub = StubServer().start()
+        self.stub.responses['/katello/api/echo'] = echo
+        self.original_server = server.active_server
+        config = ConfigParser.RawConfigParser()
+        config.add_section('server')
+        for name, value in (('host', '127.0.0.1'), ('port', self.stub.port), ('scheme', 'http'),
+                            ('path', '/katello')):
+            config.set('server', name, str(value))
+        self.patcher = patch.object(Config, 'parser', config)
+        self.patcher.start()
+        self.cli = self.create_cli()
+
+    def tearDown(self):
+        self.patcher.stop()
+        server.active_server = self.original_server
+        server.connection_pool.clear()
+        self.stub.stop()
+
+    def create_cli(self):
+        cli = KatelloCLI()
+        cli.add_command('echo', Echo())
+        cli.add_command('items', ListItems())
+        return cli
+
+    def session_cli(self):
+        cli = self.create_cli()
+        cli.share_session(self.cli)
+        return cli
+
+    def authorization(self, username, password):
+        return 'Basic ' + base64.encodestring('%s:%s' % (username, password))[:-1]
+
+    def test_line_credentials_apply_to_its_thread(self):
+        self.assertEqual(self.cli.main(['-u', 'admin', '-p', 'secret', 'echo']), 0)
+        clis = [self.create_cli() for _i in range(4)]
+
+        def worker(number):
+            clis[number].share_session(self.cli)
+            options = number % 2 and ['-u', 'user%d' % number, '-p', 'other'] or []
+            for _i in range(10):
+                self.assertEqual(clis[number].main(options + ['echo']), 0)
+
+        self.assertEqual(run_threads(len(clis), worker), [])
+        for number, cli in enumerate(clis):
+            expected = number % 2 and self.authorization('user%d' % number, 'other') or \
+                self.authorization('admin', 'secret')
+            self.assertEqual(set(cli.get_command('echo').authorizations), set([expected]))
+        self.assertEqual(self.cli.main(['echo']), 0)
+        self.assertEqual(self.cli.get_command('echo').authorizations[-1], self.authorization('admin', 'secret'))
+
+    def test_paged_list_of_parallel_line_reaches_its_server(self):
+        other = StubServer().start()
+        try:
+            self.stub.responses['/katello/api/items'] = other.responses['/katello/api/items'] = items
+            self.assertEqual(self.cli.main(['-u', 'admin', '-p', 'secret', 'echo']), 0)
+            lines = ['-u user -p other items', '--port %d items' % other.port, 'items',
+                     '--port %d -u user -p other items' % other.port]
+            clis = []
+            batch = Batch(lambda: clis.append(self.session_cli()) or clis[-1], 4)
+            self.assertEqual([r.exit_code for r in batch.run(read_commands(lines))], [0, 0, 0, 0])
+        finally:
+            other.stop()
+
+        sources = sorted([tuple(item['source']) for cli in clis for item in cli.get_command('items').items])
+        self.assertEqual(sources, sorted([(self.stub.port, self.authorization('user', 'other'))] * 5 +
+            [(self.stub.port, self.authorization('admin', 'secret'))] * 5 +
+            [(other.port, self.authorization('admin', 'secret'))] * 5 +
+            [(other.port, self.authorization('user', 'other'))] * 5))
@@ -0,0 +1,105 @@
+import time
+import socket
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client.server import KatelloServer, ConnectionPool, NoAuthentication, RetryPolicy, CircuitBreaker
+from katello.client.lib.utils.deadline import Deadline, DeadlineExceeded, command_deadline
+
+
+def slow_response(seconds):
+    def respond(handler):
+        time.sleep(seconds)
+        return (200, {'slow': True}, {})
+    return respond
+
+
+class TimeoutTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.stub = StubServer().start()
+        self.server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        self.server.connection_pool = ConnectionPool()
+        self.server.circuit_breaker = CircuitBreaker()
+        self.server.retry_policy = None
+        self.server.set_auth_method(NoAuthentication())
+        self.stub.responses['/katello/api/slow'] = slow_response(1)
+
+    def tearDown(self):
+        command_deadline.start(None)
+        self.server.connection_pool.clear()
+        self.stub.stop()
+
+    def assertTakesLessThan(self, seconds, function, *args):
+        started = time.time()
+        function(*args)
+        self.assertTrue(time.time() - started < seconds, "took %.2f s" % (time.time() - started))
+
+    def test_read_timeout(self):
+        self.server.read_timeout = 0.2
+        self.assertTakesLessThan(0.8, self.assertRaises, socket.timeout, self.server.GET, '/api/slow')
+
+    def test_timed_out_requests_are_retried(self):
+        self.server.read_timeout = 0.2
+        self.server.retry_policy = RetryPolicy(max_retries=1, backoff=0.01)
+        self.assertRaises(socket.timeout, self.server.GET, '/api/slow')
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_timed_out_post_is_not_resent_on_kept_alive_connection(self):
+        self.server.read_timeout = 0.3
+        self.server.retry_policy = RetryPolicy(backoff=0.01)
+        self.stub.responses['/katello/api/systems'] = slow_response(1)
+        self.server.GET('/api/ping')
+        self.assertRaises(socket.timeout, self.server.POST, '/api/systems', {'name': 'host'})
+        time.sleep(1)
+        self.assertEqual([method for method, _p, _h, _b in self.stub.requests].count('POST'), 1)
+
+    def test_fast_responses_fit_in_the_timeouts(self):
+        self.server.read_timeout = 0.5
+        self.assertEqual(self.server.GET('/api/ping')[0], 200)
+        self.assertEqual(self.server.GET('/api/ping')[0], 200)
+        self.assertEqual(len(self.stub.connections), 1)
+
+    def test_deadline_cuts_the_read_timeout(self):
+        command_deadline.start(0.3)
+        self.assertTakesLessThan(0.8, self.assertRaises, DeadlineExceeded, self.server.GET, '/api/slow')
+
+    def test_deadline_stops_retries(self):
+        self.server.retry_policy = RetryPolicy(max_retries=10, backoff=0.01)
+        command_deadline.start(0.5)
+        self.assertTakesLessThan(1, self.assertRaises, DeadlineExceeded, self.server.GET, '/api/slow')
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_requests_fail_fast_after_the_deadline(self):
+        command_deadline.start(0)
+        self.assertRaises(DeadlineExceeded, self.server.GET, '/api/ping')
+        self.assertEqual(self.stub.requests, [])
+
+
+class DeadlineTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def test_no_deadline(self):
+        deadline = Deadline()
+        self.assertEqual(deadline.remaining(), None)
+        self.assertEqual(deadline.limit(30), 30)
+        self.assertFalse(deadline.expired())
+
+    def test_limits_timeouts(self):
+        deadline = Deadline()
+        deadline.start(10)
+        self.assertTrue(9 < deadline.limit(None) <= 10)
+        self.assertEqual(deadline.limit(5), 5)
+
+    def test_sleep_ends_at_the_deadline(self):
+        deadline = Deadline()
+        deadline.start(0.1)
+        started = time.time()
+        self.assertRaises(DeadlineExceeded, deadline.sleep, 10)
+        self.assertTrue(time.time() - started < 1)
+        self.assertRaises(DeadlineExceeded, deadline.check)
@@ -0,0 +1,270 @@
+import os
+import re
+import tempfile
+import threading
+import shutil
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client import server
+from katello.client.api.content_upload import ContentUploadAPI
+from katello.client.lib.upload import ChunkedUploader, UploadPipeline, ContentIndex, find_files
+from katello.client.server import KatelloServer, NoAuthentication, FileChunk, MultipartStream, \
+    ServerRequestError, CircuitBreaker, RetryPolicy
+
+
+FIELD_RE = re.compile(r'name="(\w+)"\r\n\r\n(.*?)\r\n--', re.DOTALL)
+
+
+def extract_name(args):
+    # files named bad* have invalid content
+    content_type, path = args
+    name = os.path.basename(path)
+    if name.startswith('bad'):
+        return path, None, None, 'invalid %s' % name
+    return path, {'name': name, 'type': content_type}, {}, None
+
+
+class TempFileTestCase(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    content = ''.join([chr(i % 256) for i in range(1000)])
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.write(fd, self.content)
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+
+class MultipartStreamTest(TempFileTestCase):
+
+    def encode(self, data):
+        return KatelloServer('localhost')._encode_multipart_formdata(data)[1]
+
+    def test_streams_same_body_as_joined_encoding(self):
+        stream = self.encode({'offset': '10', 'content': FileChunk(self.path, 10, 100)})
+        joined = self.encode({'offset': '10', 'content': self.content[10:110]})
+        self.assertTrue(isinstance(stream, MultipartStream))
+        self.assertEqual(len(stream), len(joined))
+        self.assertEqual(''.join(iter(lambda: stream.read(7), '')), joined)
+
+    def test_seek_rewinds_the_body(self):
+        stream = self.encode({'content': FileChunk(self.path, 0, 1000)})
+        first = stream.read()
+        stream.seek(0)
+        self.assertEqual(stream.read(), first)
+
+    def test_plain_fields_are_joined(self):
+        self.assertTrue(isinstance(self.encode({'offset': '0'}), str))
+
+
+class ChunkedUploaderTest(TempFileTestCase):
+
+    def setUp(self):
+        super(ChunkedUploaderTest, self).setUp()
+        self.stub = StubServer().start()
+        self.previous_server = server.active_server
+        katello_server = KatelloServer('127.0.0.1', self.stub.port, 'http', '/katello')
+        katello_server.set_auth_method(NoAuthentication())
+        katello_server.retry_policy = RetryPolicy(backoff=0)
+        katello_server.circuit_breaker = CircuitBreaker(threshold=100)
+        server.set_active_server(katello_server)
+        self.server = katello_server
+        self.uploader = ChunkedUploader(ContentUploadAPI(), chunk_size=64, workers=4, retry_delay=0)
+
+    def tearDown(self):
+        server.active_server = self.previous_server
+        self.stub.stop()
+        super(ChunkedUploaderTest, self).tearDown()
+
+    def respond_to_uploads(self, response):
+        self.stub.responses['/katello/api/repositories/1/content_uploads/up/upload_bits/'] = response
+
+    def received_content(self):
+        received = {}
+        for _method, _path, _headers, body in self.stub.requests:
+            fields = dict(FIELD_RE.findall(body))
+            received[int(fields['offset'])] = fields['content']
+        return ''.join([received[offset] for offset in sorted(received)])
+
+    def test_uploads_whole_file_in_chunks(self):
+        self.uploader.upload('1', 'up', self.path)
+        self.assertEqual(len(self.stub.requests), 16)
+        self.assertEqual(self.received_content(), self.content)
+
+    def fail_first_attempts(self):
+        failed = set()
+        lock = threading.Lock()
+
+        def fail_first_attempt(handler):
+            offset = dict(FIELD_RE.findall(handler.body))['offset']
+            lock.acquire()
+            try:
+                if offset not in failed:
+                    failed.add(offset)
+                    return (503, 'busy', {})
+            finally:
+                lock.release()
+            return (200, {}, {})
+        self.respond_to_uploads(fail_first_attempt)
+
+    def test_server_resends_failed_chunks(self):
+        self.fail_first_attempts()
+        self.uploader.upload('1', 'up', self.path)
+        self.assertEqual((self.server.retry_policy.retries, self.uploader.resent), (16, 0))
+        self.assertEqual(len(self.stub.requests), 32)
+        self.assertEqual(self.received_content(), self.content)
+
+    def test_attempts_of_server_and_uploader_are_not_multiplied(self):
+        self.uploader.chunk_size = len(self.content)
+        self.respond_to_uploads(lambda handler: (503, 'busy', {}))
+        self.assertRaises(ServerRequestError, self.uploader.upload, '1', 'up', self.path)
+        self.assertEqual(len(self.stub.requests), self.server.retry_policy.max_retries + 1)
+
+    def test_resends_failed_chunks_when_server_does_not_retry(self):
+        self.server.retry_policy = None
+        self.fail_first_attempts()
+        self.uploader.upload('1', 'up', self.path)
+        self.assertEqual(self.uploader.resent, 16)
+        self.assertEqual(self.received_content(), self.content)
+
+    def test_client_errors_are_not_resent(self):
+        self.respond_to_uploads(lambda handler: (403, 'forbidden', {}))
+        self.assertRaises(ServerRequestError, self.uploader.upload, '1', 'up', self.path)
+        self.assertEqual(self.uploader.resent, 0)
+
+
+class FakeUploadAPI(object):
+    """
+    Records the calls of the pipeline, safe to be called from several threads.
+    """
+
+    def __init__(self):
+        self.created = []
+        self.imported = []
+        self.deleted = []
+        self.upload_error = None
+        self.lock = threading.Lock()
+
+    def create(self, repo_id):
+        self.lock.acquire()
+        try:
+            self.created.append('up%d' % len(self.created))
+            return {'upload_id': self.created[-1]}
+        finally:
+            self.lock.release()
+
+    def upload_bits(self, repo_id, upload_id, offset, content):
+        if self.upload_error:
+            raise self.upload_error
+
+    def import_into_repo(self, repo_id, uploads):
+        self.imported.append(uploads)
+
+    def delete(self, repo_id, upload_id):
+        self.lock.acquire()
+        try:
+            self.deleted.append(upload_id)
+        finally:
+            self.lock.release()
+
+
+class UploadPipelineTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for subdirectory, names in (('a', ['p1', 'p2', 'bad1']), ('a/b', ['p3']), ('c', ['p4', 'p5'])):
+            os.makedirs(os.path.join(self.directory, subdirectory))
+            for name in names:
+                f = open(os.path.join(self.directory, subdirectory, name), 'w')
+                f.write(name * 10)
+                f.close()
+        self.api = FakeUploadAPI()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_pipeline(self, workers, **kwargs):
+        pipeline = UploadPipeline(self.api, 'repo', 'yum', extract_name, workers=workers, batch_size=2, **kwargs)
+        pipeline.run(pipeline.discover(self.directory))
+        return pipeline
+
+    def imported_names(self):
+        return sorted([upload['unit_key']['name'] for batch in self.api.imported for upload in batch])
+
+    def test_discovers_files_in_all_directories(self):
+        names = [os.path.basename(path) for path in find_files(self.directory)]
+        self.assertEqual(sorted(names), ['bad1', 'p1', 'p2', 'p3', 'p4', 'p5'])
+
+    def assert_imports_valid_files_in_batches(self, pipeline):
+        self.assertEqual(self.imported_names(), ['p1', 'p2', 'p3', 'p4', 'p5'])
+        self.assertEqual(len(self.api.imported), 3)
+        self.assertEqual(sorted(self.api.deleted), sorted(self.api.created))
+        self.assertEqual(pipeline.imported, 5)
+        self.assertEqual([os.path.basename(path) for path in pipeline.skipped], ['bad1'])
+
+    def test_imports_valid_files_in_batches(self):
+        self.assert_imports_valid_files_in_batches(self.run_pipeline(1))
+
+    def test_imports_valid_files_in_batches_with_workers(self):
+        self.assert_imports_valid_files_in_batches(self.run_pipeline(3))
+
+    def test_reports_stage_times(self):
+        stages = [stage for stage, _wall, _busy in self.run_pipeline(2).times.summary()]
+        self.assertEqual(stages, ['discovery', 'metadata', 'upload', 'import', 'delete'])
+
+    def test_upload_error_stops_and_cleans_up(self):
+        self.api.upload_error = ServerRequestError(403, 'forbidden', None)
+        self.assertRaises(ServerRequestError, self.run_pipeline, 2)
+        self.assertEqual(self.api.imported, [])
+        self.assertEqual(sorted(self.api.deleted), sorted(self.api.created))
+
+    def test_skips_units_present_in_repository(self):
+        pipeline = self.run_pipeline(2, is_present=lambda unit_key: unit_key['name'] in ('p1', 'p4'))
+        self.assertEqual(self.imported_names(), ['p2', 'p3', 'p5'])
+        self.assertEqual(pipeline.bytes_present, 40)
+
+    def test_unchanged_files_are_taken_from_index(self):
+        index_path = os.path.join(self.directory, 'index')
+        index = ContentIndex(index_path)
+        self.run_pipeline(1, index=index)
+        index.save()
+
+        index = ContentIndex(index_path)
+        pipeline = UploadPipeline(self.api, 'repo', 'yum', extract_name, workers=1, index=index)
+        pipeline.run(find_files(os.path.join(self.directory, 'a')))
+        self.assertEqual(index.hits, 3)
+        self.assertEqual(index.bytes_saved, 60)
+
+    def test_renamed_files_are_extracted_again(self):
+        index_path = os.path.join(self.directory, 'index')
+        index = ContentIndex(index_path)
+        self.run_pipeline(1, index=index)
+        index.save()
+        os.rename(os.path.join(self.directory, 'c', 'p4'), os.path.join(self.directory, 'c', 'p6'))
+
+        self.api = FakeUploadAPI()
+        index = ContentIndex(index_path)
+        pipeline = UploadPipeline(self.api, 'repo', 'yum', extract_name, workers=1, index=index)
+        pipeline.run(find_files(os.path.join(self.directory, 'c')))
+        self.assertEqual(index.hits, 1)
+        self.assertEqual(self.imported_names(), ['p5', 'p6'])
+
+    def test_symlinks_get_their_own_names(self):
+        index = ContentIndex(os.path.join(self.directory, 'index'))
+        target = os.path.join(self.directory, 'c', 'p4')
+        for name in ('l1', 'l2'):
+            link = os.path.join(self.directory, name)
+            os.symlink(target, link)
+            pipeline = UploadPipeline(self.api, 'repo', 'yum', extract_name, workers=1, index=index)
+            pipeline.run([link])
+        self.assertEqual(index.hits, 0)
+        self.assertEqual(self.imported_names(), ['l1', 'l2'])
@@ -0,0 +1,105 @@
+import time
+import unittest
+from mock import Mock
+
+from katello.tests.test_utils import ColoredAssertionError
+
+from katello.client.lib.async import AsyncTask, TaskPoller
+from katello.client.lib.utils.concurrency import parallel_map, parallel_imap
+
+
+def task(uuid, state):
+    return {'uuid': uuid, 'state': state, 'progress': {}, 'result': None}
+
+
+class StatusAPI(object):
+
+    def __init__(self, states):
+        self.states = states
+        self.polled = []
+
+    def status(self, uuid):
+        self.polled.append(uuid)
+        return task(uuid, self.states[uuid])
+
+
+class BulkStatusAPI(StatusAPI):
+
+    def statuses(self, uuids):
+        self.polled.append(tuple(uuids))
+        return [task(uuid, self.states[uuid]) for uuid in uuids]
+
+
+class TaskPollerTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.tasks = [task('a', 'running'), task('b', 'finished'), task('c', 'waiting')]
+        self.api = StatusAPI({'a': 'finished', 'b': 'finished', 'c': 'running'})
+
+    def poll(self, api):
+        return TaskPoller(api, workers=4).poll(self.tasks, AsyncTask._subtask_is_running)
+
+    def test_polls_only_running_tasks(self):
+        self.poll(self.api)
+        self.assertEqual(sorted(self.api.polled), ['a', 'c'])
+
+    def test_keeps_order_of_tasks(self):
+        states = [t['state'] for t in self.poll(self.api)]
+        self.assertEqual(states, ['finished', 'finished', 'running'])
+
+    def test_uses_bulk_status_when_available(self):
+        api = BulkStatusAPI(self.api.states)
+        self.poll(api)
+        self.assertEqual(api.polled, [('a', 'c')])
+
+    def test_keeps_last_status_when_server_returns_none(self):
+        api = Mock(spec=['status'])
+        api.status.return_value = None
+        self.assertEqual(self.poll(api), self.tasks)
+
+    def test_async_task_update_refreshes_running_tasks(self):
+        async_task = AsyncTask(self.tasks)
+        async_task.status_api = Mock(return_value=self.api)
+        async_task.update()
+        self.assertEqual(async_task.subtask_left(), 1)
+        async_task.update()
+        self.assertEqual(self.api.polled.count('b'), 0)
+
+
+class ParallelMapTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def test_returns_results_in_order(self):
+        self.assertEqual(parallel_map(lambda x: x * 2, range(20), 4), range(0, 40, 2))
+
+    def test_reraises_errors(self):
+        def fail(x):
+            raise ValueError(x)
+        self.assertRaises(ValueError, parallel_map, fail, range(5), 4)
+
+
+class ParallelImapTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def test_yields_results_in_order(self):
+        def slow_first(x):
+            if x == 0:
+                time.sleep(0.05)
+            return x * 2
+        self.assertEqual(list(parallel_imap(slow_first, range(20), 4)), range(0, 40, 2))
+
+    def test_reraises_errors_when_due(self):
+        def fail_third(x):
+            if x == 2:
+                raise ValueError(x)
+            return x
+        results = parallel_imap(fail_third, range(5), 4)
+        self.assertEqual([results.next(), results.next()], [0, 1])
+        self.assertRaises(ValueError, results.next)
+
+    def test_runs_sequentially_with_one_worker(self):
+        self.assertEqual(list(parallel_imap(lambda x: x + 1, range(3), 1)), [1, 2, 3])
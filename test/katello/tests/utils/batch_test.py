@@ -0,0 +1,259 @@
+import os
+import cgi
+import sys
+import time
+import base64
+import unittest
+import threading
+import ConfigParser
+from StringIO import StringIO
+from mock import patch
+
+from katello.tests.test_utils import ColoredAssertionError
+from katello.tests.server.stub_server import StubServer
+
+from katello.client import server
+from katello.client.api.base import KatelloAPI
+from katello.client.batch import Batch, read_commands, plan_stages, created_names
+from katello.client.cli.base import KatelloCLI
+from katello.client.config import Config
+from katello.client.core.base import BaseAction
+from katello.client.lib.utils.capture import OutputCapture
+
+
+class FakeCLI(object):
+    """
+    Prints its command line and exits with the number after 'exit', if any.
+    """
+
+    instances = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        FakeCLI.lock.acquire()
+        try:
+            FakeCLI.instances.append(self)
+        finally:
+            FakeCLI.lock.release()
+
+    def main(self, command):
+        args = command.split()
+        if args[0] == 'sleep':
+            time.sleep(float(args[1]))
+        print "output of", command
+        if args[0] == 'fail':
+            print >> sys.stderr, "error of", command
+            return int(args[1])
+        if args[0] == 'exit':
+            sys.exit(int(args[1]))
+        return None
+
+
+class BatchTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        FakeCLI.instances = []
+        self.stdout, self.stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+
+    def tearDown(self):
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+
+    def run_batch(self, lines, parallel):
+        output, errors = sys.stdout, sys.stderr
+        results = list(Batch(FakeCLI, parallel).run(read_commands(lines)))
+        self.assertTrue(sys.stdout is output and sys.stderr is errors)
+        return results
+
+    def test_read_commands_skips_comments_and_empty_lines(self):
+        lines = ["# setup\n", "org list\n", "\n", "  ping  \n"]
+        self.assertEqual(list(read_commands(lines)), [(2, 'org list'), (4, 'ping')])
+
+    def test_it_reports_exit_codes_of_lines(self):
+        results = self.run_batch(["ping", "fail 3", "exit 2", "exit 0"], 1)
+        self.assertEqual([(r.line, r.exit_code) for r in results], [(1, os.EX_OK), (2, 3), (3, 2), (4, os.EX_OK)])
+
+    def test_it_shares_one_cli_when_sequential(self):
+        self.run_batch(["ping"] * 5, 1)
+        self.assertEqual(len(FakeCLI.instances), 1)
+
+    def test_parallel_output_is_printed_in_order(self):
+        lines = ["sleep 0.05", "fail 1"] + ["ping %d" % i for i in range(20)]
+        results = self.run_batch(lines, 4)
+        self.assertEqual([r.line for r in results], range(1, 23))
+        self.assertEqual([r.exit_code for r in results], [0, 1] + [0] * 20)
+        expected = "".join(["output of %s\n" % line for line in lines])
+        self.assertEqual(sys.stdout.getvalue(), expected)
+        self.assertEqual(sys.stderr.getvalue(), "error of fail 1\n")
+        self.assertTrue(len(FakeCLI.instances) <= 4)
+
+    def test_parallel_commands_overlap(self):
+        started = time.time()
+        self.run_batch(["sleep 0.1"] * 4, 4)
+        self.assertTrue(time.time() - started < 0.3)
+
+
+def commands(*lines):
+    return list(read_commands(lines))
+
+
+def stage_lines(stages):
+    return [[line for line, _command in stage] for stage in stages]
+
+
+class PlanStagesTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def test_independent_commands_share_a_stage(self):
+        stages = plan_stages(commands("repo synchronize --id 1", "repo synchronize --id 2", "ping"))
+        self.assertEqual(stage_lines(stages), [[1, 2, 3]])
+
+    def test_wait_starts_a_new_stage(self):
+        stages = plan_stages(commands("ping", "wait", "ping", "ping", "wait", "wait"))
+        self.assertEqual(stage_lines(stages), [[1], [3, 4]])
+
+    def test_reference_to_created_resource_starts_a_new_stage(self):
+        stages = plan_stages(commands(
+            "org create --name ACME",
+            "org create --name=Other",
+            "product create --org ACME --name Zoo",
+            "provider list --org Other",
+            "repo create --org ACME --product Zoo --name zoo --url http://example.com"))
+        self.assertEqual(stage_lines(stages), [[1, 2], [3, 4], [5]])
+
+    def test_script_ends_at_exit(self):
+        stages = plan_stages(commands("ping", "exit", "ping"))
+        self.assertEqual(stage_lines(stages), [[1]])
+
+    def test_created_names(self):
+        self.assertEqual(created_names(['org', 'create', '--name', 'ACME', '--label', 'acme']), set(['ACME', 'acme']))
+        self.assertEqual(created_names(['org', 'update', '--name', 'ACME']), set())
+        self.assertEqual(created_names(['system', 'register', '--name', 'host', '--org', 'ACME']), set(['host']))
+
+    def test_stages_run_one_after_another(self):
+        finished = []
+
+        class RecordingCLI(object):
+            def main(self, command):
+                if command == "slow":
+                    time.sleep(0.05)
+                FakeCLI.lock.acquire()
+                try:
+                    finished.append(command)
+                finally:
+                    FakeCLI.lock.release()
+
+        stages = plan_stages(commands("slow", "fast", "wait", "after"))
+        results = list(Batch(RecordingCLI, 2).run_stages(stages))
+        self.assertEqual([r.command for r in results], ["slow", "fast", "after"])
+        self.assertEqual(finished, ["fast", "slow", "after"])
+
+
+def paged_items(handler):
+    """
+    Page of a list of 5 items, the items tell the port and the credentials of the request
+    """
+    query = cgi.parse_qs(handler.path.split('?', 1)[1])
+    offset, limit = int(query['offset'][0]), int(query['limit'][0])
+    source = [handler.server.server_port, handler.headers.getheader('authorization')]
+    return (200, [{'id': i, 'source': source} for i in range(offset, min(offset + limit, 5))], {})
+
+
+class ListItems(BaseAction):
+
+    def __init__(self, sources):
+        super(ListItems, self).__init__()
+        self.sources = sources
+
+    def run(self):
+        for item in KatelloAPI()._get_list('/api/items', page_size=2):
+            self.sources.append(tuple(item['source']))
+
+
+class SessionBatchTest(unittest.TestCase):
+    """
+    Parallel stages of real clis sharing a session
+    """
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.stubs = [StubServer().start(), StubServer().start()]
+        for stub in self.stubs:
+            stub.responses['/katello/api/items'] = paged_items
+        self.original_server = server.active_server
+        config = ConfigParser.RawConfigParser()
+        config.add_section('server')
+        for name, value in (('host', '127.0.0.1'), ('port', self.stubs[0].port), ('scheme', 'http'),
+                            ('path', '/katello')):
+            config.set('server', name, str(value))
+        self.patcher = patch.object(Config, 'parser', config)
+        self.patcher.start()
+        self.sources = []
+        self.cli = self.create_cli()
+
+    def tearDown(self):
+        self.patcher.stop()
+        server.active_server = self.original_server
+        server.connection_pool.clear()
+        for stub in self.stubs:
+            stub.stop()
+
+    def create_cli(self):
+        cli = KatelloCLI()
+        cli.add_command('items', ListItems(self.sources))
+        return cli
+
+    def session_cli(self):
+        cli = self.create_cli()
+        cli.share_session(self.cli)
+        return cli
+
+    def authorization(self, username, password):
+        return 'Basic ' + base64.encodestring('%s:%s' % (username, password))[:-1]
+
+    def test_paged_commands_of_parallel_stages_keep_their_server_and_credentials(self):
+        self.assertEqual(self.cli.main(['-u', 'admin', '-p', 'secret', 'items']), os.EX_OK)
+        del self.sources[:]
+        first, other = self.stubs[0].port, self.stubs[1].port
+        lines = ["-u user -p other items", "--port %d items" % other, "wait", "items",
+                 "--port %d -u user -p other items" % other]
+        results = list(Batch(self.session_cli, 2).run_stages(plan_stages(read_commands(lines))))
+
+        self.assertEqual([r.exit_code for r in results], [os.EX_OK] * 4)
+        admin, user = self.authorization('admin', 'secret'), self.authorization('user', 'other')
+        self.assertEqual(sorted(self.sources),
+            sorted([(first, user)] * 5 + [(other, admin)] * 5 + [(first, admin)] * 5 + [(other, user)] * 5))
+
+
+class OutputCaptureTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def test_it_keeps_order_of_writes_to_both_streams(self):
+        out, err = StringIO(), StringIO()
+        capture = OutputCapture()
+        wrapped_out, wrapped_err = capture.wrap(out), capture.wrap(err)
+        capture.start()
+        wrapped_out.write("a")
+        wrapped_err.write("b")
+        wrapped_out.write("c")
+        chunks = capture.stop()
+        self.assertEqual(chunks, [(out, "a"), (err, "b"), (out, "c")])
+        self.assertEqual(out.getvalue(), "")
+        OutputCapture.replay(chunks)
+        self.assertEqual((out.getvalue(), err.getvalue()), ("ac", "b"))
+
+    def test_it_writes_through_in_threads_not_capturing(self):
+        out = StringIO()
+        capture = OutputCapture()
+        wrapped = capture.wrap(out)
+        capture.start()
+        thread = threading.Thread(target=wrapped.write, args=("other thread",))
+        thread.start()
+        thread.join()
+        self.assertEqual(capture.stop(), [])
+        self.assertEqual(out.getvalue(), "other thread")
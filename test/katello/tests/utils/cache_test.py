@@ -0,0 +1,155 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError, EasyMock
+
+import katello.client.api.utils
+from katello.client import server
+from katello.client.api.utils import cached_lookup, invalidate_lookups, resolution_cache
+from katello.client.lib.utils.cache import LRUCache
+from katello.client.server import KatelloServer, BasicAuthentication, NoAuthentication
+
+
+class LRUCacheTest(unittest.TestCase, EasyMock):
+
+    failureException = ColoredAssertionError
+
+    def tearDown(self):
+        self.restore_mocks()
+
+    def test_returns_stored_value(self):
+        cache = LRUCache()
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_keeps_recency_order_across_updates_and_removals(self):
+        cache = LRUCache(max_size=3)
+        for key in 'abcd':
+            cache.set(key, key)
+        cache.set('b', 'B')
+        cache.remove('c')
+        cache.set('e', 'e')
+        cache.set('f', 'f')
+        self.assertEqual(len(cache), 3)
+        self.assertEqual([cache.get(key) for key in 'bdef'], ['B', None, 'e', 'f'])
+
+        cache.clear()
+        cache.set('g', 'g')
+        self.assertEqual((len(cache), cache.get('g')), (1, 'g'))
+
+    def test_expires_entries(self):
+        cache = LRUCache(ttl=10)
+        time_mock = self.mock(katello.client.lib.utils.cache.time, 'time', 100)
+        cache.set('key', 'value')
+        time_mock.return_value = 111
+        self.assertEqual(cache.get('key', 'expired'), 'expired')
+
+    def test_survives_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'cache')
+            cache = LRUCache()
+            cache.set(('a', 1), {'id': 1})
+            cache.save(path)
+
+            loaded = LRUCache()
+            loaded.load(path)
+            self.assertEqual(loaded.get(('a', 1)), {'id': 1})
+        finally:
+            shutil.rmtree(directory)
+
+    def test_ignores_file_of_other_version(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'cache')
+            cache = LRUCache()
+            cache.set(('a', 1), {'id': 1})
+            cache.save(path, version=1)
+
+            loaded = LRUCache()
+            loaded.load(path, version=2)
+            self.assertEqual(len(loaded), 0)
+            loaded.load(path, version=1)
+            self.assertEqual(loaded.get(('a', 1)), {'id': 1})
+        finally:
+            shutil.rmtree(directory)
+
+    def test_ignores_missing_file(self):
+        cache = LRUCache()
+        cache.load('/nonexistent/cache')
+        self.assertEqual(len(cache), 0)
+
+
+class ResolutionCacheTest(unittest.TestCase, EasyMock):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.mock(katello.client.api.utils, '_configure_resolution_cache')
+        self.original_server = server.active_server
+        server.active_server = KatelloServer('localhost')
+        server.active_server.set_auth_method(BasicAuthentication('admin', 'admin'))
+        resolution_cache.clear()
+
+        self.calls = []
+        self.lookup = cached_lookup('organization')(self.find)
+
+    def find(self, name):
+        self.calls.append(name)
+        return {'name': name}
+
+    def tearDown(self):
+        server.active_server = self.original_server
+        resolution_cache.clear()
+        self.restore_mocks()
+
+    def test_looks_up_record_only_once(self):
+        self.lookup('ACME')
+        self.assertEqual(self.lookup('ACME'), {'name': 'ACME'})
+        self.assertEqual(len(self.calls), 1)
+
+    def test_records_are_cached_per_user(self):
+        self.lookup('ACME')
+        server.active_server.set_auth_method(BasicAuthentication('other', 'admin'))
+        self.lookup('ACME')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_refresh_forces_new_lookup(self):
+        self.lookup('ACME')
+        self.lookup('ACME', refresh=True)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_returned_records_are_copies(self):
+        self.lookup('ACME')['name'] = 'changed'
+        self.assertEqual(self.lookup('ACME'), {'name': 'ACME'})
+
+    def test_invalidation_drops_dependent_lookups(self):
+        product_lookup = cached_lookup('product')(self.find)
+        self.lookup('ACME')
+        product_lookup('prod')
+        invalidate_lookups('organization')
+        self.lookup('ACME')
+        product_lookup('prod')
+        self.assertEqual(len(self.calls), 4)
+
+    def test_no_caching_for_unknown_user(self):
+        server.active_server.set_auth_method(NoAuthentication())
+        self.lookup('ACME')
+        self.lookup('ACME')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_no_caching_without_active_server(self):
+        server.active_server = None
+        self.lookup('ACME')
+        self.lookup('ACME')
+        self.assertEqual(len(self.calls), 2)
@@ -0,0 +1,56 @@
+import os
+import hashlib
+import tempfile
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError
+
+import katello.client.lib.utils.checksum
+from katello.client.lib.utils.checksum import calculate_checksum, calculate_checksums
+
+
+class ChecksumTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.paths = []
+        self.read_size = katello.client.lib.utils.checksum.READ_SIZE
+        self.threshold = katello.client.lib.utils.checksum.MMAP_THRESHOLD
+        katello.client.lib.utils.checksum.READ_SIZE = 100
+
+    def tearDown(self):
+        katello.client.lib.utils.checksum.READ_SIZE = self.read_size
+        katello.client.lib.utils.checksum.MMAP_THRESHOLD = self.threshold
+        for path in self.paths:
+            os.remove(path)
+
+    def create_file(self, content):
+        fd, path = tempfile.mkstemp()
+        os.write(fd, content)
+        os.close(fd)
+        self.paths.append(path)
+        return path
+
+    def test_hashes_all_blocks(self):
+        content = os.urandom(1050)
+        path = self.create_file(content)
+        self.assertEqual(calculate_checksum('sha256', path), hashlib.sha256(content).hexdigest())
+
+    def test_hashes_mapped_files(self):
+        katello.client.lib.utils.checksum.MMAP_THRESHOLD = 500
+        content = os.urandom(1050)
+        path = self.create_file(content)
+        self.assertEqual(calculate_checksum('sha256', path), hashlib.sha256(content).hexdigest())
+
+    def test_computes_several_digests(self):
+        content = os.urandom(300)
+        path = self.create_file(content)
+        self.assertEqual(calculate_checksums(path, ('sha256', 'sha1', 'md5')), {
+            'sha256': hashlib.sha256(content).hexdigest(),
+            'sha1': hashlib.sha1(content).hexdigest(),
+            'md5': hashlib.md5(content).hexdigest()})
+
+    def test_hashes_empty_file(self):
+        path = self.create_file('')
+        self.assertEqual(calculate_checksum('md5', path), hashlib.md5('').hexdigest())
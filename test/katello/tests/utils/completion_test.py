@@ -0,0 +1,189 @@
+import os
+import shutil
+import time
+import tempfile
+import threading
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError
+
+from katello.client.core.base import Command, Action
+from katello.client.completion import Completion, ValueCompletion, ValueCache, cached_completion
+
+
+class CountingAction(Action):
+    parsers = 0
+
+    def setup_parser(self, parser):
+        CountingAction.parsers += 1
+        parser.add_option('--org', dest='org')
+        parser.add_option('--name', dest='name')
+
+
+def create_cli():
+    cli = Command()
+    system = Command()
+    system.add_command('list', CountingAction())
+    system.add_command('info', CountingAction())
+    cli.add_command('system', system)
+    cli.add_command('ping', CountingAction())
+    return cli
+
+
+class CompletionTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        CountingAction.parsers = 0
+        self.completion = Completion(create_cli())
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_completes_commands(self):
+        self.assertEqual(self.completion.complete('system '), ['info', 'list', '--help'])
+        self.assertEqual(self.completion.complete('sys'), ['system'])
+
+    def test_completes_options(self):
+        self.assertEqual(self.completion.complete('system list --org ACME --n'), ['--name'])
+
+    def test_parsers_are_created_once(self):
+        for _i in range(3):
+            self.completion.complete('system list --')
+        self.assertEqual(CountingAction.parsers, 1)
+
+    def test_saved_index_completes_the_same(self):
+        path = os.path.join(self.directory, 'index.json')
+        self.completion.save(path)
+        loaded = Completion.load(path)
+        for line in ('', 'system ', 'system list --', 'ping --o'):
+            self.assertEqual(loaded.complete(line), self.completion.complete(line))
+
+    def test_corrupted_index_is_ignored(self):
+        path = os.path.join(self.directory, 'index.json')
+        open(path, 'w').write('{"commands": ')
+        self.assertEqual(Completion.load(path), None)
+
+    def test_cached_completion_builds_index_once(self):
+        created = []
+        def create():
+            created.append(1)
+            return create_cli()
+        cached_completion(self.directory, 'katello', create)
+        completion = cached_completion(self.directory, 'katello', create)
+        self.assertEqual(len(created), 1)
+        self.assertEqual(completion.complete('system l'), ['list'])
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+
+class FakeSource(object):
+    """
+    Fetch function returning given values once released, records the calls.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.calls = []
+        self.released = threading.Event()
+        self.lock = threading.Lock()
+
+    def __call__(self, context):
+        self.lock.acquire()
+        try:
+            self.calls.append(dict(context))
+        finally:
+            self.lock.release()
+        self.released.wait(5)
+        if isinstance(self.values, Exception):
+            raise self.values
+        return self.values
+
+
+def wait_for_refresh(cache):
+    deadline = time.time() + 5
+    while cache.refreshing() and time.time() < deadline:
+        time.sleep(0.005)
+
+
+class ValueCompletionTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.orgs = FakeSource(['ACME', 'Admin', 'Other'])
+        self.envs = FakeSource(['Dev', 'Library'])
+        self.cache = ValueCache(ttl=300)
+        self.values = ValueCompletion(self.cache)
+        self.values.SOURCES = {
+            '--org': (self.orgs, ()),
+            '--environment': (self.envs, ('org',)),
+        }
+        self.completion = Completion(create_cli(), values=self.values)
+
+    def tearDown(self):
+        self.orgs.released.set()
+        self.envs.released.set()
+        wait_for_refresh(self.cache)
+
+    def complete_when_fetched(self, line):
+        self.completion.complete(line)
+        self.orgs.released.set()
+        self.envs.released.set()
+        wait_for_refresh(self.cache)
+        return self.completion.complete(line)
+
+    def test_it_does_not_block_on_the_fetch(self):
+        started = time.time()
+        self.assertEqual(self.completion.complete("system list --org A"), [])
+        self.assertTrue(time.time() - started < 1)
+        self.assertEqual(self.cache.refreshing(), 1)
+
+    def test_it_completes_fetched_values(self):
+        self.assertEqual(self.complete_when_fetched("system list --org A"), ['ACME', 'Admin'])
+        self.assertEqual(self.completion.complete("system list --org="), ['ACME', 'Admin', 'Other'])
+        self.assertEqual(self.completion.complete("system list --org=O"), ['Other'])
+        self.assertEqual(len(self.orgs.calls), 1)
+
+    def test_it_still_completes_commands_and_options(self):
+        self.assertEqual(self.completion.complete("system list --o"), ['--org'])
+        self.assertEqual(self.completion.complete("system l"), ['list'])
+
+    def test_it_scopes_values_by_organization(self):
+        self.assertEqual(self.complete_when_fetched("system list --org ACME --environment "), ['Dev', 'Library'])
+        self.assertEqual(self.envs.calls[0]['org'], 'ACME')
+        self.assertEqual(self.completion.complete("system list --org Other --environment "), [])
+        wait_for_refresh(self.cache)
+        self.assertEqual([call['org'] for call in self.envs.calls], ['ACME', 'Other'])
+
+    def test_it_needs_organization_for_scoped_values(self):
+        self.assertEqual(self.completion.complete("system list --environment "), [])
+        self.assertEqual(self.envs.calls, [])
+
+    def test_it_refreshes_expired_values_in_background(self):
+        self.complete_when_fetched("system list --org ")
+        self.cache.ttl = 0
+        self.orgs.values = ['New']
+        self.orgs.released.clear()
+        # stale values are returned while the refresh runs
+        time.sleep(0.01)
+        self.assertEqual(self.completion.complete("system list --org "), ['ACME', 'Admin', 'Other'])
+        self.orgs.released.set()
+        wait_for_refresh(self.cache)
+        self.cache.ttl = 300
+        self.assertEqual(self.completion.complete("system list --org "), ['New'])
+
+    def test_it_keeps_stale_values_when_refresh_fails(self):
+        self.complete_when_fetched("system list --org ")
+        self.cache.ttl = 0
+        self.orgs.values = IOError("connection refused")
+        time.sleep(0.01)
+        self.completion.complete("system list --org ")
+        wait_for_refresh(self.cache)
+        self.cache.ttl = 300
+        self.assertEqual(self.completion.complete("system list --org "), ['ACME', 'Admin', 'Other'])
+
+    def test_context_reads_option_values(self):
+        self.assertEqual(ValueCompletion.context(['system', 'list', '--org', 'ACME', '--environment', 'Dev', '-v']),
+            {'org': 'ACME', 'environment': 'Dev'})
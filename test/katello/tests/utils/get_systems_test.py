@@ -0,0 +1,71 @@
+import unittest
+
+from katello.tests.test_utils import ColoredAssertionError, EasyMock
+
+import katello.client.api.utils
+from katello.client.api.system import SystemAPI
+from katello.client.api.utils import get_systems, ApiDataError
+from katello.client.server import ServerRequestError
+
+
+class FakeSystemSearch(object):
+    """
+    Answers uuid searches the way the server does, OR-combined queries included.
+    """
+
+    def __init__(self, uuids, refuse_combined=False):
+        self.uuids = uuids
+        self.refuse_combined = refuse_combined
+        self.queries = []
+
+    def __call__(self, org_name, query=None):
+        self.queries.append(query['search'])
+        terms = query['search'].split(' OR ')
+        if self.refuse_combined and len(terms) > 1:
+            raise ServerRequestError(400, {'displayMessage': 'query too long'}, None)
+        return [{'uuid': term[len('uuid:'):], 'name': 'sys'}
+            for term in terms if term[len('uuid:'):] in self.uuids]
+
+
+class GetSystemsTest(unittest.TestCase, EasyMock):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.search = FakeSystemSearch(['a', 'b', 'c'])
+        self.mock(SystemAPI, 'systems_by_org').side_effect = self.search
+
+    def tearDown(self):
+        self.restore_mocks()
+
+    def test_searches_uuids_in_one_request(self):
+        systems = get_systems('org', ['c', 'a', 'b'])
+        self.assertEqual([s['uuid'] for s in systems], ['c', 'a', 'b'])
+        self.assertEqual(self.search.queries, ['uuid:c OR uuid:a OR uuid:b'])
+
+    def test_searches_in_chunks(self):
+        self.backup_property(katello.client.api.utils, 'SYSTEM_SEARCH_CHUNK')
+        katello.client.api.utils.SYSTEM_SEARCH_CHUNK = 2
+        get_systems('org', ['a', 'b', 'c'])
+        self.assertEqual(self.search.queries, ['uuid:a OR uuid:b', 'uuid:c'])
+
+    def test_reports_all_missing_uuids(self):
+        try:
+            get_systems('org', ['a', 'x', 'y'])
+        except ApiDataError, e:
+            self.assertTrue('x, y' in str(e))
+        else:
+            self.fail("ApiDataError not raised")
+
+    def test_falls_back_to_single_searches(self):
+        self.search.refuse_combined = True
+        systems = get_systems('org', ['a', 'b'])
+        self.assertEqual([s['uuid'] for s in systems], ['a', 'b'])
+        self.assertEqual(sorted(self.search.queries[1:]), ['uuid:a', 'uuid:b'])
+
+    def test_fetches_details_only_on_request(self):
+        system_mock = self.mock(SystemAPI, 'system', {'uuid': 'a', 'facts': {}})
+        get_systems('org', ['a'])
+        self.assertEqual(system_mock.call_count, 0)
+        systems = get_systems('org', ['a'], details=True)
+        self.assertEqual(systems, [{'uuid': 'a', 'facts': {}}])
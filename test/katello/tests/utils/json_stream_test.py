@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import unittest
+from StringIO import StringIO
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.tests.test_utils import ColoredAssertionError
+
+from katello.client.lib.utils.json_stream import iter_json_array
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    DATA = [{'name': u'systém %d' % i, 'facts': {'cpu': i}} for i in range(20)] + \
+        [123456, 'text', [1, [2]], None, True, 1.5]
+
+    def decode(self, text, block_size):
+        return list(iter_json_array(StringIO(text).read, block_size))
+
+    def test_decodes_elements_split_across_blocks(self):
+        text = json.dumps(self.DATA, indent=1)
+        for block_size in (1, 2, 3, 7, 64, 4096):
+            self.assertEqual(self.decode(text, block_size), self.DATA)
+
+    def test_empty_array(self):
+        self.assertEqual(self.decode(' [ ] ', 1), [])
+
+    def test_yields_elements_before_the_end_is_read(self):
+        stream = StringIO('[{"a": 1}, {"b": 2}' + ' ' * 1000 + ']')
+        elements = iter_json_array(stream.read, 16)
+        self.assertEqual(elements.next(), {'a': 1})
+        self.assertTrue(stream.tell() < 100)
+
+    def test_other_documents_are_yielded_whole(self):
+        self.assertEqual(self.decode('{"a": [1, 2]}', 3), [{'a': [1, 2]}])
+
+    def test_truncated_array_raises_error(self):
+        self.assertRaises(ValueError, self.decode, '[{"a": 1}, {"b"', 4)
+        self.assertRaises(ValueError, self.decode, '[1, 2', 4)
+
+    def test_missing_delimiter_raises_error(self):
+        self.assertRaises(ValueError, self.decode, '[1 2]', 4)
@@ -0,0 +1,86 @@
+import unittest
+import threading
+
+from katello.tests.test_utils import ColoredAssertionError
+
+from katello.client.api.pager import Pager, paged_query
+
+
+class FakeListServer(object):
+    """
+    Serves pages of a list of numbers, records the requested pages.
+    """
+
+    def __init__(self, count, paged=True, wrapped=False):
+        self.items = range(count)
+        self.paged = paged
+        self.wrapped = wrapped
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, offset, limit):
+        self.lock.acquire()
+        try:
+            self.requests.append((offset, limit))
+        finally:
+            self.lock.release()
+        if not self.paged:
+            return list(self.items)
+        page = self.items[offset:offset + limit]
+        if self.wrapped:
+            return {'results': page, 'subtotal': len(self.items)}
+        return page
+
+
+class PagerTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def test_it_iterates_over_all_pages(self):
+        server = FakeListServer(25)
+        self.assertEqual(list(Pager(server, page_size=10)), range(25))
+        self.assertEqual(sorted(server.requests), [(0, 10), (10, 10), (20, 10)])
+
+    def test_it_requests_one_more_page_when_pages_are_full(self):
+        server = FakeListServer(20)
+        self.assertEqual(list(Pager(server, page_size=10)), range(20))
+        self.assertEqual(len(server.requests), 3)
+
+    def test_it_stops_at_total_of_wrapped_results(self):
+        server = FakeListServer(20, wrapped=True)
+        self.assertEqual(list(Pager(server, page_size=10)), range(20))
+        self.assertEqual(len(server.requests), 2)
+
+    def test_it_stops_at_limit(self):
+        server = FakeListServer(100)
+        self.assertEqual(list(Pager(server, page_size=10, limit=15)), range(15))
+        self.assertEqual(sorted(server.requests), [(0, 10), (10, 5)])
+
+    def test_it_fetches_lazily(self):
+        server = FakeListServer(100)
+        pages = iter(Pager(server, page_size=10, prefetch=False))
+        self.assertEqual(server.requests, [])
+        self.assertEqual(pages.next(), 0)
+        self.assertEqual(server.requests, [(0, 10)])
+        for _i in range(10):
+            pages.next()
+        self.assertEqual(server.requests, [(0, 10), (10, 10)])
+
+    def test_it_handles_server_without_paging(self):
+        server = FakeListServer(25, paged=False)
+        self.assertEqual(list(Pager(server, page_size=10)), range(25))
+        self.assertEqual(list(Pager(server, page_size=10, limit=5)), range(5))
+
+    def test_it_stops_when_server_ignores_offset(self):
+        server = FakeListServer(10, paged=False)
+        self.assertEqual(list(Pager(server, page_size=10)), range(10))
+
+    def test_it_raises_errors_of_page_requests(self):
+        def fail(offset, limit):
+            raise IOError("connection lost")
+        self.assertRaises(IOError, list, Pager(fail))
+
+    def test_paged_query_keeps_the_query(self):
+        query = {'search': 'name:a*'}
+        self.assertEqual(paged_query(query, 20, 10), {'search': 'name:a*', 'offset': 20, 'limit': 10})
+        self.assertEqual(query, {'search': 'name:a*'})
@@ -2,7 +2,7 @@ from unittest import TestCase
 from mock import Mock
 
 from katello.client.lib.ui import printer
-from katello.client.lib.ui.printer import Printer, VerboseStrategy, GrepStrategy
+from katello.client.lib.ui.printer import Printer, VerboseStrategy, GrepStrategy, JSONLinesStrategy, CSVStrategy
 from katello.client.lib.ui.printer import indent_text, text_to_line, center_text, print_line, get_term_width
 from katello.tests.test_utils import ColoredAssertionError, EasyMock
 
@@ -123,6 +123,17 @@ class VerboseStrategyTest():
         return VerboseStrategy(output=self.output)
 
 
+class JSONLinesStrategyTest():
+
+    def create_strategy(self):
+        return JSONLinesStrategy(output=self.output)
+
+class CSVStrategyTest():
+
+    def create_strategy(self):
+        return CSVStrategy(output=self.output)
+
+
 class GrepOutputStrategyTest(GrepStrategyTest, OutputStrategyTest, TestCase):
     pass
 
@@ -141,3 +152,145 @@ class VerboseDefaultValueStrategyTest(VerboseStrategyTest, DefaultValueStrategyT
 class VerboseMultipleOutputStrategyTest(VerboseStrategyTest, MultipleOutputStrategyTest, TestCase):
     pass
 
+
+class JSONLinesDefaultValueStrategyTest(JSONLinesStrategyTest, DefaultValueStrategyTest, TestCase):
+    pass
+
+class JSONLinesMultipleOutputStrategyTest(JSONLinesStrategyTest, MultipleOutputStrategyTest, TestCase):
+    pass
+
+class CSVDefaultValueStrategyTest(CSVStrategyTest, DefaultValueStrategyTest, TestCase):
+    pass
+
+class CSVMultipleOutputStrategyTest(CSVStrategyTest, MultipleOutputStrategyTest, TestCase):
+    pass
+
+
+
+class GrepSampleWindowTest(EasyMock, TestCase):
+
+    failureException = ColoredAssertionError
+
+    COLUMNS = [{'attr_name': 'name', 'name': 'Name'}, {'attr_name': 'id', 'name': 'Id'}]
+
+    def setUp(self):
+        self.output = StringIO.StringIO()
+        self.mock(printer, "get_term_width", 20)
+
+    def tearDown(self):
+        self.output.close()
+        self.restore_mocks()
+
+    def rows(self, strategy, items):
+        strategy.print_items(None, self.COLUMNS, items)
+        return self.output.getvalue().splitlines()
+
+    def items(self):
+        for name in ('a', 'bb', 'a_very_long_name'):
+            yield {'name': name, 'id': 1}
+
+    def test_iterators_are_printed_whole(self):
+        rows = self.rows(GrepStrategy(output=self.output), self.items())
+        self.assertEqual(len(rows), 3)
+
+    def test_widths_are_computed_from_sample(self):
+        rows = self.rows(GrepStrategy(output=self.output, sample_size=2), self.items())
+        self.assertEqual(rows[0], 'a    1  ')
+        self.assertEqual(rows[2], 'a_very_long_name1  ')
+
+    def test_fixed_widths(self):
+        columns = [{'attr_name': 'name', 'name': 'Name', 'width': 8}]
+        GrepStrategy(output=self.output, sample_size=0).print_items(None, columns, self.items())
+        self.assertEqual(self.output.getvalue().splitlines()[1], 'bb      ')
+
+
+class SinglePassRenderingTest(EasyMock, TestCase):
+
+    failureException = ColoredAssertionError
+
+    ITEMS = [{'id': 'A1', 'name': 'name_a'}, {'id': 'B2'}]
+
+    def setUp(self):
+        self.output = StringIO.StringIO()
+        self.mock(printer, "get_term_width", 20)
+        self.formatted = []
+
+    def tearDown(self):
+        self.output.close()
+        self.restore_mocks()
+
+    def formatter(self, value):
+        self.formatted.append(value)
+        return value
+
+    def columns(self):
+        return [{'attr_name': 'id', 'name': 'Id', 'formatter': self.formatter},
+                {'attr_name': 'name', 'name': 'Name'}]
+
+    def test_grep_formats_each_cell_once(self):
+        GrepStrategy(output=self.output).print_items(None, self.columns(), self.ITEMS)
+        self.assertEqual(self.formatted, ['A1', 'B2'])
+
+    def test_verbose_formats_each_cell_once(self):
+        VerboseStrategy(output=self.output).print_items(None, self.columns(), self.ITEMS)
+        self.assertEqual(self.formatted, ['A1', 'B2'])
+
+    def test_grep_pads_missing_values(self):
+        columns = [{'attr_name': 'name', 'name': 'Name'}, {'attr_name': 'id', 'name': 'Id'}]
+        GrepStrategy(output=self.output).print_items(None, columns, self.ITEMS)
+        self.assertEqual(self.output.getvalue().splitlines(), ['name_a A1 ', '       B2 '])
+
+    def test_grep_keeps_delimited_columns_for_missing_values(self):
+        columns = [{'attr_name': 'name', 'name': 'Name'}, {'attr_name': 'id', 'name': 'Id'}]
+        GrepStrategy(delimiter='|', output=self.output).print_items(None, columns, self.ITEMS)
+        self.assertEqual(self.output.getvalue().splitlines(), ['name_a|A1|', '|B2|'])
+
+    def test_grep_prints_header_into_output(self):
+        GrepStrategy(output=self.output).print_items('header', self.columns(), self.ITEMS)
+        self.assertEqual(self.output.getvalue().splitlines()[3], 'Id Name   ')
+
+    def test_wide_characters_take_two_columns(self):
+        self.assertEqual(printer.unicode_len(u'ab'), 2)
+        self.assertEqual(printer.unicode_len(u'\u4e2d\u6587'), 4)
+
+
+class MachineReadableStrategyTest(TestCase):
+
+    failureException = ColoredAssertionError
+
+    COLUMNS = [{'attr_name': 'name', 'name': 'Name'},
+               {'attr_name': 'id', 'name': 'Id', 'formatter': lambda value: value * 2},
+               {'attr_name': 'missing', 'name': 'Missing'}]
+
+    def setUp(self):
+        self.output = StringIO.StringIO()
+
+    def tearDown(self):
+        self.output.close()
+
+    def items(self):
+        yield {'name': 'a', 'id': 1}
+        yield {'name': 'b, "quoted"\nline', 'id': 2}
+
+    def test_json_prints_object_per_line(self):
+        JSONLinesStrategy(output=self.output).print_items('header', self.COLUMNS, self.items())
+        self.assertEqual(self.output.getvalue().splitlines(), [
+            '{"name": "a", "id": 2, "missing": null}',
+            '{"name": "b, \\"quoted\\"\\nline", "id": 4, "missing": null}'])
+
+    def test_csv_quotes_special_characters(self):
+        CSVStrategy(output=self.output).print_items('header', self.COLUMNS, self.items())
+        self.assertEqual(self.output.getvalue(),
+            'Name,Id,Missing\r\na,2,\r\n"b, ""quoted""\nline",4,\r\n')
+
+    def test_csv_without_heading(self):
+        CSVStrategy(output=self.output).print_items(None, self.COLUMNS[:1], self.items())
+        self.assertEqual(self.output.getvalue().splitlines()[0], 'a')
+
+    def test_printer_keeps_machine_readable_strategy(self):
+        strategy = JSONLinesStrategy(output=self.output)
+        p = Printer(strategy)
+        p.set_strategy(VerboseStrategy(output=self.output))
+        p.add_column('name', show_with=VerboseStrategy)
+        p.print_item({'name': 'a'})
+        self.assertEqual(self.output.getvalue(), '{"name": "a"}\n')
@@ -0,0 +1,72 @@
+import unittest
+from mock import Mock
+
+from katello.tests.test_utils import ColoredAssertionError, EasyMock
+
+import katello.client.lib.ui.progress
+from katello.client.lib.async import AsyncTask
+from katello.client.lib.ui.progress import PollScheduler, FixedPollScheduler, wait_for_async_task
+from katello.client.lib.utils.deadline import command_deadline, DeadlineExceeded
+
+
+class PollSchedulerTest(unittest.TestCase):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.scheduler = PollScheduler(min_delay=1.0, max_delay=8.0, backoff=2.0, jitter=0.0)
+
+    def delays(self, progresses):
+        return [self.scheduler.next_delay(p) for p in progresses]
+
+    def test_backs_off_up_to_the_cap(self):
+        self.assertEqual(self.delays([None] * 6), [1.0, 2.0, 4.0, 8.0, 8.0, 8.0])
+
+    def test_shortens_delay_when_progress_moves(self):
+        self.assertEqual(self.delays([0.1, 0.1, 0.1, 0.5, 0.5]), [1.0, 2.0, 4.0, 2.0, 4.0])
+
+    def test_counts_polls(self):
+        self.delays([None] * 3)
+        self.assertEqual(self.scheduler.polls, 3)
+
+    def test_jitter_stays_within_bounds(self):
+        scheduler = PollScheduler(min_delay=1.0, jitter=0.5)
+        delay = scheduler.next_delay()
+        self.assertTrue(0.5 <= delay <= 1.5)
+
+    def test_fixed_scheduler_keeps_delay(self):
+        scheduler = FixedPollScheduler(2)
+        self.assertEqual([scheduler.next_delay(None) for _i in range(3)], [2, 2, 2])
+
+
+class WaitForAsyncTaskTest(unittest.TestCase, EasyMock):
+
+    failureException = ColoredAssertionError
+
+    def setUp(self):
+        self.sleep = self.mock(katello.client.lib.ui.progress.time, 'sleep')
+
+    def tearDown(self):
+        command_deadline.start(None)
+        self.restore_mocks()
+
+    def test_polls_until_task_finishes(self):
+        task = Mock(spec=AsyncTask)
+        task.is_running.side_effect = [True, True, False]
+        task.get_progress.side_effect = KeyError('progress')
+        scheduler = PollScheduler(jitter=0.0)
+
+        wait_for_async_task(task, scheduler=scheduler)
+
+        self.assertEqual(task.update.call_count, 2)
+        self.assertEqual(scheduler.polls, 2)
+
+    def test_stops_polling_at_the_deadline(self):
+        task = Mock(spec=AsyncTask)
+        task.is_running.return_value = True
+        task.get_progress.return_value = 0.5
+        command_deadline.start(1.0)
+
+        self.assertRaises(DeadlineExceeded, wait_for_async_task, task, 5.0)
+        self.assertEqual(task.update.call_count, 0)
+        self.assertTrue(self.sleep.call_args[0][0] <= 1.0)